@@ -0,0 +1,69 @@
+"""project list indexes
+
+Revision ID: 3f9c2a7d41b8
+Revises: 
+Create Date: 2026-10-19 09:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '3f9c2a7d41b8'
+down_revision = None
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    # 大きなテーブルでも書き込みを止めないよう CONCURRENTLY で作成する
+    with op.get_context().autocommit_block():
+        # 一覧のデフォルト順（キーセットページネーション）
+        op.create_index(
+            'ix_projects_tenant_updated_id',
+            'projects',
+            ['tenant_id', sa.text('updated_at DESC'), sa.text('id DESC')],
+            postgresql_concurrently=True,
+        )
+        # ステータス絞り込み + 同じ並び順
+        op.create_index(
+            'ix_projects_tenant_status_updated_id',
+            'projects',
+            ['tenant_id', 'status', sa.text('updated_at DESC'), sa.text('id DESC')],
+            postgresql_concurrently=True,
+        )
+        # 着工予定日の範囲検索
+        op.create_index(
+            'ix_projects_tenant_start_date',
+            'projects',
+            ['tenant_id', 'estimated_start_date'],
+            postgresql_concurrently=True,
+        )
+        # 顧客名・工事コードの前方一致（LIKE 'xxx%'）
+        op.create_index(
+            'ix_projects_tenant_customer_name',
+            'projects',
+            ['tenant_id', 'customer_name'],
+            postgresql_ops={'customer_name': 'varchar_pattern_ops'},
+            postgresql_concurrently=True,
+        )
+        op.create_index(
+            'ix_projects_tenant_code',
+            'projects',
+            ['tenant_id', 'code'],
+            postgresql_ops={'code': 'varchar_pattern_ops'},
+            postgresql_concurrently=True,
+        )
+
+
+def downgrade() -> None:
+    with op.get_context().autocommit_block():
+        for name in (
+            'ix_projects_tenant_code',
+            'ix_projects_tenant_customer_name',
+            'ix_projects_tenant_start_date',
+            'ix_projects_tenant_status_updated_id',
+            'ix_projects_tenant_updated_id',
+        ):
+            op.drop_index(name, table_name='projects', postgresql_concurrently=True)
@@ -0,0 +1,39 @@
+"""my open tasks partial index
+
+Revision ID: 8b1e5d2c9a47
+Revises: 3f9c2a7d41b8
+Create Date: 2026-10-19 09:30:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '8b1e5d2c9a47'
+down_revision = '3f9c2a7d41b8'
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    # マイタスク（担当者別の未完了タスクを期限順）用の部分インデックス
+    # updated_at を INCLUDE して ETag 算出をインデックスオンリースキャンにする
+    with op.get_context().autocommit_block():
+        op.create_index(
+            'ix_tasks_my_open_tasks',
+            'tasks',
+            ['tenant_id', 'assignee_id', 'due_date'],
+            postgresql_include=['updated_at'],
+            postgresql_where=sa.text("status <> 'DONE'"),
+            postgresql_concurrently=True,
+        )
+
+
+def downgrade() -> None:
+    with op.get_context().autocommit_block():
+        op.drop_index(
+            'ix_tasks_my_open_tasks',
+            table_name='tasks',
+            postgresql_concurrently=True,
+        )
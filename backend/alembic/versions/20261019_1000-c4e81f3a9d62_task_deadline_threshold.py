@@ -0,0 +1,47 @@
+"""task deadline threshold column and scan index
+
+Revision ID: c4e81f3a9d62
+Revises: 8b1e5d2c9a47
+Create Date: 2026-10-19 10:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'c4e81f3a9d62'
+down_revision = '8b1e5d2c9a47'
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    # 最後に期限通知したしきい値（残り時間, 72/24/0）。NULL は未通知
+    # デフォルトなしの NULL 許可列なので既存行の書き換えは発生しない
+    op.add_column('tasks', sa.Column('last_deadline_threshold', sa.Integer(), nullable=True))
+
+    # 期限スキャン用の部分インデックス
+    # 期限切れ（0時間）まで通知済みのタスクはインデックスから外れるため、
+    # 古い期限切れタスクが溜まってもスキャン範囲は増えない
+    with op.get_context().autocommit_block():
+        op.create_index(
+            'ix_tasks_deadline_scan',
+            'tasks',
+            ['due_date', 'id'],
+            postgresql_where=sa.text(
+                "status <> 'DONE' AND assignee_id IS NOT NULL AND due_date IS NOT NULL "
+                "AND (last_deadline_threshold IS NULL OR last_deadline_threshold > 0)"
+            ),
+            postgresql_concurrently=True,
+        )
+
+
+def downgrade() -> None:
+    with op.get_context().autocommit_block():
+        op.drop_index(
+            'ix_tasks_deadline_scan',
+            table_name='tasks',
+            postgresql_concurrently=True,
+        )
+    op.drop_column('tasks', 'last_deadline_threshold')
@@ -0,0 +1,42 @@
+"""notification dedup key
+
+Revision ID: 5d7a0b9e2f14
+Revises: c4e81f3a9d62
+Create Date: 2026-10-19 10:30:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '5d7a0b9e2f14'
+down_revision = 'c4e81f3a9d62'
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    # 重複排除キー（テナント・宛先・種別・対象のハッシュ）。対象外の通知は NULL
+    op.add_column('notifications', sa.Column('dedup_key', sa.String(length=64), nullable=True))
+
+    # ON CONFLICT (dedup_key) WHERE dedup_key IS NOT NULL の一意制約
+    with op.get_context().autocommit_block():
+        op.create_index(
+            'uq_notifications_dedup_key',
+            'notifications',
+            ['dedup_key'],
+            unique=True,
+            postgresql_where=sa.text('dedup_key IS NOT NULL'),
+            postgresql_concurrently=True,
+        )
+
+
+def downgrade() -> None:
+    with op.get_context().autocommit_block():
+        op.drop_index(
+            'uq_notifications_dedup_key',
+            table_name='notifications',
+            postgresql_concurrently=True,
+        )
+    op.drop_column('notifications', 'dedup_key')
@@ -0,0 +1,182 @@
+"""partition notifications by month, dedup key table and retention policies
+
+Revision ID: a92f6c1d8e35
+Revises: 5d7a0b9e2f14
+Create Date: 2026-10-19 11:00:00.000000
+
+"""
+from datetime import date, datetime
+
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+
+# revision identifiers, used by Alembic.
+revision = 'a92f6c1d8e35'
+down_revision = '5d7a0b9e2f14'
+branch_labels = None
+depends_on = None
+
+MONTHS_AHEAD = 3
+
+# パーティション分割するテーブル（子 → 親の順。配信ログは通知を参照するため先に変換する）
+PARTITIONED_TABLES = ['notification_delivery_logs', 'notifications']
+
+# 変換後に親テーブルへ作るインデックス（各パーティションにも作られる）
+PARTITIONED_INDEXES = {
+    'notifications': [
+        ('ix_notifications_recipient_feed', ['tenant_id', 'recipient_id', 'created_at'], None),
+        ('ix_notifications_recipient_unread', ['tenant_id', 'recipient_id'], 'is_read = false'),
+        ('ix_notifications_expires_at', ['expires_at'], 'expires_at IS NOT NULL'),
+    ],
+    'notification_delivery_logs': [
+        ('ix_notification_delivery_logs_notification', ['notification_id'], None),
+    ],
+}
+
+
+def _add_months(value: date, months: int) -> date:
+    index = value.year * 12 + value.month - 1 + months
+    return date(index // 12, index % 12 + 1, 1)
+
+
+def _create_month_partitions(table: str, first: date, last: date) -> None:
+    month = date(first.year, first.month, 1)
+    while month <= last:
+        op.execute(
+            f'CREATE TABLE "{table}_p{month:%Y_%m}" PARTITION OF "{table}" '
+            f"FOR VALUES FROM ('{month.isoformat()}') TO ('{_add_months(month, 1).isoformat()}')"
+        )
+        month = _add_months(month, 1)
+    op.execute(f'CREATE TABLE "{table}_default" PARTITION OF "{table}" DEFAULT')
+
+
+def _convert(table: str, partitioned: set) -> None:
+    bind = op.get_bind()
+    legacy = f'{table}_unpartitioned'
+    foreign_keys = sa.inspect(bind).get_foreign_keys(table)
+
+    op.rename_table(table, legacy)
+    op.execute(
+        f'CREATE TABLE "{table}" (LIKE "{legacy}" INCLUDING DEFAULTS INCLUDING CONSTRAINTS '
+        f'INCLUDING GENERATED INCLUDING STORAGE) PARTITION BY RANGE (created_at)'
+    )
+    # パーティションキーを含まない一意制約は作れないため、主キーは (id, created_at)
+    op.create_primary_key(f'pk_{table}', table, ['id', 'created_at'])
+
+    # 外部キーを付け直す（パーティション分割した表の id だけを参照する外部キーは作れないので外す）
+    for fk in foreign_keys:
+        if fk['referred_table'] in partitioned:
+            continue
+        op.create_foreign_key(
+            fk['name'], table, fk['referred_table'],
+            fk['constrained_columns'], fk['referred_columns'],
+            ondelete=fk['options'].get('ondelete'),
+        )
+
+    # serial の id ならシーケンスの所有者を新しいテーブルに移す（旧テーブル削除で消えないように）
+    sequence = bind.execute(sa.text("SELECT pg_get_serial_sequence(:table, 'id')"), {'table': legacy}).scalar()
+    if sequence:
+        op.execute(f'ALTER SEQUENCE {sequence} OWNED BY "{table}".id')
+
+    first = bind.execute(sa.text(f'SELECT min(created_at) FROM "{legacy}"')).scalar() or datetime.utcnow()
+    _create_month_partitions(table, first.date(), _add_months(date.today(), MONTHS_AHEAD))
+
+    op.execute(f'INSERT INTO "{table}" SELECT * FROM "{legacy}"')
+    op.drop_table(legacy)
+
+    for name, columns, where in PARTITIONED_INDEXES[table]:
+        op.create_index(
+            name, table, columns,
+            postgresql_where=sa.text(where) if where else None,
+        )
+
+
+def _revert(table: str) -> None:
+    bind = op.get_bind()
+    partitioned = f'{table}_partitioned'
+    foreign_keys = sa.inspect(bind).get_foreign_keys(table)
+
+    op.rename_table(table, partitioned)
+    op.execute(
+        f'CREATE TABLE "{table}" (LIKE "{partitioned}" INCLUDING DEFAULTS INCLUDING CONSTRAINTS '
+        f'INCLUDING GENERATED INCLUDING STORAGE)'
+    )
+    op.create_primary_key(f'{table}_pkey', table, ['id'])
+    for fk in foreign_keys:
+        op.create_foreign_key(
+            fk['name'], table, fk['referred_table'],
+            fk['constrained_columns'], fk['referred_columns'],
+            ondelete=fk['options'].get('ondelete'),
+        )
+    sequence = bind.execute(sa.text("SELECT pg_get_serial_sequence(:table, 'id')"), {'table': partitioned}).scalar()
+    if sequence:
+        op.execute(f'ALTER SEQUENCE {sequence} OWNED BY "{table}".id')
+    op.execute(f'INSERT INTO "{table}" SELECT * FROM "{partitioned}"')
+    op.drop_table(partitioned)
+    for name, columns, where in PARTITIONED_INDEXES[table]:
+        op.create_index(name, table, columns, postgresql_where=sa.text(where) if where else None)
+
+
+def upgrade() -> None:
+    # 通知の一意な重複排除キーは分割後の通知テーブルに持てないため別テーブルへ
+    op.create_table(
+        'notification_dedup_keys',
+        sa.Column('dedup_key', sa.String(length=64), primary_key=True),
+        sa.Column('notification_id', postgresql.UUID(as_uuid=True), nullable=False),
+        sa.Column('notification_created_at', sa.DateTime(timezone=True), nullable=False),
+    )
+    op.create_index(
+        'ix_notification_dedup_keys_notification_created_at',
+        'notification_dedup_keys',
+        ['notification_created_at'],
+    )
+    op.execute(
+        "INSERT INTO notification_dedup_keys (dedup_key, notification_id, notification_created_at) "
+        "SELECT DISTINCT ON (dedup_key) dedup_key, id, created_at FROM notifications "
+        "WHERE dedup_key IS NOT NULL ORDER BY dedup_key, created_at DESC"
+    )
+    op.drop_index('uq_notifications_dedup_key', table_name='notifications')
+
+    op.create_table(
+        'notification_retention_policies',
+        sa.Column(
+            'tenant_id', postgresql.UUID(as_uuid=True),
+            sa.ForeignKey('tenants.id', ondelete='CASCADE'), primary_key=True
+        ),
+        sa.Column('retention_days', sa.Integer(), nullable=False),
+        sa.Column('read_retention_days', sa.Integer(), nullable=True),
+        sa.Column('created_at', sa.DateTime(timezone=True), server_default=sa.func.now(), nullable=False),
+        sa.Column('updated_at', sa.DateTime(timezone=True), server_default=sa.func.now(), nullable=False),
+    )
+
+    # 月単位のレンジパーティションへ移行（行数に比例して時間がかかるのでメンテナンス時間に実行する）
+    for table in PARTITIONED_TABLES:
+        _convert(table, set(PARTITIONED_TABLES))
+
+
+def downgrade() -> None:
+    for table in reversed(PARTITIONED_TABLES):
+        _revert(table)
+    # 配信ログ → 通知の外部キーは id 単独の主キーに戻った後で付け直す
+    op.create_foreign_key(
+        'notification_delivery_logs_notification_id_fkey', 'notification_delivery_logs', 'notifications',
+        ['notification_id'], ['id'],
+    )
+
+    op.drop_table('notification_retention_policies')
+
+    # キーを引き継がなかった古い通知のキーは外してから一意インデックスを作る
+    op.execute(
+        "UPDATE notifications SET dedup_key = NULL WHERE dedup_key IS NOT NULL AND id NOT IN "
+        "(SELECT notification_id FROM notification_dedup_keys)"
+    )
+    op.create_index(
+        'uq_notifications_dedup_key',
+        'notifications',
+        ['dedup_key'],
+        unique=True,
+        postgresql_where=sa.text('dedup_key IS NOT NULL'),
+    )
+    op.drop_table('notification_dedup_keys')
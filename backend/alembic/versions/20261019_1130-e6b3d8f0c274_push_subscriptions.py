@@ -0,0 +1,45 @@
+"""push subscriptions
+
+Revision ID: e6b3d8f0c274
+Revises: a92f6c1d8e35
+Create Date: 2026-10-19 11:30:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+
+# revision identifiers, used by Alembic.
+revision = 'e6b3d8f0c274'
+down_revision = 'a92f6c1d8e35'
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    # Web Push の購読（ブラウザ・端末ごと。endpoint で一意）
+    op.create_table(
+        'push_subscriptions',
+        sa.Column('id', postgresql.UUID(as_uuid=True), primary_key=True),
+        sa.Column(
+            'tenant_id', postgresql.UUID(as_uuid=True),
+            sa.ForeignKey('tenants.id', ondelete='CASCADE'), nullable=False
+        ),
+        sa.Column(
+            'user_id', postgresql.UUID(as_uuid=True),
+            sa.ForeignKey('users.id', ondelete='CASCADE'), nullable=False
+        ),
+        sa.Column('endpoint', sa.Text(), nullable=False, unique=True),
+        sa.Column('p256dh', sa.String(length=128), nullable=False),
+        sa.Column('auth', sa.String(length=64), nullable=False),
+        sa.Column('user_agent', sa.String(length=255), nullable=True),
+        sa.Column('created_at', sa.DateTime(timezone=True), server_default=sa.func.now(), nullable=False),
+        sa.Column('updated_at', sa.DateTime(timezone=True), server_default=sa.func.now(), nullable=False),
+    )
+    op.create_index('ix_push_subscriptions_user_id', 'push_subscriptions', ['user_id'])
+
+
+def downgrade() -> None:
+    op.drop_index('ix_push_subscriptions_user_id', table_name='push_subscriptions')
+    op.drop_table('push_subscriptions')
@@ -0,0 +1,63 @@
+"""notification delivery retries and dead letters
+
+Revision ID: 7c2d9e4a1f53
+Revises: e6b3d8f0c274
+Create Date: 2026-10-19 12:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+
+# revision identifiers, used by Alembic.
+revision = '7c2d9e4a1f53'
+down_revision = 'e6b3d8f0c274'
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    # 配信の再送待ち（通知はパーティション分割しているため外部キーなし）
+    op.create_table(
+        'notification_delivery_retries',
+        sa.Column('id', postgresql.UUID(as_uuid=True), primary_key=True),
+        sa.Column('notification_id', postgresql.UUID(as_uuid=True), nullable=False),
+        sa.Column('tenant_id', postgresql.UUID(as_uuid=True), nullable=False),
+        sa.Column('recipient_id', postgresql.UUID(as_uuid=True), nullable=False),
+        sa.Column('channel', sa.String(length=20), nullable=False),
+        sa.Column('attempts', sa.Integer(), nullable=False),
+        sa.Column('next_attempt_at', sa.DateTime(timezone=True), nullable=False),
+        sa.Column('last_error', sa.Text(), nullable=True),
+        sa.Column('created_at', sa.DateTime(timezone=True), server_default=sa.func.now(), nullable=False),
+        sa.Column('updated_at', sa.DateTime(timezone=True), server_default=sa.func.now(), nullable=False),
+        sa.UniqueConstraint(
+            'notification_id', 'channel', name='uq_notification_delivery_retries_notification_channel'
+        ),
+    )
+    op.create_index('ix_notification_delivery_retries_due', 'notification_delivery_retries', ['next_attempt_at'])
+    op.create_index(
+        'ix_notification_delivery_retries_recipient', 'notification_delivery_retries', ['recipient_id', 'channel']
+    )
+
+    # 再送を諦めた配信
+    op.create_table(
+        'notification_dead_letters',
+        sa.Column('id', postgresql.UUID(as_uuid=True), primary_key=True),
+        sa.Column('notification_id', postgresql.UUID(as_uuid=True), nullable=False),
+        sa.Column('tenant_id', postgresql.UUID(as_uuid=True), nullable=False),
+        sa.Column('recipient_id', postgresql.UUID(as_uuid=True), nullable=False),
+        sa.Column('channel', sa.String(length=20), nullable=False),
+        sa.Column('attempts', sa.Integer(), nullable=False),
+        sa.Column('last_error', sa.Text(), nullable=True),
+        sa.Column('failed_at', sa.DateTime(timezone=True), server_default=sa.func.now(), nullable=False),
+    )
+    op.create_index('ix_notification_dead_letters_failed_at', 'notification_dead_letters', ['failed_at'])
+
+
+def downgrade() -> None:
+    op.drop_index('ix_notification_dead_letters_failed_at', table_name='notification_dead_letters')
+    op.drop_table('notification_dead_letters')
+    op.drop_index('ix_notification_delivery_retries_recipient', table_name='notification_delivery_retries')
+    op.drop_index('ix_notification_delivery_retries_due', table_name='notification_delivery_retries')
+    op.drop_table('notification_delivery_retries')
@@ -0,0 +1,37 @@
+"""task updated_at index
+
+Revision ID: 0f4a7b2c8d16
+Revises: 7c2d9e4a1f53
+Create Date: 2026-10-19 12:30:00.000000
+
+"""
+from alembic import op
+
+
+# revision identifiers, used by Alembic.
+revision = '0f4a7b2c8d16'
+down_revision = '7c2d9e4a1f53'
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    # フィーチャーストアの増分更新（updated_at > ウォーターマーク の変更キー抽出と max(updated_at)）用
+    # project_id, stage_code を INCLUDE してインデックスオンリースキャンにする
+    with op.get_context().autocommit_block():
+        op.create_index(
+            'ix_tasks_updated_at',
+            'tasks',
+            ['updated_at'],
+            postgresql_include=['project_id', 'stage_code'],
+            postgresql_concurrently=True,
+        )
+
+
+def downgrade() -> None:
+    with op.get_context().autocommit_block():
+        op.drop_index(
+            'ix_tasks_updated_at',
+            table_name='tasks',
+            postgresql_concurrently=True,
+        )
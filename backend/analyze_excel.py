@@ -11,6 +11,8 @@ import openpyxl
 import sys
 from pathlib import Path
 
+from app.services.workbook_structure import detect_structure
+
 def analyze_excel_file(file_path, file_description):
     """Analyze a single Excel file and return detailed information"""
     print(f"\n{'='*80}")
@@ -47,12 +49,13 @@ def analyze_excel_file(file_path, file_description):
                 for i, row in df.head(10).iterrows():
                     print(f"Row {i}: {list(row.values)}")
                 
-                # Try to identify header row by looking for common patterns
-                potential_headers = []
-                for i in range(min(5, len(df))):
-                    row_values = [str(val).strip() if pd.notna(val) else '' for val in df.iloc[i]]
-                    if any(keyword in ''.join(row_values).lower() for keyword in ['項目', 'todo', '営業', '設計', 'ic', '追客', '契約', '打ち合わせ', '施工', '竣工']):
-                        potential_headers.append((i, row_values))
+                # Detect header rows, keywords, date columns and project cells in one vectorized pass
+                structure = detect_structure(df)
+                
+                potential_headers = [
+                    (i, [str(val).strip() if pd.notna(val) else '' for val in df.iloc[i]])
+                    for i in structure.header_rows if i < 5
+                ]
                 
                 if potential_headers:
                     print(f"\nPotential header rows found:")
@@ -63,45 +66,17 @@ def analyze_excel_file(file_path, file_description):
                 workflow_stages = ['追客', '契約', '打ち合わせ', '施工', '竣工']
                 roles = ['営業', '設計', 'IC']
                 
-                found_stages = []
-                found_roles = []
-                
-                for i, row in df.iterrows():
-                    row_text = ' '.join([str(val) for val in row.values if pd.notna(val)])
-                    for stage in workflow_stages:
-                        if stage in row_text and stage not in found_stages:
-                            found_stages.append(stage)
-                    for role in roles:
-                        if role in row_text and role not in found_roles:
-                            found_roles.append(role)
+                found_stages = [stage for stage in workflow_stages if stage in structure.keywords]
+                found_roles = [role for role in roles if role in structure.keywords]
                 
                 print(f"\nWorkflow stages found: {found_stages}")
                 print(f"Roles found: {found_roles}")
                 
-                # Look for date patterns
-                date_columns = []
-                for col in range(df.shape[1]):
-                    col_data = df.iloc[:, col].dropna()
-                    if len(col_data) > 0:
-                        # Check if column contains dates
-                        date_like_count = 0
-                        for val in col_data.head(20):
-                            val_str = str(val)
-                            if any(char in val_str for char in ['/', '-', '月', '日', '年']):
-                                date_like_count += 1
-                        if date_like_count > len(col_data) * 0.3:  # 30% threshold
-                            date_columns.append(col)
-                
+                date_columns = structure.date_columns
                 print(f"Potential date columns: {date_columns}")
                 
                 # Look for project identifiers
-                project_patterns = []
-                for i, row in df.head(20).iterrows():
-                    for j, val in enumerate(row.values):
-                        if pd.notna(val):
-                            val_str = str(val)
-                            if any(pattern in val_str for pattern in ['プロジェクト', '案件', 'PJ', '工事', '現場']):
-                                project_patterns.append((i, j, val_str))
+                project_patterns = [cell for cell in structure.project_cells if cell[0] < 20]
                 
                 if project_patterns:
                     print(f"Project-related patterns found:")
@@ -115,6 +90,7 @@ def analyze_excel_file(file_path, file_description):
                     'roles': found_roles,
                     'date_columns': date_columns,
                     'project_patterns': project_patterns,
+                    'stage_columns': structure.stage_columns,
                     'sample_data': df.head().to_dict()
                 }
                 
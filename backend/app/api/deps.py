@@ -1,14 +1,16 @@
-from typing import AsyncGenerator, Optional
+from typing import AsyncGenerator, Generator, Optional
 from fastapi import Depends, HTTPException, status
+from fastapi.requests import HTTPConnection
 from fastapi.security import OAuth2PasswordBearer
 from jose import jwt, JWTError
 from pydantic import ValidationError
 from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import Session
 from sqlalchemy import select
 
 from app.core import security
 from app.core.config import settings
-from app.db.session import AsyncSessionLocal
+from app.db.session import AsyncSessionLocal, SessionLocal, read_replica_router
 from app.models.user import User
 from app.schemas.token import TokenPayload
 
@@ -17,7 +19,23 @@ reusable_oauth2 = OAuth2PasswordBearer(
 )
 
 
-async def get_db() -> AsyncGenerator[AsyncSession, None]:
+def _request_user_key(connection: HTTPConnection) -> Optional[str]:
+    """
+    Authorization ヘッダーのトークンからユーザーIDを取り出す（DBアクセスなし）
+    """
+    scheme, _, token = connection.headers.get("Authorization", "").partition(" ")
+    if scheme.lower() != "bearer" or not token:
+        return None
+    try:
+        payload = jwt.decode(
+            token, settings.SECRET_KEY, algorithms=[settings.ALGORITHM]
+        )
+    except JWTError:
+        return None
+    return payload.get("sub")
+
+
+async def get_db(connection: HTTPConnection) -> AsyncGenerator[AsyncSession, None]:
     """
     データベースセッションの依存関数
     """
@@ -25,9 +43,41 @@ async def get_db() -> AsyncGenerator[AsyncSession, None]:
         try:
             yield session
         finally:
+            # 書き込みを行ったユーザーは一定時間プライマリから読む（read-your-writes）
+            if session.info.get("has_writes"):
+                read_replica_router.record_write(_request_user_key(connection))
             await session.close()
 
 
+def get_sync_db(connection: HTTPConnection) -> Generator[Session, None, None]:
+    """
+    同期セッションの依存関数（NotificationService など同期のサービスを呼ぶハンドラー用）
+    """
+    with SessionLocal() as session:
+        try:
+            yield session
+        finally:
+            if session.info.get("has_writes"):
+                read_replica_router.record_write(_request_user_key(connection))
+
+
+async def get_read_db(connection: HTTPConnection) -> AsyncGenerator[AsyncSession, None]:
+    """
+    参照専用ハンドラー用のデータベースセッションの依存関数
+    DATABASE_READ_URLS が設定されていればリードレプリカを使用する
+    """
+    async with read_replica_router.session(_request_user_key(connection)) as session:
+        yield session
+
+
+def get_read_sync_db(connection: HTTPConnection) -> Generator[Session, None, None]:
+    """
+    get_read_db の同期版（同期のサービスを呼ぶ参照専用ハンドラー用）
+    """
+    with read_replica_router.sync_session(_request_user_key(connection)) as session:
+        yield session
+
+
 async def get_current_user(
     db: AsyncSession = Depends(get_db),
     token: str = Depends(reusable_oauth2)
@@ -1,6 +1,6 @@
 from fastapi import APIRouter
 
-from app.api.v1.endpoints import auth, users, projects, tasks, notifications
+from app.api.v1.endpoints import auth, users, projects, tasks, notifications, master_data
 
 api_router = APIRouter()
 
@@ -8,4 +8,5 @@ api_router.include_router(auth.router, prefix="/auth", tags=["authentication"])
 api_router.include_router(users.router, prefix="/users", tags=["users"])
 api_router.include_router(projects.router, prefix="/projects", tags=["projects"])
 api_router.include_router(tasks.router, prefix="/tasks", tags=["tasks"])
-api_router.include_router(notifications.router, prefix="/notifications", tags=["notifications"])
\ No newline at end of file
+api_router.include_router(notifications.router, prefix="/notifications", tags=["notifications"])
+api_router.include_router(master_data.router, prefix="/master-data", tags=["master-data"])
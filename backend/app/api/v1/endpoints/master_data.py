@@ -0,0 +1,40 @@
+import logging
+from typing import Optional
+from fastapi import APIRouter, Depends, Header, Response
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.api.deps import get_current_active_user, get_read_db
+from app.db.session import AsyncSessionLocal
+from app.models.user import User
+from app.services.master_data import master_data_registry
+
+logger = logging.getLogger(__name__)
+
+router = APIRouter()
+
+
+@router.on_event("startup")
+async def load_master_data_registry():
+    """起動時にマスターデータを読み込む（失敗時は initial_data の定義のまま起動）"""
+    try:
+        async with AsyncSessionLocal() as db:
+            await master_data_registry.refresh(db, force=True)
+    except Exception as e:
+        logger.warning(f"Failed to load master data at startup: {e}")
+
+
+@router.get("/")
+async def read_master_data(
+    if_none_match: Optional[str] = Header(None),
+    db: AsyncSession = Depends(get_read_db),
+    current_user: User = Depends(get_current_active_user)
+):
+    """
+    フェーズ・ステージ・ロールのマスターデータ
+    レジストリのスナップショットをそのまま返す。変更がなければ 304（If-None-Match）
+    """
+    snapshot = await master_data_registry.refresh(db)
+    headers = {"ETag": snapshot.etag, "Cache-Control": "private, no-cache"}
+    if if_none_match and snapshot.etag in [tag.strip() for tag in if_none_match.split(",")]:
+        return Response(status_code=304, headers=headers)
+    return Response(content=snapshot.payload, media_type="application/json", headers=headers)
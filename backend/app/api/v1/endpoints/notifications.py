@@ -4,9 +4,11 @@ from uuid import UUID
 from fastapi import APIRouter, Depends, HTTPException, Query, WebSocket, WebSocketDisconnect
 from sqlalchemy.orm import Session
 
-from app.api.deps import get_current_active_user, get_db
+from app.api.deps import get_current_active_user, get_read_sync_db, get_sync_db
 from app.models.user import User
 from app.services.notification_service import NotificationService, ConstructionNotificationHelpers
+from app.services.notification_retention import NotificationRetentionManager, RetentionPolicy
+from app.services import web_push
 from app.services.websocket_manager import notification_websocket_handler
 from app.schemas.notification import (
     NotificationCreate,
@@ -17,6 +19,11 @@ from app.schemas.notification import (
     NotificationPreferencesUpdate,
     NotificationPreferencesResponse,
     NotificationStats,
+    NotificationMarkRead,
+    NotificationMarkReadResponse,
+    NotificationRetentionPolicy,
+    PushSubscriptionCreate,
+    PushSubscriptionDelete,
     TaskAssignedNotification,
     TaskDeadlineNotification,
     StageCompletedNotification,
@@ -36,7 +43,7 @@ async def get_notifications(
     unread_only: bool = Query(False),
     type_filter: Optional[str] = Query(None),
     priority_filter: Optional[str] = Query(None),
-    db: Session = Depends(get_db),
+    db: Session = Depends(get_read_sync_db),
     current_user: User = Depends(get_current_active_user)
 ):
     """通知一覧を取得"""
@@ -73,7 +80,7 @@ async def get_notifications(
 @router.get("/{notification_id}", response_model=NotificationResponse)
 async def get_notification(
     notification_id: UUID,
-    db: Session = Depends(get_db),
+    db: Session = Depends(get_read_sync_db),
     current_user: User = Depends(get_current_active_user)
 ):
     """通知詳細を取得"""
@@ -88,11 +95,36 @@ async def get_notification(
     return NotificationResponse.from_orm(notification)
 
 
+# 一括既読
+@router.patch("/read", response_model=NotificationMarkReadResponse)
+async def mark_notifications_as_read(
+    body: NotificationMarkRead,
+    db: Session = Depends(get_sync_db),
+    current_user: User = Depends(get_current_active_user)
+):
+    """指定した通知（と up_to 以前に作成された通知）をまとめて既読にする"""
+    if not body.notification_ids and body.up_to is None:
+        raise HTTPException(status_code=400, detail="notification_ids または up_to を指定してください")
+    
+    service = NotificationService(db)
+    notification_ids, read_at = service.mark_read_batch(
+        current_user.id, current_user.tenant_id, body.notification_ids, body.up_to
+    )
+    # 他のタブ・端末の表示も更新する
+    await notification_websocket_handler.send_read_receipt(str(current_user.id), notification_ids, read_at)
+    
+    return NotificationMarkReadResponse(
+        updated=len(notification_ids),
+        notification_ids=notification_ids,
+        read_at=read_at
+    )
+
+
 # 通知既読
 @router.patch("/{notification_id}/read", response_model=NotificationResponse)
 async def mark_notification_as_read(
     notification_id: UUID,
-    db: Session = Depends(get_db),
+    db: Session = Depends(get_sync_db),
     current_user: User = Depends(get_current_active_user)
 ):
     """通知を既読にする"""
@@ -110,7 +142,7 @@ async def mark_notification_as_read(
 # 全通知既読
 @router.patch("/mark-all-read")
 async def mark_all_notifications_as_read(
-    db: Session = Depends(get_db),
+    db: Session = Depends(get_sync_db),
     current_user: User = Depends(get_current_active_user)
 ):
     """全通知を既読にする"""
@@ -124,7 +156,7 @@ async def mark_all_notifications_as_read(
 @router.delete("/{notification_id}")
 async def delete_notification(
     notification_id: UUID,
-    db: Session = Depends(get_db),
+    db: Session = Depends(get_sync_db),
     current_user: User = Depends(get_current_active_user)
 ):
     """通知を削除"""
@@ -142,7 +174,7 @@ async def delete_notification(
 # 通知統計
 @router.get("/stats/summary", response_model=NotificationStats)
 async def get_notification_stats(
-    db: Session = Depends(get_db),
+    db: Session = Depends(get_read_sync_db),
     current_user: User = Depends(get_current_active_user)
 ):
     """通知統計を取得"""
@@ -153,7 +185,7 @@ async def get_notification_stats(
 # 通知設定取得
 @router.get("/preferences/me", response_model=NotificationPreferencesResponse)
 async def get_my_notification_preferences(
-    db: Session = Depends(get_db),
+    db: Session = Depends(get_sync_db),
     current_user: User = Depends(get_current_active_user)
 ):
     """自分の通知設定を取得"""
@@ -176,7 +208,7 @@ async def get_my_notification_preferences(
 @router.patch("/preferences/me", response_model=NotificationPreferencesResponse)
 async def update_my_notification_preferences(
     preferences_update: NotificationPreferencesUpdate,
-    db: Session = Depends(get_db),
+    db: Session = Depends(get_sync_db),
     current_user: User = Depends(get_current_active_user)
 ):
     """自分の通知設定を更新"""
@@ -188,6 +220,65 @@ async def update_my_notification_preferences(
     return NotificationPreferencesResponse.from_orm(preferences)
 
 
+# Web Push
+@router.get("/push/vapid-public-key")
+async def get_vapid_public_key(
+    current_user: User = Depends(get_current_active_user)
+):
+    """購読登録（pushManager.subscribe の applicationServerKey）に使う公開鍵"""
+    public_key = web_push.vapid_public_key()
+    if not public_key:
+        raise HTTPException(status_code=404, detail="Web Push は設定されていません")
+    return {"public_key": public_key}
+
+
+@router.post("/push/subscriptions", status_code=201)
+async def subscribe_push(
+    subscription: PushSubscriptionCreate,
+    db: Session = Depends(get_sync_db),
+    current_user: User = Depends(get_current_active_user)
+):
+    """この端末の Web Push 購読を登録"""
+    try:
+        valid_keys = (
+            len(web_push.b64url_decode(subscription.keys.p256dh)) == 65
+            and len(web_push.b64url_decode(subscription.keys.auth)) == 16
+        )
+    except ValueError:
+        valid_keys = False
+    if not valid_keys:
+        raise HTTPException(status_code=400, detail="購読の鍵が不正です")
+    subscription_id = web_push.save_subscription(
+        db,
+        current_user.id,
+        current_user.tenant_id,
+        str(subscription.endpoint),
+        subscription.keys.p256dh,
+        subscription.keys.auth,
+        subscription.user_agent
+    )
+    if subscription_id is None:
+        raise HTTPException(status_code=409, detail="この endpoint は別のユーザーに登録されています")
+    return {"id": subscription_id}
+
+
+@router.delete("/push/subscriptions")
+async def unsubscribe_push(
+    subscription: PushSubscriptionDelete,
+    db: Session = Depends(get_sync_db),
+    current_user: User = Depends(get_current_active_user)
+):
+    """この端末の Web Push 購読を解除"""
+    if not web_push.delete_subscription(db, current_user.id, str(subscription.endpoint)):
+        raise HTTPException(status_code=404, detail="購読が見つかりません")
+    return {"message": "購読を解除しました"}
+
+
+@router.on_event("shutdown")
+async def close_push_client():
+    await web_push.close_web_push_sender()
+
+
 # WebSocket接続
 @router.websocket("/ws")
 async def websocket_endpoint(
@@ -196,7 +287,7 @@ async def websocket_endpoint(
 ):
     """通知用WebSocket接続"""
     await notification_websocket_handler.handle_connection(
-        websocket, str(current_user.id)
+        websocket, str(current_user.id), str(current_user.tenant_id)
     )
 
 
@@ -205,11 +296,11 @@ async def websocket_endpoint(
 @router.post("/construction/task-assigned")
 async def notify_task_assigned(
     notification_data: TaskAssignedNotification,
-    db: Session = Depends(get_db),
+    db: Session = Depends(get_sync_db),
     current_user: User = Depends(get_current_active_user)
 ):
     """タスク割り当て通知を送信"""
-    service = NotificationService(db)
+    service = NotificationService(db, wait_for_delivery=False)
     helpers = ConstructionNotificationHelpers(service)
     
     notification = await helpers.notify_task_assigned(
@@ -228,11 +319,11 @@ async def notify_task_assigned(
 @router.post("/construction/task-deadline")
 async def notify_task_deadline(
     notification_data: TaskDeadlineNotification,
-    db: Session = Depends(get_db),
+    db: Session = Depends(get_sync_db),
     current_user: User = Depends(get_current_active_user)
 ):
     """タスク期限通知を送信"""
-    service = NotificationService(db)
+    service = NotificationService(db, wait_for_delivery=False)
     helpers = ConstructionNotificationHelpers(service)
     
     notification = await helpers.notify_task_deadline(
@@ -251,11 +342,11 @@ async def notify_task_deadline(
 @router.post("/construction/stage-completed")
 async def notify_stage_completed(
     notification_data: StageCompletedNotification,
-    db: Session = Depends(get_db),
+    db: Session = Depends(get_sync_db),
     current_user: User = Depends(get_current_active_user)
 ):
     """ステージ完了通知を送信"""
-    service = NotificationService(db)
+    service = NotificationService(db, wait_for_delivery=False)
     
     notification_create = NotificationCreateBulk(
         type="stage_completed",
@@ -284,11 +375,11 @@ async def notify_stage_completed(
 @router.post("/construction/stage-delayed")
 async def notify_stage_delayed(
     notification_data: StageDelayedNotification,
-    db: Session = Depends(get_db),
+    db: Session = Depends(get_sync_db),
     current_user: User = Depends(get_current_active_user)
 ):
     """ステージ遅延通知を送信"""
-    service = NotificationService(db)
+    service = NotificationService(db, wait_for_delivery=False)
     helpers = ConstructionNotificationHelpers(service)
     
     notifications = await helpers.notify_stage_delayed(
@@ -308,11 +399,11 @@ async def notify_stage_delayed(
 @router.post("/construction/handoff-request")
 async def notify_handoff_request(
     notification_data: HandoffRequestNotification,
-    db: Session = Depends(get_db),
+    db: Session = Depends(get_sync_db),
     current_user: User = Depends(get_current_active_user)
 ):
     """引き継ぎ要求通知を送信"""
-    service = NotificationService(db)
+    service = NotificationService(db, wait_for_delivery=False)
     
     notification_create = NotificationCreateBulk(
         type="handoff_request",
@@ -341,11 +432,11 @@ async def notify_handoff_request(
 @router.post("/construction/bottleneck-alert")
 async def notify_bottleneck_alert(
     notification_data: BottleneckAlertNotification,
-    db: Session = Depends(get_db),
+    db: Session = Depends(get_sync_db),
     current_user: User = Depends(get_current_active_user)
 ):
     """ボトルネック警告通知を送信"""
-    service = NotificationService(db)
+    service = NotificationService(db, wait_for_delivery=False)
     helpers = ConstructionNotificationHelpers(service)
     
     notifications = await helpers.notify_bottleneck_alert(
@@ -365,7 +456,7 @@ async def notify_bottleneck_alert(
 async def broadcast_system_message(
     message: str,
     user_ids: Optional[List[UUID]] = None,
-    db: Session = Depends(get_db),
+    db: Session = Depends(get_sync_db),
     current_user: User = Depends(get_current_active_user)
 ):
     """システムメッセージをブロードキャスト（管理者のみ）"""
@@ -392,4 +483,34 @@ async def get_online_users(
     return {
         "online_users": active_users,
         "count": len(active_users)
-    }
\ No newline at end of file
+    }
+
+
+@router.get("/admin/retention", response_model=NotificationRetentionPolicy)
+async def get_retention_policy(
+    db: Session = Depends(get_sync_db),
+    current_user: User = Depends(get_current_active_user)
+):
+    """自テナントの通知保持期間を取得（管理者のみ）"""
+    if not current_user.is_superuser:
+        raise HTTPException(status_code=403, detail="管理者権限が必要です")
+
+    policy = NotificationRetentionManager(db).get_policy(current_user.tenant_id)
+    return NotificationRetentionPolicy(**vars(policy))
+
+
+@router.put("/admin/retention", response_model=NotificationRetentionPolicy)
+async def update_retention_policy(
+    policy: NotificationRetentionPolicy,
+    db: Session = Depends(get_sync_db),
+    current_user: User = Depends(get_current_active_user)
+):
+    """自テナントの通知保持期間を設定（管理者のみ）"""
+    if not current_user.is_superuser:
+        raise HTTPException(status_code=403, detail="管理者権限が必要です")
+
+    NotificationRetentionManager(db).set_policy(
+        current_user.tenant_id,
+        RetentionPolicy(policy.retention_days, policy.read_retention_days)
+    )
+    return policy
@@ -1,37 +1,159 @@
-from typing import List
-from fastapi import APIRouter, Depends, HTTPException
+from datetime import date, datetime
+from typing import List, Literal, Optional
+from uuid import UUID
+from fastapi import APIRouter, Depends, HTTPException, Query
+from fastapi.responses import StreamingResponse
+from sqlalchemy.exc import IntegrityError
 from sqlalchemy.ext.asyncio import AsyncSession
 
-from app.db.session import AsyncSessionLocal
+from app.api.deps import get_current_active_user, get_db, get_read_db
+from app.models.user import User
+from app.schemas.project import (
+    Project,
+    ProjectBatchCreate,
+    ProjectBatchCreateResponse,
+    ProjectCreate,
+    ProjectListResponse,
+    ProjectTree,
+)
+from app.schemas.task import Task
+from app.services.project_export import ProjectExporter
+from app.services.project_materializer import ProjectMaterializer
+from app.services.project_service import InvalidCursorError, ProjectService
 
 router = APIRouter()
 
 
-async def get_db():
-    async with AsyncSessionLocal() as session:
-        yield session
+@router.get("/", response_model=ProjectListResponse)
+async def read_projects(
+    status: Optional[List[str]] = Query(None),
+    customer_name: Optional[str] = Query(None, description="顧客名（前方一致）"),
+    code: Optional[str] = Query(None, description="工事コード（前方一致）"),
+    start_date_from: Optional[date] = Query(None),
+    start_date_to: Optional[date] = Query(None),
+    cursor: Optional[str] = Query(None, description="前ページの next_cursor"),
+    limit: int = Query(50, ge=1, le=200),
+    db: AsyncSession = Depends(get_read_db),
+    current_user: User = Depends(get_current_active_user)
+):
+    """プロジェクト一覧を取得（更新日時の新しい順）"""
+    service = ProjectService(db)
+    try:
+        projects, next_cursor = await service.list_projects(
+            tenant_id=current_user.tenant_id,
+            statuses=status,
+            customer_name=customer_name,
+            code=code,
+            start_date_from=start_date_from,
+            start_date_to=start_date_to,
+            cursor=cursor,
+            limit=limit
+        )
+    except InvalidCursorError:
+        raise HTTPException(status_code=400, detail="Invalid cursor")
 
+    return ProjectListResponse(items=projects, next_cursor=next_cursor)
 
-@router.get("/")
-async def read_projects(
-    skip: int = 0,
-    limit: int = 100,
-    db: AsyncSession = Depends(get_db)
+
+EXPORT_MEDIA_TYPES = {
+    "csv": "text/csv; charset=utf-8",
+    "xlsx": "application/vnd.openxmlformats-officedocument.spreadsheetml.sheet",
+}
+
+
+@router.get("/export", response_class=StreamingResponse)
+async def export_projects(
+    format: Literal["csv", "xlsx"] = Query("csv"),
+    db: AsyncSession = Depends(get_read_db),
+    current_user: User = Depends(get_current_active_user)
 ):
-    # TODO: Implement project list logic
-    return []
+    """プロジェクト × ステージの一覧を CSV / XLSX で出力（ストリーミング）"""
+    exporter = ProjectExporter(db)
+    if format == "xlsx":
+        body = exporter.iter_xlsx(current_user.tenant_id)
+    else:
+        body = exporter.iter_csv(current_user.tenant_id)
+
+    filename = f"projects_{datetime.utcnow():%Y%m%d}.{format}"
+    return StreamingResponse(
+        body,
+        media_type=EXPORT_MEDIA_TYPES[format],
+        headers={"Content-Disposition": f'attachment; filename="{filename}"'}
+    )
 
 
-@router.get("/{project_id}")
-async def read_project(project_id: str, db: AsyncSession = Depends(get_db)):
-    # TODO: Implement project retrieval logic
-    return {"id": project_id, "name": "Sample Project"}
+@router.get("/{project_id}", response_model=Project)
+async def read_project(
+    project_id: UUID,
+    db: AsyncSession = Depends(get_read_db),
+    current_user: User = Depends(get_current_active_user)
+):
+    """プロジェクト詳細を取得"""
+    service = ProjectService(db)
+    project = await service.get_project(current_user.tenant_id, project_id)
+    if not project:
+        raise HTTPException(status_code=404, detail="Project not found")
+    return project
+
 
+@router.get(
+    "/{project_id}/tree",
+    response_class=StreamingResponse,
+    responses={200: {"model": ProjectTree, "content": {"application/json": {}}}}
+)
+async def read_project_tree(
+    project_id: UUID,
+    db: AsyncSession = Depends(get_read_db),
+    current_user: User = Depends(get_current_active_user)
+):
+    """プロジェクトのフェーズ・ステージ・タスクのツリーを取得（固定回数のクエリ）"""
+    service = ProjectService(db)
+    tree = await service.get_project_tree(current_user.tenant_id, project_id)
+    if not tree:
+        raise HTTPException(status_code=404, detail="Project not found")
+    return StreamingResponse(tree.iter_json(), media_type="application/json")
+
+
+@router.post("/", response_model=Project, status_code=201)
+async def create_project(
+    project_in: ProjectCreate,
+    db: AsyncSession = Depends(get_db),
+    current_user: User = Depends(get_current_active_user)
+):
+    """プロジェクトを作成し、全ステージの標準タスクを生成"""
+    materializer = ProjectMaterializer(db)
+    try:
+        project_id = await materializer.create_project(
+            current_user.tenant_id, current_user.id, project_in
+        )
+    except IntegrityError:
+        await db.rollback()
+        raise HTTPException(status_code=409, detail="Project code already exists")
+
+    return await ProjectService(db).get_project(current_user.tenant_id, project_id)
+
+
+@router.post("/import", response_model=ProjectBatchCreateResponse, status_code=201)
+async def import_projects(
+    batch: ProjectBatchCreate,
+    db: AsyncSession = Depends(get_db),
+    current_user: User = Depends(get_current_active_user)
+):
+    """複数プロジェクトを一括作成（1トランザクション）"""
+    materializer = ProjectMaterializer(db)
+    try:
+        result = await materializer.create_projects(
+            current_user.tenant_id, current_user.id, batch.projects
+        )
+    except IntegrityError:
+        await db.rollback()
+        raise HTTPException(status_code=409, detail="Project code already exists")
 
-@router.post("/")
-async def create_project(db: AsyncSession = Depends(get_db)):
-    # TODO: Implement project creation logic
-    return {"id": "new-project-id", "name": "New Project"}
+    return ProjectBatchCreateResponse(
+        created=len(result.project_ids),
+        task_count=result.task_count,
+        project_ids=result.project_ids
+    )
 
 
 @router.put("/{project_id}")
@@ -40,10 +162,12 @@ async def update_project(project_id: str, db: AsyncSession = Depends(get_db)):
     return {"id": project_id, "name": "Updated Project"}
 
 
-@router.get("/{project_id}/tasks")
+@router.get("/{project_id}/tasks", response_model=List[Task])
 async def read_project_tasks(
-    project_id: str,
-    db: AsyncSession = Depends(get_db)
+    project_id: UUID,
+    db: AsyncSession = Depends(get_read_db),
+    current_user: User = Depends(get_current_active_user)
 ):
-    # TODO: Implement project tasks retrieval logic
-    return []
\ No newline at end of file
+    """プロジェクトのタスク一覧を取得"""
+    service = ProjectService(db)
+    return await service.get_project_tasks(current_user.tenant_id, project_id)
\ No newline at end of file
@@ -1,29 +1,61 @@
-from typing import List
-from fastapi import APIRouter, Depends, HTTPException
+from typing import List, Optional
+from fastapi import APIRouter, Depends, Header, HTTPException, Response
 from sqlalchemy.ext.asyncio import AsyncSession
 
-from app.db.session import AsyncSessionLocal
+from app.api.deps import get_current_active_user, get_db, get_read_db
+from app.models.user import User
+from app.schemas.task import MyTasksResponse, TaskBulkUpdate, TaskBulkUpdateResponse
+from app.services.task_service import TaskService, local_today
 
 router = APIRouter()
 
 
-async def get_db():
-    async with AsyncSessionLocal() as session:
-        yield session
+@router.get("/", response_model=MyTasksResponse)
+async def read_my_tasks(
+    response: Response,
+    if_none_match: Optional[str] = Header(None),
+    db: AsyncSession = Depends(get_read_db),
+    current_user: User = Depends(get_current_active_user)
+):
+    """
+    自分の未完了タスクを期限別（期限切れ / 今日 / 今後7日以内）に取得
+    変更がなければ 304 を返す（If-None-Match）
+    """
+    service = TaskService(db)
+    today = local_today()
+
+    etag = await service.get_my_tasks_etag(current_user.tenant_id, current_user.id, today)
+    headers = {"ETag": etag, "Cache-Control": "private, no-cache"}
+    if if_none_match and etag in [tag.strip() for tag in if_none_match.split(",")]:
+        return Response(status_code=304, headers=headers)
+
+    buckets = await service.get_my_tasks(current_user.tenant_id, current_user.id, today)
+    response.headers.update(headers)
+    return MyTasksResponse(**buckets)
 
 
-@router.get("/")
-async def read_tasks(
-    skip: int = 0,
-    limit: int = 100,
-    db: AsyncSession = Depends(get_db)
+@router.patch("/bulk", response_model=TaskBulkUpdateResponse)
+async def bulk_update_tasks(
+    bulk_update: TaskBulkUpdate,
+    db: AsyncSession = Depends(get_db),
+    current_user: User = Depends(get_current_active_user)
 ):
-    # TODO: Implement task list logic
-    return []
+    """複数タスクを1トランザクションで更新（点検後の進捗一括入力など）"""
+    task_ids = [item.id for item in bulk_update.items]
+    if len(set(task_ids)) != len(task_ids):
+        raise HTTPException(status_code=400, detail="Duplicate task ids")
+
+    service = TaskService(db)
+    results = await service.bulk_update(current_user.tenant_id, bulk_update.items)
+
+    return TaskBulkUpdateResponse(
+        results=results,
+        updated_count=sum(1 for result in results if result.status == "updated")
+    )
 
 
 @router.get("/{task_id}")
-async def read_task(task_id: str, db: AsyncSession = Depends(get_db)):
+async def read_task(task_id: str, db: AsyncSession = Depends(get_read_db)):
     # TODO: Implement task retrieval logic
     return {"id": task_id, "name": "Sample Task"}
 
@@ -9,10 +9,21 @@ class Settings(BaseSettings):
     APP_VERSION: str = "0.9.0"
     DEBUG: bool = False
     API_V1_STR: str = "/api/v1"
+    # 期限日など日付の区切りに使うタイムゾーン
+    APP_TIMEZONE: str = "Asia/Tokyo"
     
     # Database
     DATABASE_URL: str
     DATABASE_SYNC_URL: str
+    DATABASE_READ_URLS: List[str] = []
+    READ_REPLICA_HEALTH_CHECK_INTERVAL: int = 10
+    READ_YOUR_WRITES_WINDOW_SECONDS: int = 5
+    
+    # Query instrumentation
+    QUERY_INSTRUMENTATION_ENABLED: bool = False
+    SLOW_REQUEST_QUERY_COUNT: int = 30
+    SLOW_REQUEST_DB_TIME_MS: int = 200
+    N_PLUS_ONE_THRESHOLD: int = 5
     
     # Security
     SECRET_KEY: str
@@ -39,11 +50,54 @@ class Settings(BaseSettings):
     # ML Model
     MODEL_RETRAIN_SCHEDULE: str = "0 2 * * *"
     PREDICTION_THRESHOLD_DAYS: int = 3
+    MODEL_REGISTRY_DIR: str = "models"
+    MODEL_REGISTRY_KEEP_VERSIONS: int = 5
+    FEATURE_STORE_DIR: str = "feature_store"
+    FEATURE_STORE_MAX_PARTITIONS: int = 32
+    FEATURE_STORE_REBUILD_HOURS: int = 24
+    
+    # Notifications
+    DEADLINE_SCAN_INTERVAL_SECONDS: int = 900
+    NOTIFICATION_DEDUP_WINDOW_MINUTES: int = 60
+    NOTIFICATION_MARK_READ_WINDOW_SECONDS: float = 0.25
+    NOTIFICATION_DELIVERY_CONCURRENCY: int = 32
+    NOTIFICATION_WEBSOCKET_RATE_PER_SECOND: float = 500.0
+    NOTIFICATION_EMAIL_RATE_PER_SECOND: float = 10.0
+    NOTIFICATION_PUSH_RATE_PER_SECOND: float = 100.0
+    NOTIFICATION_TENANT_RATE_PER_SECOND: float = 50.0
+    NOTIFICATION_RATE_BURST_SECONDS: float = 2.0
+    NOTIFICATION_RETRY_INTERVAL_SECONDS: int = 60
+    NOTIFICATION_RETRY_BATCH_SIZE: int = 200
+    NOTIFICATION_RECONNECT_RETRY_HOURS: int = 72
+    
+    # Web Push
+    WEB_PUSH_VAPID_PRIVATE_KEY: Optional[str] = None
+    WEB_PUSH_VAPID_SUBJECT: str = "mailto:admin@example.com"
+    WEB_PUSH_TTL_SECONDS: int = 86400
+    WEB_PUSH_CONCURRENCY: int = 50
+    WEB_PUSH_TIMEOUT_SECONDS: float = 10.0
+    WEB_PUSH_HTTP2: bool = True
+    # 購読を受け付けるプッシュサービスのホスト（サブドメインも可）。空なら公開アドレスのホストすべて
+    WEB_PUSH_ALLOWED_HOSTS: List[str] = [
+        "fcm.googleapis.com",
+        "updates.push.services.mozilla.com",
+        "push.apple.com",
+        "notify.windows.com",
+    ]
+    NOTIFICATION_RETENTION_DAYS: int = 180
+    NOTIFICATION_READ_RETENTION_DAYS: Optional[int] = 90
+    NOTIFICATION_DELIVERY_LOG_RETENTION_DAYS: int = 90
+    NOTIFICATION_PARTITION_MONTHS_AHEAD: int = 3
+    NOTIFICATION_PURGE_CHUNK_SIZE: int = 5000
+    NOTIFICATION_PURGE_SCHEDULE: str = "30 3 * * *"
+    
+    # Master data
+    MASTER_DATA_VERSION_CHECK_SECONDS: float = 30.0
     
     # CORS
     BACKEND_CORS_ORIGINS: List[str] = []
     
-    @validator("BACKEND_CORS_ORIGINS", pre=True)
+    @validator("BACKEND_CORS_ORIGINS", "DATABASE_READ_URLS", "WEB_PUSH_ALLOWED_HOSTS", pre=True)
     def assemble_cors_origins(cls, v: Union[str, List[str]]) -> List[str]:
         if isinstance(v, str) and not v.startswith("["):
             return [i.strip() for i in v.split(",")]
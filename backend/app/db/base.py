@@ -1,9 +1,13 @@
 from sqlalchemy.ext.declarative import declarative_base
-from sqlalchemy import Column, DateTime, func
+from sqlalchemy import JSON, Column, DateTime, func
+from sqlalchemy.dialects.postgresql import JSONB
 from datetime import datetime
 
 Base = declarative_base()
 
+# PostgreSQL では JSONB（テストの SQLite では JSON）
+JSONVariant = JSON().with_variant(JSONB(), "postgresql")
+
 
 class TimestampMixin:
     created_at = Column(
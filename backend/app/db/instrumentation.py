@@ -0,0 +1,158 @@
+"""
+SQLAlchemy クエリ計測
+- リクエスト単位でクエリ数・DB時間・ステートメント別の実行回数を集計
+- 閾値を超えたリクエストをログに出力
+- 同一ステートメントがパラメータ違いで繰り返し実行される N+1 パターンを検出
+"""
+
+import logging
+import re
+import time
+from functools import lru_cache
+from contextvars import ContextVar
+from typing import Any, Dict, List, Optional, Tuple
+
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+
+logger = logging.getLogger(__name__)
+
+_current_stats: ContextVar[Optional["QueryStats"]] = ContextVar("query_stats", default=None)
+_enabled = False
+
+# IN 句などで展開されたプレースホルダー列、数値・文字列リテラル
+_PLACEHOLDER_LIST_RE = re.compile(r"\(\s*(?:\?|%s|%\(\w+\)s|\$\d+|:\w+)(?:\s*,\s*(?:\?|%s|%\(\w+\)s|\$\d+|:\w+))+\s*\)")
+_LITERAL_RE = re.compile(r"'(?:[^']|'')*'|\b\d+(?:\.\d+)?\b")
+_WHITESPACE_RE = re.compile(r"\s+")
+
+
+@lru_cache(maxsize=2048)
+def fingerprint(statement: str) -> str:
+    """パラメータやリテラルの違いを無視したステートメントの指紋"""
+    normalized = _PLACEHOLDER_LIST_RE.sub("(?+)", statement)
+    normalized = _LITERAL_RE.sub("?", normalized)
+    return _WHITESPACE_RE.sub(" ", normalized).strip()
+
+
+class _StatementStats:
+    __slots__ = ("count", "total_time", "parameter_sets")
+
+    def __init__(self):
+        self.count = 0
+        self.total_time = 0.0
+        self.parameter_sets: set = set()
+
+
+class QueryStats:
+    """1リクエスト分のクエリ統計"""
+
+    def __init__(self):
+        self.query_count = 0
+        self.total_time = 0.0
+        self.statements: Dict[str, _StatementStats] = {}
+
+    def record(self, statement: str, parameters: Any, duration: float):
+        self.query_count += 1
+        self.total_time += duration
+
+        key = fingerprint(statement)
+        stats = self.statements.get(key)
+        if stats is None:
+            stats = self.statements[key] = _StatementStats()
+        stats.count += 1
+        stats.total_time += duration
+        stats.parameter_sets.add(hash(repr(parameters)))
+
+    @property
+    def total_time_ms(self) -> float:
+        return self.total_time * 1000
+
+    def repeated_statements(self, threshold: int) -> List[Tuple[str, int]]:
+        """パラメータ違いで threshold 回以上実行されたステートメント（N+1 候補）"""
+        return sorted(
+            (
+                (statement, stats.count)
+                for statement, stats in self.statements.items()
+                if stats.count >= threshold and len(stats.parameter_sets) > 1
+            ),
+            key=lambda item: item[1],
+            reverse=True
+        )
+
+
+def get_query_stats() -> Optional[QueryStats]:
+    """現在のリクエストのクエリ統計（計測外なら None）"""
+    return _current_stats.get()
+
+
+def start_query_stats() -> QueryStats:
+    """現在のコンテキストで計測を開始する（リクエスト外のジョブやテスト用）"""
+    stats = QueryStats()
+    _current_stats.set(stats)
+    return stats
+
+
+def is_enabled() -> bool:
+    return _enabled
+
+
+def _before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    if _current_stats.get() is not None:
+        conn.info.setdefault("query_start_time", []).append(time.perf_counter())
+
+
+def _after_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    stats = _current_stats.get()
+    start_times = conn.info.get("query_start_time")
+    if stats is None or not start_times:
+        return
+    stats.record(statement, parameters, time.perf_counter() - start_times.pop())
+
+
+def install_query_instrumentation(engine: Engine):
+    """エンジンにカーソル実行フックを登録する（AsyncEngine は sync_engine を渡す）"""
+    global _enabled
+    if not event.contains(engine, "before_cursor_execute", _before_cursor_execute):
+        event.listen(engine, "before_cursor_execute", _before_cursor_execute)
+        event.listen(engine, "after_cursor_execute", _after_cursor_execute)
+    _enabled = True
+
+
+class QueryStatsMiddleware:
+    """
+    リクエストごとにクエリ統計を収集するASGIミドルウェア
+    install_query_instrumentation が呼ばれていない場合は何もしない
+    """
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http" or not _enabled:
+            await self.app(scope, receive, send)
+            return
+
+        stats = QueryStats()
+        token = _current_stats.set(stats)
+        try:
+            await self.app(scope, receive, send)
+        finally:
+            _current_stats.reset(token)
+            self._report(scope, stats)
+
+    def _report(self, scope, stats: QueryStats):
+        from app.core.config import settings
+
+        path = f"{scope.get('method', '')} {scope.get('path', '')}"
+
+        if (stats.query_count >= settings.SLOW_REQUEST_QUERY_COUNT or
+                stats.total_time_ms >= settings.SLOW_REQUEST_DB_TIME_MS):
+            logger.warning(
+                f"Slow request {path}: {stats.query_count} queries, "
+                f"{stats.total_time_ms:.1f}ms in DB"
+            )
+
+        for statement, count in stats.repeated_statements(settings.N_PLUS_ONE_THRESHOLD):
+            logger.warning(
+                f"Possible N+1 in {path}: statement executed {count} times: {statement[:200]}"
+            )
@@ -1,8 +1,34 @@
+import itertools
+import logging
+import time
+from contextlib import asynccontextmanager, contextmanager
+from typing import AsyncIterator, Dict, Iterator, List, Optional
+
 from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker, create_async_engine
-from sqlalchemy.orm import sessionmaker
-from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker, Session
+from sqlalchemy import create_engine, event, make_url, text
+from sqlalchemy.exc import InterfaceError, OperationalError
 
 from app.core.config import settings
+from app.db.instrumentation import install_query_instrumentation
+
+logger = logging.getLogger(__name__)
+
+
+class PrimarySession(Session):
+    """書き込みの有無を info["has_writes"] に記録するセッション"""
+
+
+@event.listens_for(PrimarySession, "do_orm_execute")
+def _track_orm_write(orm_execute_state):
+    if not orm_execute_state.is_select:
+        orm_execute_state.session.info["has_writes"] = True
+
+
+@event.listens_for(PrimarySession, "after_flush")
+def _track_flush_write(session, flush_context):
+    session.info["has_writes"] = True
+
 
 # Async engine for FastAPI
 async_engine = create_async_engine(
@@ -14,6 +40,7 @@ async_engine = create_async_engine(
 AsyncSessionLocal = async_sessionmaker(
     async_engine,
     class_=AsyncSession,
+    sync_session_class=PrimarySession,
     expire_on_commit=False
 )
 
@@ -26,5 +53,198 @@ sync_engine = create_engine(
 SessionLocal = sessionmaker(
     autocommit=False,
     autoflush=False,
-    bind=sync_engine
-)
\ No newline at end of file
+    bind=sync_engine,
+    class_=PrimarySession
+)
+
+
+def sync_url(url: str) -> str:
+    """非同期ドライバーの URL を同期ドライバー（既定のドライバー）の URL にする"""
+    parsed = make_url(url)
+    return parsed.set(drivername=parsed.get_backend_name()).render_as_string(hide_password=False)
+
+
+class _Replica:
+    def __init__(self, url: str):
+        self.url = url
+        self.engine = create_async_engine(url, echo=settings.DEBUG, future=True)
+        self.sessionmaker = async_sessionmaker(
+            self.engine,
+            class_=AsyncSession,
+            expire_on_commit=False
+        )
+        # 同期サービス（NotificationService など）用。接続は初回利用時に作られる
+        self.sync_engine = create_engine(sync_url(url), echo=settings.DEBUG)
+        self.sync_sessionmaker = sessionmaker(
+            autocommit=False,
+            autoflush=False,
+            bind=self.sync_engine
+        )
+        self.healthy = True
+        self.checked_at = 0.0
+
+
+class ReadReplicaRouter:
+    """
+    参照系クエリをリードレプリカへ振り分けるルーター
+    - ラウンドロビンでレプリカを選択
+    - ヘルスチェックに失敗したレプリカは一定時間スキップ
+    - 利用可能なレプリカがない場合はプライマリへフォールバック
+    - 自身の書き込み直後（read-your-writes ウィンドウ内）はプライマリを使用
+    """
+
+    def __init__(
+        self,
+        primary_sessionmaker: async_sessionmaker,
+        replica_urls: List[str],
+        health_check_interval: float,
+        read_your_writes_window: float,
+        primary_sync_sessionmaker: Optional[sessionmaker] = None
+    ):
+        self.primary_sessionmaker = primary_sessionmaker
+        self.primary_sync_sessionmaker = primary_sync_sessionmaker
+        self.replicas = [_Replica(url) for url in replica_urls]
+        self.health_check_interval = health_check_interval
+        self.read_your_writes_window = read_your_writes_window
+        self._cycle = itertools.count()
+        # ユーザーキー -> 最終書き込み時刻（monotonic）
+        self._recent_writes: Dict[str, float] = {}
+
+    def record_write(self, key: Optional[str]):
+        """ユーザーの書き込みを記録する"""
+        if not key or not self.replicas:
+            return
+        now = time.monotonic()
+        self._recent_writes[key] = now
+
+        # 期限切れのエントリを掃除
+        if len(self._recent_writes) > 10000:
+            cutoff = now - self.read_your_writes_window
+            self._recent_writes = {
+                k: t for k, t in self._recent_writes.items() if t > cutoff
+            }
+
+    def has_recent_write(self, key: Optional[str]) -> bool:
+        """read-your-writes ウィンドウ内に書き込みがあるか"""
+        if not key:
+            return False
+        written_at = self._recent_writes.get(key)
+        if written_at is None:
+            return False
+        return time.monotonic() - written_at < self.read_your_writes_window
+
+    def mark_unhealthy(self, replica: _Replica):
+        replica.healthy = False
+        replica.checked_at = time.monotonic()
+
+    def _cached_health(self, replica: _Replica) -> Optional[bool]:
+        """health_check_interval 内ならキャッシュした結果、期限切れなら None（チェック時刻は更新する）"""
+        now = time.monotonic()
+        if now - replica.checked_at < self.health_check_interval:
+            return replica.healthy
+        replica.checked_at = now
+        return None
+
+    def _record_health(self, replica: _Replica, error: Optional[Exception]) -> bool:
+        if error is not None:
+            logger.warning(f"Read replica {replica.engine.url!r} health check failed: {error}")
+            replica.healthy = False
+        else:
+            if not replica.healthy:
+                logger.info(f"Read replica {replica.engine.url!r} is healthy again")
+            replica.healthy = True
+        return replica.healthy
+
+    async def _is_healthy(self, replica: _Replica) -> bool:
+        """ヘルスチェック（結果は health_check_interval の間キャッシュ）"""
+        cached = self._cached_health(replica)
+        if cached is not None:
+            return cached
+        try:
+            async with replica.engine.connect() as conn:
+                await conn.execute(text("SELECT 1"))
+        except Exception as e:
+            return self._record_health(replica, e)
+        return self._record_health(replica, None)
+
+    def _is_healthy_sync(self, replica: _Replica) -> bool:
+        """同期エンジンでのヘルスチェック（結果は非同期側と共有）"""
+        cached = self._cached_health(replica)
+        if cached is not None:
+            return cached
+        try:
+            with replica.sync_engine.connect() as conn:
+                conn.execute(text("SELECT 1"))
+        except Exception as e:
+            return self._record_health(replica, e)
+        return self._record_health(replica, None)
+
+    def _rotation(self, key: Optional[str]) -> List[_Replica]:
+        """試す順のレプリカ（書き込み直後のユーザーは空 = プライマリ）"""
+        if not self.replicas or self.has_recent_write(key):
+            return []
+        start = next(self._cycle)
+        return [
+            self.replicas[(start + offset) % len(self.replicas)]
+            for offset in range(len(self.replicas))
+        ]
+
+    async def choose(self, key: Optional[str] = None) -> Optional[_Replica]:
+        """使用するレプリカを選択（None の場合はプライマリを使用）"""
+        for replica in self._rotation(key):
+            if await self._is_healthy(replica):
+                return replica
+        return None
+
+    def choose_sync(self, key: Optional[str] = None) -> Optional[_Replica]:
+        """choose の同期版"""
+        for replica in self._rotation(key):
+            if self._is_healthy_sync(replica):
+                return replica
+        return None
+
+    @asynccontextmanager
+    async def session(self, key: Optional[str] = None) -> AsyncIterator[AsyncSession]:
+        """参照用セッションを開く（レプリカ優先、なければプライマリ）"""
+        replica = await self.choose(key)
+        factory = replica.sessionmaker if replica else self.primary_sessionmaker
+
+        async with factory() as session:
+            try:
+                yield session
+            except (OperationalError, InterfaceError):
+                # 接続障害のレプリカは次回のヘルスチェックまで除外
+                if replica:
+                    self.mark_unhealthy(replica)
+                raise
+
+    @contextmanager
+    def sync_session(self, key: Optional[str] = None) -> Iterator[Session]:
+        """参照用の同期セッションを開く（レプリカ優先、なければプライマリ）"""
+        replica = self.choose_sync(key)
+        factory = replica.sync_sessionmaker if replica else self.primary_sync_sessionmaker
+
+        with factory() as session:
+            try:
+                yield session
+            except (OperationalError, InterfaceError):
+                if replica:
+                    self.mark_unhealthy(replica)
+                raise
+
+
+read_replica_router = ReadReplicaRouter(
+    AsyncSessionLocal,
+    settings.DATABASE_READ_URLS,
+    health_check_interval=settings.READ_REPLICA_HEALTH_CHECK_INTERVAL,
+    read_your_writes_window=settings.READ_YOUR_WRITES_WINDOW_SECONDS,
+    primary_sync_sessionmaker=SessionLocal
+)
+
+# クエリ計測（オプトイン）
+if settings.QUERY_INSTRUMENTATION_ENABLED:
+    install_query_instrumentation(async_engine.sync_engine)
+    install_query_instrumentation(sync_engine)
+    for replica in read_replica_router.replicas:
+        install_query_instrumentation(replica.engine.sync_engine)
+        install_query_instrumentation(replica.sync_engine)
@@ -1,10 +1,15 @@
 from fastapi import FastAPI, HTTPException
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.responses import PlainTextResponse
 from pydantic import BaseModel
 
+from app.core.metrics import TimedJSONResponse, TimingMiddleware, registry
+from app.db.instrumentation import QueryStatsMiddleware
+
 app = FastAPI(
     title="Construction Todo System",
-    version="0.9.0"
+    version="0.9.0",
+    default_response_class=TimedJSONResponse
 )
 
 # CORS設定（一時的に全て許可）
@@ -16,6 +21,12 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
+# クエリ計測（QUERY_INSTRUMENTATION_ENABLED=True の場合のみ有効）
+app.add_middleware(QueryStatsMiddleware)
+
+# レイテンシ計測・Server-Timing ヘッダー（最外側で計測するため最後に追加）
+app.add_middleware(TimingMiddleware)
+
 # 一時的に最低限の設定で起動
 # from app.core.config import settings
 # from app.api.v1.api import api_router
@@ -38,6 +49,13 @@ def health_check():
 def api_health_check():
     return {"status": "healthy", "api": "v1"}
 
+@app.get("/metrics", include_in_schema=False)
+def metrics():
+    return PlainTextResponse(
+        registry.render(),
+        media_type="text/plain; version=0.0.4; charset=utf-8"
+    )
+
 # Pydanticモデル定義
 class LoginRequest(BaseModel):
     username: str
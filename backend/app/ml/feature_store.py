@@ -0,0 +1,315 @@
+"""
+遅延予測用の増分フィーチャーストア
+- (プロジェクト, ステージ) ごとのタスク集計を列指向の .npy パーティションとして保存
+      <FEATURE_STORE_DIR>/stage_features/manifest.json
+      <FEATURE_STORE_DIR>/stage_features/<partition>/<column>.npy
+- 更新は tasks.updated_at のウォーターマーク以降に変更されたタスクを変更イベントとして扱い、
+  影響を受けたキーだけを再集計して新しいパーティションに追記する（同じキーは後のパーティションが優先）
+  変更キーの抽出は ix_tasks_updated_at（updated_at INCLUDE project_id, stage_code）のインデックスオンリースキャン
+- assignee_load は他のキーのタスクの変更（担当者の付け替え・完了）でも変わるため行には保存しない。
+  行にはキーのタスクの担当者を保存し、更新のたびに数え直す担当者ごとの未完了タスク数（マニフェスト）と
+  読み込み時に結合する
+- タスクの削除は変更として読めないため、FEATURE_STORE_REBUILD_HOURS ごとに全件から作り直す
+- パーティション数が上限を超えたら1つに圧縮する
+"""
+
+import json
+import logging
+import os
+import shutil
+import tempfile
+from datetime import datetime, timedelta, timezone
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Sequence, Tuple
+
+import numpy as np
+import pandas as pd
+from sqlalchemy import func, select, tuple_
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.core.config import settings
+from app.ml.features import STAGE_FRAME_COLUMNS
+from app.models import Task
+from app.models.project import Project
+from app.services.task_service import TASK_STATUS_DONE
+
+logger = logging.getLogger(__name__)
+
+MANIFEST_FILE = "manifest.json"
+
+KEY_COLUMNS = ["project_id", "stage_code"]
+
+TASK_ROW_COLUMNS = [
+    "tenant_id", "project_id", "project_name", "created_by_id", "project_start_date",
+    "stage_code", "assignee_id", "status", "created_at", "due_date", "completed_at",
+]
+
+# 保存する列: assignee_load の代わりにキーのタスクの担当者（タスクごと、カンマ区切り）
+STORE_COLUMNS = [column for column in STAGE_FRAME_COLUMNS if column != "assignee_load"] + ["assignee_ids"]
+
+# 列ごとの保存形式（.npy は pickle なしで読めるよう固定長文字列/数値/日時のみ）
+STRING_COLUMNS = ("tenant_id", "project_id", "project_name", "created_by_id", "stage_code", "assignee_ids")
+DATETIME_COLUMNS = ("project_start_date", "first_created_at", "planned_due_date", "last_completed_at")
+INT_COLUMNS = ("task_count", "open_task_count", "rework_count")
+
+# 長いトランザクションのコミット遅れで取りこぼさないよう、ウォーターマークより少し前から読み直す
+WATERMARK_OVERLAP = timedelta(minutes=5)
+KEY_CHUNK_SIZE = 1000
+
+
+def aggregate_stage_tasks(tasks: pd.DataFrame) -> pd.DataFrame:
+    """
+    タスク行を (プロジェクト, ステージ) ごとに集計（キーのタスクだけで決まる列のみ）
+    - rework_count: 完了日時が記録されているのに未完了に戻されたタスク数
+    - assignee_ids: タスクの担当者（タスクごと。未割り当ては除く）
+    """
+    if tasks.empty:
+        return pd.DataFrame(columns=STORE_COLUMNS)
+
+    is_open = (tasks["status"] != TASK_STATUS_DONE).to_numpy()
+    data = tasks.assign(
+        is_open=is_open.astype(np.int64),
+        is_rework=(is_open & tasks["completed_at"].notna().to_numpy()).astype(np.int64),
+        assignee_ids=tasks["assignee_id"].map(str, na_action="ignore"),
+    )
+    aggregated = data.groupby(KEY_COLUMNS, sort=False).agg(
+        tenant_id=("tenant_id", "first"),
+        project_name=("project_name", "first"),
+        created_by_id=("created_by_id", "first"),
+        project_start_date=("project_start_date", "first"),
+        task_count=("status", "size"),
+        open_task_count=("is_open", "sum"),
+        rework_count=("is_rework", "sum"),
+        assignee_ids=("assignee_ids", lambda ids: ",".join(ids.dropna())),
+        first_created_at=("created_at", "min"),
+        planned_due_date=("due_date", "max"),
+        last_completed_at=("completed_at", "max"),
+    )
+    return aggregated.reset_index()[STORE_COLUMNS]
+
+
+def assignee_load(assignee_ids: pd.Series, assignee_open_counts: Dict[str, float]) -> np.ndarray:
+    """キーのタスクの担当者が抱える未完了タスク数（テナント全体）の平均（未完了タスクのない担当者は除く）"""
+    loads = assignee_ids.str.split(",").explode().map(assignee_open_counts).astype(float)
+    return loads.groupby(level=0).mean().reindex(assignee_ids.index).to_numpy(dtype=np.float64)
+
+
+def _to_array(frame: pd.DataFrame, column: str) -> np.ndarray:
+    values = frame[column]
+    if column in STRING_COLUMNS:
+        return values.fillna("").astype(str).to_numpy(dtype=np.str_)
+    if column in DATETIME_COLUMNS:
+        return pd.to_datetime(values).to_numpy(dtype="datetime64[ns]")
+    if column in INT_COLUMNS:
+        return values.to_numpy(dtype=np.int64)
+    return values.to_numpy(dtype=np.float64)
+
+
+class FeatureStore:
+    def __init__(self, name: str = "stage_features", root: Optional[str] = None):
+        self.path = Path(root or settings.FEATURE_STORE_DIR) / name
+
+    # --- マニフェスト ---
+
+    def _read_manifest(self) -> Dict[str, Any]:
+        try:
+            return json.loads((self.path / MANIFEST_FILE).read_text())
+        except FileNotFoundError:
+            return {
+                "partitions": [], "watermark": None, "next_partition": 0,
+                "rebuilt_at": None, "assignee_open_counts": {},
+            }
+
+    def _write_manifest(self, manifest: Dict[str, Any]):
+        tmp = self.path / f".{MANIFEST_FILE}.tmp"
+        tmp.write_text(json.dumps(manifest, indent=2))
+        os.replace(tmp, self.path / MANIFEST_FILE)
+
+    @property
+    def watermark(self) -> Optional[datetime]:
+        value = self._read_manifest()["watermark"]
+        return datetime.fromisoformat(value) if value else None
+
+    @property
+    def partitions(self) -> List[str]:
+        return self._read_manifest()["partitions"]
+
+    def rebuild_due(self, now: datetime) -> bool:
+        """全件からの作り直しが必要か（未作成・旧形式・前回から FEATURE_STORE_REBUILD_HOURS 経過）"""
+        rebuilt_at = self._read_manifest().get("rebuilt_at")
+        if rebuilt_at is None:
+            return True
+        return now - datetime.fromisoformat(rebuilt_at) >= timedelta(hours=settings.FEATURE_STORE_REBUILD_HOURS)
+
+    # --- 読み書き ---
+
+    def _write_partition(self, manifest: Dict[str, Any], frame: pd.DataFrame) -> str:
+        self.path.mkdir(parents=True, exist_ok=True)
+        partition = f"{manifest['next_partition']:06d}"
+        manifest["next_partition"] += 1
+
+        staging = Path(tempfile.mkdtemp(dir=self.path, prefix=".staging-"))
+        for column in STORE_COLUMNS:
+            np.save(staging / f"{column}.npy", _to_array(frame, column), allow_pickle=False)
+        os.replace(staging, self.path / partition)
+        return partition
+
+    def _read_partition(self, partition: str, columns: Sequence[str]) -> pd.DataFrame:
+        return pd.DataFrame({
+            column: np.load(self.path / partition / f"{column}.npy", mmap_mode="r", allow_pickle=False)
+            for column in columns
+        })
+
+    def append(
+        self,
+        frame: pd.DataFrame,
+        watermark: Optional[datetime],
+        replace: bool = False,
+        assignee_open_counts: Optional[Dict[str, float]] = None,
+        rebuilt_at: Optional[datetime] = None
+    ):
+        """
+        集計結果をパーティションとして追記（replace=True なら既存を置き換え）
+        assignee_open_counts（担当者ID -> 未完了タスク数）を渡すと置き換える。全件から作り直した場合は rebuilt_at を渡す
+        """
+        manifest = self._read_manifest()
+        old_partitions = manifest["partitions"] if replace else []
+        partition = self._write_partition(manifest, frame)
+        manifest["partitions"] = [partition] if replace else manifest["partitions"] + [partition]
+        if watermark is not None:
+            manifest["watermark"] = watermark.isoformat()
+        if assignee_open_counts is not None:
+            manifest["assignee_open_counts"] = assignee_open_counts
+        if rebuilt_at is not None:
+            manifest["rebuilt_at"] = rebuilt_at.isoformat()
+        self._write_manifest(manifest)
+        self._remove_partitions(old_partitions)
+
+        if len(manifest["partitions"]) > settings.FEATURE_STORE_MAX_PARTITIONS:
+            self.compact()
+
+    def read(self, columns: Sequence[str] = STAGE_FRAME_COLUMNS) -> pd.DataFrame:
+        """全パーティションを結合し、キーごとに最新の行を返す（assignee_load は読み込み時に計算）"""
+        manifest = self._read_manifest()
+        partitions = manifest["partitions"]
+        if not partitions:
+            return pd.DataFrame(columns=list(columns))
+        stored = [column for column in columns if column != "assignee_load"]
+        if "assignee_load" in columns:
+            stored.append("assignee_ids")
+        stored = list(dict.fromkeys([*KEY_COLUMNS, *stored]))
+        frame = pd.concat(
+            [self._read_partition(partition, stored) for partition in partitions],
+            ignore_index=True
+        )
+        if len(partitions) > 1:
+            frame = frame.drop_duplicates(KEY_COLUMNS, keep="last", ignore_index=True)
+        if "assignee_load" in columns:
+            frame["assignee_load"] = assignee_load(frame["assignee_ids"], manifest["assignee_open_counts"])
+        return frame[list(dict.fromkeys([*KEY_COLUMNS, *columns]))]
+
+    def compact(self):
+        """全パーティションを最新行のみの1パーティションにまとめる"""
+        manifest = self._read_manifest()
+        if len(manifest["partitions"]) <= 1:
+            return
+        self.append(self.read(STORE_COLUMNS), watermark=None, replace=True)
+
+    def _remove_partitions(self, partitions: Sequence[str]):
+        for partition in partitions:
+            shutil.rmtree(self.path / partition, ignore_errors=True)
+
+    # --- DBからの更新 ---
+
+    async def refresh(
+        self,
+        db: Optional[AsyncSession],
+        loader: Optional["TaskChangeLoader"] = None,
+        now: Optional[datetime] = None
+    ) -> int:
+        """
+        ウォーターマーク以降に変更されたタスクのキーだけ再集計して追記し、担当者ごとの未完了タスク数を数え直す
+        初回・作り直しの時期（rebuild_due）は全件を集計する。戻り値は書き込んだ行数
+        loader を渡すと db の代わりに使う（ベンチマーク用）
+        """
+        loader = loader or TaskChangeLoader(db)
+        now = now or datetime.now(timezone.utc)
+        watermark = self.watermark
+        if watermark is None or self.rebuild_due(now):
+            tasks, new_watermark = await loader.load_all()
+            frame = aggregate_stage_tasks(tasks)
+            self.append(frame, new_watermark, replace=True,
+                        assignee_open_counts=await loader.assignee_open_counts(), rebuilt_at=now)
+            logger.info(f"Built feature store from scratch: {len(frame)} stage rows")
+            return len(frame)
+
+        keys, new_watermark = await loader.changed_keys(watermark - WATERMARK_OVERLAP)
+        counts = await loader.assignee_open_counts()
+        if not keys:
+            manifest = self._read_manifest()
+            manifest["assignee_open_counts"] = counts
+            self._write_manifest(manifest)
+            return 0
+        frame = aggregate_stage_tasks(await loader.load_keys(keys))
+        self.append(frame, max(watermark, new_watermark), assignee_open_counts=counts)
+        logger.info(f"Appended {len(frame)} changed stage rows to feature store")
+        return len(frame)
+
+
+class TaskChangeLoader:
+    """フィーチャーストア更新用のタスク行の取得"""
+
+    def __init__(self, db: AsyncSession):
+        self.db = db
+
+    def _task_rows_query(self):
+        return (
+            select(
+                Task.tenant_id,
+                Task.project_id,
+                Project.name,
+                Project.created_by_id,
+                func.coalesce(Project.actual_start_date, Project.estimated_start_date),
+                Task.stage_code,
+                Task.assignee_id,
+                Task.status,
+                Task.created_at,
+                Task.due_date,
+                Task.completed_at,
+            )
+            .join(Project, Project.id == Task.project_id)
+        )
+
+    async def load_all(self) -> Tuple[pd.DataFrame, Optional[datetime]]:
+        watermark = (await self.db.execute(select(func.max(Task.updated_at)))).scalar()
+        result = await self.db.execute(self._task_rows_query())
+        return pd.DataFrame.from_records(result.all(), columns=TASK_ROW_COLUMNS), watermark
+
+    async def changed_keys(self, since: datetime) -> Tuple[List[Tuple[Any, str]], Optional[datetime]]:
+        """since 以降に更新されたタスクの (project_id, stage_code) と最大 updated_at"""
+        result = await self.db.execute(
+            select(Task.project_id, Task.stage_code, func.max(Task.updated_at))
+            .where(Task.updated_at > since)
+            .group_by(Task.project_id, Task.stage_code)
+        )
+        rows = result.all()
+        return [(row[0], row[1]) for row in rows], max((row[2] for row in rows), default=None)
+
+    async def load_keys(self, keys: Sequence[Tuple[Any, str]]) -> pd.DataFrame:
+        records = []
+        for start in range(0, len(keys), KEY_CHUNK_SIZE):
+            result = await self.db.execute(
+                self._task_rows_query()
+                .where(tuple_(Task.project_id, Task.stage_code).in_(keys[start:start + KEY_CHUNK_SIZE]))
+            )
+            records.extend(result.all())
+        return pd.DataFrame.from_records(records, columns=TASK_ROW_COLUMNS)
+
+    async def assignee_open_counts(self) -> Dict[str, float]:
+        """担当者ごとの未完了タスク数（部分インデックス ix_tasks_my_open_tasks を利用）"""
+        result = await self.db.execute(
+            select(Task.assignee_id, func.count())
+            .where(Task.assignee_id.isnot(None), Task.status != TASK_STATUS_DONE)
+            .group_by(Task.assignee_id)
+        )
+        return {str(assignee_id): float(count) for assignee_id, count in result.all()}
@@ -0,0 +1,129 @@
+"""
+遅延予測の特徴量
+- 入力は (プロジェクト, ステージ) 単位のタスク集計（app.ml.feature_store が増分更新）
+- 特徴量行列はベクトル演算のみで構築（float32）
+- 完了済みステージは学習データ（ラベル = 最終完了日 − 計画期限日）、
+  未完了ステージは予測対象
+- 予測は今日時点、学習は各ステージが進行中だったスナップショット日時点で特徴量を計算する
+  （学習時も今日基準にすると、経過日数が予測時と桁違いになる）
+- 未完了タスク数は現在の値しかなく、完了済みステージでは常に 0 になるため特徴量には使わない
+"""
+
+from datetime import date
+from typing import Optional, Tuple
+
+import numpy as np
+import pandas as pd
+
+from app.db.initial_data import STAGES
+
+STAGE_FRAME_COLUMNS = [
+    "tenant_id", "project_id", "project_name", "created_by_id", "project_start_date",
+    "stage_code", "task_count", "open_task_count", "rework_count", "assignee_load",
+    "first_created_at", "planned_due_date", "last_completed_at",
+]
+
+FEATURE_NAMES = [
+    "stage_order",
+    "is_milestone",
+    "task_count",
+    "stage_age_days",
+    "planned_span_days",
+    "days_to_planned_due",
+    "project_elapsed_days",
+    "prev_stage_delay_days",
+    "rework_count",
+    "assignee_load",
+]
+
+STAGE_ORDER = {stage["code"]: stage["display_order"] for stage in STAGES}
+MILESTONE_STAGES = {stage["code"] for stage in STAGES if stage.get("is_milestone")}
+
+
+def _dates(values: pd.Series, floor_to_day: bool = False) -> np.ndarray:
+    dates = pd.to_datetime(values).to_numpy(dtype="datetime64[ns]")
+    if floor_to_day:
+        dates = dates.astype("datetime64[D]").astype("datetime64[ns]")
+    return dates
+
+
+def _days(values: pd.Series, as_of: np.ndarray) -> np.ndarray:
+    """日付/日時の列を as_of（日付または行ごとの日付）からの経過日数に変換（欠損は NaN）"""
+    return (as_of - _dates(values)) / np.timedelta64(1, "D")
+
+
+def _delay(planned: np.ndarray, completed: np.ndarray, is_closed: np.ndarray, as_of: np.ndarray) -> np.ndarray:
+    """完了ステージは実績遅延、未完了ステージは as_of 時点の期限超過日数"""
+    actual = (completed - planned) / np.timedelta64(1, "D")
+    overdue = np.maximum(0, (as_of - planned) / np.timedelta64(1, "D"))
+    return np.where(is_closed, actual, overdue)
+
+
+def snapshot_dates(frame: pd.DataFrame) -> np.ndarray:
+    """学習用の基準日: ステージの作成から完了までの中間日（完了していなければ NaT）"""
+    created = _dates(frame["first_created_at"])
+    completed = _dates(frame["last_completed_at"])
+    return (created + (completed - created) / 2).astype("datetime64[D]").astype("datetime64[ns]")
+
+
+def build_features(frame: pd.DataFrame, today: Optional[date] = None) -> Tuple[np.ndarray, pd.DataFrame]:
+    """
+    特徴量行列（FEATURE_NAMES 順）と、行に対応するメタ情報を返す
+    today 時点で計算する（予測用）。省略すると各行のスナップショット日時点（学習用）
+    計画期限日のないステージは除外する
+    """
+    frame = frame[frame["planned_due_date"].notna()].copy()
+    frame["stage_order"] = frame["stage_code"].map(STAGE_ORDER).fillna(0).astype(float)
+    frame = frame.sort_values(["project_id", "stage_order"], kind="stable").reset_index(drop=True)
+    as_of = snapshot_dates(frame) if today is None else np.datetime64(today, "ns")
+
+    task_count = frame["task_count"].to_numpy(dtype=float)
+    stage_age = _days(frame["first_created_at"], as_of)
+    due_age = _days(frame["planned_due_date"], as_of)
+    project_elapsed = _days(frame["project_start_date"], as_of)
+
+    # ラベルは最終的な実績遅延
+    delay = _delay(
+        _dates(frame["planned_due_date"]),
+        _dates(frame["last_completed_at"], floor_to_day=True),
+        frame["open_task_count"].to_numpy() == 0,
+        as_of
+    )
+    # 直前ステージは as_of 時点で完了していたかで実績か期限超過かを分ける
+    previous = frame.groupby("project_id", sort=False)[
+        ["planned_due_date", "last_completed_at", "open_task_count"]
+    ].shift(1)
+    prev_completed = _dates(previous["last_completed_at"], floor_to_day=True)
+    prev_delay = _delay(
+        _dates(previous["planned_due_date"]),
+        prev_completed,
+        (previous["open_task_count"] == 0).to_numpy() & (prev_completed <= as_of),
+        as_of
+    )
+
+    features = np.column_stack([
+        frame["stage_order"].to_numpy(),
+        frame["stage_code"].isin(MILESTONE_STAGES).to_numpy(dtype=float),
+        task_count,
+        stage_age,
+        stage_age - due_age,
+        -due_age,
+        project_elapsed,
+        prev_delay,
+        frame["rework_count"].to_numpy(dtype=float),
+        frame["assignee_load"].to_numpy(dtype=float),
+    ]).astype(np.float32)
+    frame["delay_days"] = delay
+    return features, frame
+
+
+def split_training_rows(features: np.ndarray, meta: pd.DataFrame) -> Tuple[np.ndarray, np.ndarray]:
+    """完了済みステージ（ラベルあり）の特徴量とラベル"""
+    mask = ((meta["open_task_count"] == 0) & meta["last_completed_at"].notna()).to_numpy()
+    return features[mask], meta["delay_days"].to_numpy(dtype=np.float32)[mask]
+
+
+def split_open_rows(features: np.ndarray, meta: pd.DataFrame) -> Tuple[np.ndarray, pd.DataFrame]:
+    """未完了ステージ（予測対象）の特徴量とメタ情報"""
+    mask = (meta["open_task_count"] > 0).to_numpy()
+    return features[mask], meta[mask].reset_index(drop=True)
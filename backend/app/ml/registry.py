@@ -0,0 +1,70 @@
+"""
+モデルレジストリ（ディスク上のバージョン管理）
+    <MODEL_REGISTRY_DIR>/<name>/<version>/model.txt   LightGBM モデル（テキスト形式）
+    <MODEL_REGISTRY_DIR>/<name>/<version>/meta.json   特徴量名・評価指標など
+    <MODEL_REGISTRY_DIR>/<name>/LATEST                現在のバージョン（アトミックに置き換え）
+"""
+
+import json
+import os
+import shutil
+import tempfile
+from datetime import datetime
+from pathlib import Path
+from typing import Any, Dict, List, Optional
+
+from app.core.config import settings
+
+MODEL_FILE = "model.txt"
+META_FILE = "meta.json"
+LATEST_FILE = "LATEST"
+
+
+class ModelRegistry:
+    def __init__(self, name: str, root: Optional[str] = None):
+        self.name = name
+        self.path = Path(root or settings.MODEL_REGISTRY_DIR) / name
+
+    def versions(self) -> List[str]:
+        if not self.path.exists():
+            return []
+        return sorted(p.name for p in self.path.iterdir() if (p / META_FILE).exists())
+
+    def latest_version(self) -> Optional[str]:
+        try:
+            return (self.path / LATEST_FILE).read_text().strip() or None
+        except FileNotFoundError:
+            return None
+
+    def model_path(self, version: str) -> Path:
+        return self.path / version / MODEL_FILE
+
+    def load_metadata(self, version: str) -> Dict[str, Any]:
+        return json.loads((self.path / version / META_FILE).read_text())
+
+    def save(self, model_text: str, metadata: Dict[str, Any]) -> str:
+        """新しいバージョンとして保存し LATEST を切り替える"""
+        version = datetime.utcnow().strftime("%Y%m%d%H%M%S%f")
+        self.path.mkdir(parents=True, exist_ok=True)
+
+        # 一時ディレクトリに書き出してからリネームし、読み込み途中のファイルを見せない
+        staging = Path(tempfile.mkdtemp(dir=self.path, prefix=".staging-"))
+        (staging / MODEL_FILE).write_text(model_text)
+        (staging / META_FILE).write_text(json.dumps(
+            {**metadata, "version": version}, ensure_ascii=False, indent=2, default=str
+        ))
+        os.replace(staging, self.path / version)
+
+        latest_tmp = self.path / f".{LATEST_FILE}.tmp"
+        latest_tmp.write_text(version)
+        os.replace(latest_tmp, self.path / LATEST_FILE)
+
+        self.prune(settings.MODEL_REGISTRY_KEEP_VERSIONS)
+        return version
+
+    def prune(self, keep: int):
+        """古いバージョンを削除（LATEST は常に残す）"""
+        latest = self.latest_version()
+        for version in self.versions()[:-keep] if keep > 0 else []:
+            if version != latest:
+                shutil.rmtree(self.path / version, ignore_errors=True)
@@ -0,0 +1,71 @@
+"""
+遅延予測モデルのスコアラー
+- レジストリの LATEST を一度だけ読み込み、プロセス内でキャッシュ
+  （モデルファイルは mmap で読み込み、余分なバッファコピーを避ける）
+- LATEST が更新されたら次回の呼び出しで再読み込み
+- 特徴量（FEATURE_NAMES）が現在と異なるモデルは使わない（再学習するまで予測しない）
+- 予測は固定サイズのバッチで NumPy 配列に対して実行
+"""
+
+import mmap
+import threading
+from typing import Optional
+
+import lightgbm as lgb
+import numpy as np
+
+from app.ml.features import FEATURE_NAMES
+from app.ml.registry import ModelRegistry
+
+DELAY_MODEL_NAME = "stage_delay"
+
+
+class DelayScorer:
+    def __init__(self, registry: ModelRegistry, batch_size: int = 50000):
+        self.registry = registry
+        self.batch_size = batch_size
+        self.version: Optional[str] = None
+        self.feature_names = None
+        self._booster: Optional[lgb.Booster] = None
+        self._lock = threading.Lock()
+
+    def _load(self, version: str):
+        with open(self.registry.model_path(version), "rb") as f:
+            with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mapped:
+                model_str = mapped[:].decode("utf-8")
+        self._booster = lgb.Booster(model_str=model_str)
+        self.feature_names = self.registry.load_metadata(version).get("feature_names")
+        self.version = version
+
+    def ensure_loaded(self) -> bool:
+        """最新バージョンを読み込み済みにする。モデルがないか特徴量が現在と異なれば False"""
+        latest = self.registry.latest_version()
+        if latest is None:
+            return False
+        if latest != self.version:
+            with self._lock:
+                if latest != self.version:
+                    self._load(latest)
+        return self.feature_names == FEATURE_NAMES
+
+    def predict(self, features: np.ndarray) -> np.ndarray:
+        """遅延日数の予測値（現在の特徴量で学習したモデルがない場合は ValueError）"""
+        if not self.ensure_loaded():
+            raise ValueError(f"No model trained with the current features in registry: {self.registry.name}")
+        if len(features) == 0:
+            return np.empty(0, dtype=np.float64)
+        features = np.ascontiguousarray(features, dtype=np.float32)
+        return np.concatenate([
+            self._booster.predict(features[start:start + self.batch_size])
+            for start in range(0, len(features), self.batch_size)
+        ])
+
+
+_scorer: Optional[DelayScorer] = None
+
+
+def get_delay_scorer() -> DelayScorer:
+    global _scorer
+    if _scorer is None:
+        _scorer = DelayScorer(ModelRegistry(DELAY_MODEL_NAME))
+    return _scorer
@@ -0,0 +1,99 @@
+"""
+遅延予測モデルの学習
+- 完了済みステージの実績遅延日数を回帰（LightGBM）
+- 特徴量は各ステージのスナップショット日時点で計算（予測時の「今日時点」と揃える）
+- 直近の一部を検証データにして MAE を記録し、レジストリに新バージョンとして保存
+"""
+
+import logging
+from datetime import datetime
+from typing import Any, Dict, Optional
+
+import lightgbm as lgb
+import numpy as np
+import pandas as pd
+
+from app.db.session import AsyncSessionLocal
+from app.ml.feature_store import FeatureStore
+from app.ml.features import FEATURE_NAMES, build_features, split_training_rows
+from app.ml.registry import ModelRegistry
+from app.ml.scorer import DELAY_MODEL_NAME
+
+logger = logging.getLogger(__name__)
+
+MIN_TRAINING_ROWS = 50
+VALIDATION_FRACTION = 0.2
+
+DEFAULT_PARAMS: Dict[str, Any] = {
+    "objective": "regression_l1",
+    "learning_rate": 0.05,
+    "num_leaves": 31,
+    "min_data_in_leaf": 20,
+    "feature_fraction": 0.9,
+    "verbosity": -1,
+}
+
+
+def train_delay_model(
+    features: np.ndarray,
+    labels: np.ndarray,
+    params: Optional[Dict[str, Any]] = None,
+    num_boost_round: int = 300
+):
+    """学習し (booster, metrics) を返す"""
+    rng = np.random.default_rng(0)
+    order = rng.permutation(len(labels))
+    n_valid = max(1, int(len(labels) * VALIDATION_FRACTION))
+    valid_idx, train_idx = order[:n_valid], order[n_valid:]
+
+    train_set = lgb.Dataset(features[train_idx], labels[train_idx], feature_name=FEATURE_NAMES)
+    valid_set = lgb.Dataset(features[valid_idx], labels[valid_idx], reference=train_set)
+    booster = lgb.train(
+        {**DEFAULT_PARAMS, **(params or {})},
+        train_set,
+        num_boost_round=num_boost_round,
+        valid_sets=[valid_set],
+        callbacks=[lgb.early_stopping(30, verbose=False)]
+    )
+
+    predictions = booster.predict(features[valid_idx], num_iteration=booster.best_iteration)
+    metrics = {
+        "valid_mae_days": float(np.mean(np.abs(predictions - labels[valid_idx]))),
+        "train_rows": int(len(train_idx)),
+        "valid_rows": int(n_valid),
+        "best_iteration": int(booster.best_iteration or num_boost_round),
+    }
+    return booster, metrics
+
+
+def train_and_register(
+    frame: pd.DataFrame,
+    registry: Optional[ModelRegistry] = None
+) -> Optional[str]:
+    """集計データから学習してレジストリに保存。データ不足なら None"""
+    features, meta = build_features(frame)
+    x, y = split_training_rows(features, meta)
+    if len(y) < MIN_TRAINING_ROWS:
+        logger.info(f"Skipping delay model training: {len(y)} completed stages (< {MIN_TRAINING_ROWS})")
+        return None
+
+    booster, metrics = train_delay_model(x, y)
+    registry = registry or ModelRegistry(DELAY_MODEL_NAME)
+    version = registry.save(
+        booster.model_to_string(num_iteration=booster.best_iteration),
+        {
+            "feature_names": FEATURE_NAMES,
+            "trained_at": datetime.utcnow().isoformat(),
+            "metrics": metrics,
+        }
+    )
+    logger.info(f"Trained delay model {version}: {metrics}")
+    return version
+
+
+async def run_training() -> Optional[str]:
+    """フィーチャーストアを増分更新し、全テナントの集計から学習"""
+    store = FeatureStore()
+    async with AsyncSessionLocal() as db:
+        await store.refresh(db)
+    return train_and_register(store.read())
@@ -0,0 +1,28 @@
+from .tenant import Tenant
+from .user import User
+from .project import Project
+from .master import Phase, Stage, Role, TaskTemplate
+from .task import Task
+from .notification import (
+    Notification,
+    NotificationPreferences,
+    NotificationDeliveryLog,
+    NotificationTypeEnum,
+    NotificationPriorityEnum,
+)
+
+__all__ = [
+    "Tenant",
+    "User",
+    "Project",
+    "Phase",
+    "Stage",
+    "Role",
+    "TaskTemplate",
+    "Task",
+    "Notification",
+    "NotificationPreferences",
+    "NotificationDeliveryLog",
+    "NotificationTypeEnum",
+    "NotificationPriorityEnum",
+]
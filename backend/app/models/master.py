@@ -0,0 +1,54 @@
+"""
+マスターデータ（フェーズ・ステージ・ロール・タスクテンプレート）
+投入は scripts/init_db.py（code で UPSERT）
+"""
+import uuid
+
+from sqlalchemy import Boolean, Column, ForeignKey, Integer, String, Uuid
+
+from app.db.base import Base, JSONVariant, TimestampMixin
+
+
+class Phase(Base, TimestampMixin):
+    __tablename__ = "phases"
+
+    id = Column(Uuid, primary_key=True, default=uuid.uuid4)
+    code = Column(String(50), nullable=False, unique=True)
+    name = Column(String(100), nullable=False)
+    display_order = Column(Integer, nullable=False)
+    color_code = Column(String(7), nullable=True)
+
+
+class Stage(Base, TimestampMixin):
+    __tablename__ = "stages"
+
+    id = Column(Uuid, primary_key=True, default=uuid.uuid4)
+    phase_id = Column(Uuid, ForeignKey("phases.id"), nullable=True)
+    phase_code = Column(String(50), nullable=False)
+    code = Column(String(50), nullable=False, unique=True)
+    name = Column(String(100), nullable=False)
+    display_order = Column(Integer, nullable=False)
+    is_milestone = Column(Boolean, nullable=False, default=False)
+
+
+class Role(Base, TimestampMixin):
+    __tablename__ = "roles"
+
+    id = Column(Uuid, primary_key=True, default=uuid.uuid4)
+    code = Column(String(50), nullable=False, unique=True)
+    name = Column(String(100), nullable=False)
+
+
+class TaskTemplate(Base, TimestampMixin):
+    """ステージごとの標準タスク（案件作成時に tasks へ展開）"""
+    __tablename__ = "task_templates"
+
+    id = Column(Uuid, primary_key=True, default=uuid.uuid4)
+    stage_id = Column(Uuid, ForeignKey("stages.id"), nullable=True)
+    stage_code = Column(String(50), nullable=False)
+    code = Column(String(100), nullable=False, unique=True)
+    name = Column(String(255), nullable=False)
+    default_assignee_role_id = Column(Uuid, ForeignKey("roles.id"), nullable=True)
+    default_assignee_role = Column(String(50), nullable=True)
+    display_order = Column(Integer, nullable=False)
+    checklist_items = Column(JSONVariant, nullable=True)
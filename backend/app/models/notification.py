@@ -0,0 +1,113 @@
+"""
+通知モデル
+notifications / notification_delivery_logs は created_at の月単位でレンジパーティション分割しているため、
+主キーは (id, created_at)
+"""
+import enum
+import uuid
+
+from sqlalchemy import (
+    Boolean, Column, DateTime, Enum, ForeignKey, Integer, String, Text, UniqueConstraint, Uuid, func
+)
+
+from app.db.base import Base, JSONVariant, TimestampMixin
+
+
+class NotificationTypeEnum(str, enum.Enum):
+    TASK_ASSIGNED = "task_assigned"
+    TASK_DEADLINE = "task_deadline"
+    STAGE_COMPLETED = "stage_completed"
+    STAGE_DELAYED = "stage_delayed"
+    HANDOFF_REQUEST = "handoff_request"
+    BOTTLENECK_ALERT = "bottleneck_alert"
+
+
+class NotificationPriorityEnum(str, enum.Enum):
+    LOW = "low"
+    MEDIUM = "medium"
+    HIGH = "high"
+    URGENT = "urgent"
+
+
+def _enum_values(enum_class):
+    return [member.value for member in enum_class]
+
+
+class Notification(Base):
+    __tablename__ = "notifications"
+
+    id = Column(Uuid, primary_key=True, default=uuid.uuid4)
+    created_at = Column(DateTime(timezone=True), primary_key=True, server_default=func.now(), nullable=False)
+    updated_at = Column(DateTime(timezone=True), server_default=func.now(), onupdate=func.now(), nullable=False)
+    tenant_id = Column(Uuid, ForeignKey("tenants.id", ondelete="CASCADE"), nullable=False)
+    recipient_id = Column(Uuid, ForeignKey("users.id", ondelete="CASCADE"), nullable=False)
+    sender_id = Column(Uuid, ForeignKey("users.id", ondelete="SET NULL"), nullable=True)
+
+    type = Column(Enum(NotificationTypeEnum, name="notification_type", values_callable=_enum_values), nullable=False)
+    priority = Column(
+        Enum(NotificationPriorityEnum, name="notification_priority", values_callable=_enum_values),
+        nullable=False,
+        default=NotificationPriorityEnum.MEDIUM
+    )
+    title = Column(String(255), nullable=False)
+    message = Column(Text, nullable=False)
+    action_url = Column(String(500), nullable=True)
+    action_label = Column(String(100), nullable=True)
+    # 列名は metadata（宣言的モデルでは metadata 属性が予約されているため属性名は meta）
+    meta = Column("metadata", JSONVariant, nullable=True)
+
+    related_project_id = Column(Uuid, ForeignKey("projects.id", ondelete="CASCADE"), nullable=True)
+    related_task_id = Column(Uuid, ForeignKey("tasks.id", ondelete="CASCADE"), nullable=True)
+    related_stage_id = Column(Uuid, ForeignKey("stages.id"), nullable=True)
+
+    delivery_methods = Column(JSONVariant, nullable=True)
+    is_read = Column(Boolean, nullable=False, default=False)
+    read_at = Column(DateTime(timezone=True), nullable=True)
+    is_delivered = Column(Boolean, nullable=False, default=False)
+    delivered_at = Column(DateTime(timezone=True), nullable=True)
+    expires_at = Column(DateTime(timezone=True), nullable=True)
+    # 重複排除キー（app.services.notification_dedup）。対象外の通知は NULL
+    dedup_key = Column(String(64), nullable=True)
+
+    def __init__(self, **kwargs):
+        # スキーマの metadata をそのまま渡せるようにする
+        if "metadata" in kwargs:
+            kwargs["meta"] = kwargs.pop("metadata")
+        super().__init__(**kwargs)
+
+
+class NotificationPreferences(Base, TimestampMixin):
+    __tablename__ = "notification_preferences"
+    __table_args__ = (
+        UniqueConstraint("user_id", "tenant_id", name="uq_notification_preferences_user_tenant"),
+    )
+
+    id = Column(Uuid, primary_key=True, default=uuid.uuid4)
+    user_id = Column(Uuid, ForeignKey("users.id", ondelete="CASCADE"), nullable=False)
+    tenant_id = Column(Uuid, ForeignKey("tenants.id", ondelete="CASCADE"), nullable=False)
+
+    enable_desktop_notifications = Column(Boolean, nullable=False, default=True)
+    enable_email_notifications = Column(Boolean, nullable=False, default=False)
+    enable_sound_notifications = Column(Boolean, nullable=False, default=True)
+    enable_push_notifications = Column(Boolean, nullable=False, default=False)
+    type_preferences = Column(JSONVariant, nullable=True)
+
+    quiet_hours_enabled = Column(Boolean, nullable=False, default=False)
+    quiet_hours_start = Column(String(5), nullable=False, default="22:00")
+    quiet_hours_end = Column(String(5), nullable=False, default="08:00")
+    allow_urgent_in_quiet_hours = Column(Boolean, nullable=False, default=True)
+
+    grouping_enabled = Column(Boolean, nullable=False, default=True)
+    grouping_time_window = Column(Integer, nullable=False, default=5)
+
+
+class NotificationDeliveryLog(Base):
+    __tablename__ = "notification_delivery_logs"
+
+    id = Column(Uuid, primary_key=True, default=uuid.uuid4)
+    created_at = Column(DateTime(timezone=True), primary_key=True, server_default=func.now(), nullable=False)
+    # notifications はパーティション分割しているため外部キーは張らない
+    notification_id = Column(Uuid, nullable=False)
+    delivery_method = Column(String(20), nullable=False)
+    status = Column(String(20), nullable=False)
+    error_message = Column(Text, nullable=True)
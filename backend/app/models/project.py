@@ -0,0 +1,26 @@
+import uuid
+
+from sqlalchemy import Column, Date, ForeignKey, String, Text, Uuid
+
+from app.db.base import Base, TimestampMixin
+
+
+class Project(Base, TimestampMixin):
+    """案件（邸）"""
+    __tablename__ = "projects"
+
+    id = Column(Uuid, primary_key=True, default=uuid.uuid4)
+    tenant_id = Column(Uuid, ForeignKey("tenants.id", ondelete="CASCADE"), nullable=False)
+    name = Column(String(255), nullable=False)
+    code = Column(String(50), nullable=False)
+    customer_name = Column(String(255), nullable=False)
+    customer_email = Column(String(255), nullable=True)
+    customer_phone = Column(String(50), nullable=True)
+    address = Column(Text, nullable=True)
+    estimated_start_date = Column(Date, nullable=True)
+    estimated_end_date = Column(Date, nullable=True)
+    actual_start_date = Column(Date, nullable=True)
+    actual_end_date = Column(Date, nullable=True)
+    status = Column(String(20), nullable=False, default="PLANNING")
+    notes = Column(Text, nullable=True)
+    created_by_id = Column(Uuid, ForeignKey("users.id"), nullable=False)
@@ -0,0 +1,27 @@
+import uuid
+
+from sqlalchemy import Column, Date, DateTime, ForeignKey, Integer, String, Text, Uuid
+
+from app.db.base import Base, JSONVariant, TimestampMixin
+
+
+class Task(Base, TimestampMixin):
+    """案件のタスク（stage_code は stages.code）"""
+    __tablename__ = "tasks"
+
+    id = Column(Uuid, primary_key=True, default=uuid.uuid4)
+    tenant_id = Column(Uuid, ForeignKey("tenants.id", ondelete="CASCADE"), nullable=False)
+    project_id = Column(Uuid, ForeignKey("projects.id", ondelete="CASCADE"), nullable=False)
+    stage_code = Column(String(50), nullable=False)
+    title = Column(String(255), nullable=False)
+    description = Column(Text, nullable=True)
+    assignee_id = Column(Uuid, ForeignKey("users.id", ondelete="SET NULL"), nullable=True)
+    due_date = Column(Date, nullable=True)
+    priority = Column(String(20), nullable=False, default="MEDIUM")
+    status = Column(String(20), nullable=False, default="PENDING")
+    completed_at = Column(DateTime(timezone=True), nullable=True)
+    # 期限通知済みのしきい値（時間）。期限日が変わると NULL に戻す（app.services.deadline_scanner）
+    last_deadline_threshold = Column(Integer, nullable=True)
+    checklist_items = Column(JSONVariant, nullable=True, default=list)
+    custom_fields = Column(JSONVariant, nullable=True, default=dict)
+    created_by_id = Column(Uuid, ForeignKey("users.id"), nullable=False)
@@ -0,0 +1,16 @@
+import uuid
+
+from sqlalchemy import Boolean, Column, String, Uuid
+
+from app.db.base import Base, TimestampMixin
+
+
+class Tenant(Base, TimestampMixin):
+    """テナント（工務店）"""
+    __tablename__ = "tenants"
+
+    id = Column(Uuid, primary_key=True, default=uuid.uuid4)
+    name = Column(String(255), nullable=False)
+    code = Column(String(50), nullable=False, unique=True)
+    contact_email = Column(String(255), nullable=False)
+    is_active = Column(Boolean, nullable=False, default=True)
@@ -0,0 +1,19 @@
+import uuid
+
+from sqlalchemy import Boolean, Column, ForeignKey, String, Uuid
+
+from app.db.base import Base, TimestampMixin
+
+
+class User(Base, TimestampMixin):
+    """ユーザー（role_code は roles.code）"""
+    __tablename__ = "users"
+
+    id = Column(Uuid, primary_key=True, default=uuid.uuid4)
+    tenant_id = Column(Uuid, ForeignKey("tenants.id", ondelete="CASCADE"), nullable=False, index=True)
+    email = Column(String(255), nullable=False, unique=True)
+    full_name = Column(String(255), nullable=False)
+    hashed_password = Column(String(255), nullable=False)
+    is_active = Column(Boolean, nullable=False, default=True)
+    is_superuser = Column(Boolean, nullable=False, default=False)
+    role_code = Column(String(50), nullable=True)
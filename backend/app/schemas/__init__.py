@@ -1,5 +1,5 @@
 from .token import Token, TokenPayload
 from .user import User, UserCreate, UserUpdate, UserInDB
 from .tenant import Tenant, TenantCreate, TenantUpdate
-from .project import Project, ProjectCreate, ProjectUpdate
-from .task import Task, TaskCreate, TaskUpdate
\ No newline at end of file
+from .project import Project, ProjectCreate, ProjectBatchCreate, ProjectUpdate, ProjectListResponse, ProjectTree
+from .task import Task, TaskCreate, TaskUpdate, TaskBulkUpdate, TaskBulkUpdateResponse
\ No newline at end of file
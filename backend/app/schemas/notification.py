@@ -1,9 +1,10 @@
 from datetime import datetime
 from typing import Optional, List, Dict, Any
 from uuid import UUID
-from pydantic import BaseModel, Field
+from pydantic import AliasChoices, BaseModel, Field, HttpUrl, field_validator
 
 from app.models.notification import NotificationTypeEnum, NotificationPriorityEnum
+from app.services.web_push import push_endpoint_error
 
 
 # 基本スキーマ
@@ -62,6 +63,8 @@ class NotificationResponse(NotificationBase):
     updated_at: datetime
     read_at: Optional[datetime] = None
     delivered_at: Optional[datetime] = None
+    # モデルの属性名は meta（列名は metadata）
+    metadata: Optional[Dict[str, Any]] = Field(None, validation_alias=AliasChoices("meta", "metadata"))
     
     # リレーション情報
     sender_name: Optional[str] = None
@@ -87,8 +90,8 @@ class NotificationPreferencesBase(BaseModel):
     enable_push_notifications: bool = False
     type_preferences: Optional[Dict[str, Dict[str, Any]]] = None
     quiet_hours_enabled: bool = False
-    quiet_hours_start: str = Field("22:00", regex=r"^\d{2}:\d{2}$")
-    quiet_hours_end: str = Field("08:00", regex=r"^\d{2}:\d{2}$")
+    quiet_hours_start: str = Field("22:00", pattern=r"^\d{2}:\d{2}$")
+    quiet_hours_end: str = Field("08:00", pattern=r"^\d{2}:\d{2}$")
     allow_urgent_in_quiet_hours: bool = True
     grouping_enabled: bool = True
     grouping_time_window: int = Field(5, ge=1, le=60)
@@ -105,8 +108,8 @@ class NotificationPreferencesUpdate(BaseModel):
     enable_push_notifications: Optional[bool] = None
     type_preferences: Optional[Dict[str, Dict[str, Any]]] = None
     quiet_hours_enabled: Optional[bool] = None
-    quiet_hours_start: Optional[str] = Field(None, regex=r"^\d{2}:\d{2}$")
-    quiet_hours_end: Optional[str] = Field(None, regex=r"^\d{2}:\d{2}$")
+    quiet_hours_start: Optional[str] = Field(None, pattern=r"^\d{2}:\d{2}$")
+    quiet_hours_end: Optional[str] = Field(None, pattern=r"^\d{2}:\d{2}$")
     allow_urgent_in_quiet_hours: Optional[bool] = None
     grouping_enabled: Optional[bool] = None
     grouping_time_window: Optional[int] = Field(None, ge=1, le=60)
@@ -137,6 +140,49 @@ class NotificationStats(BaseModel):
     recent_count: int  # 直近24時間
 
 
+# 一括既読
+class NotificationMarkRead(BaseModel):
+    notification_ids: List[UUID] = Field(default_factory=list, max_length=1000)
+    up_to: Optional[datetime] = None  # この日時以前に作成された通知をすべて既読にする
+
+
+class NotificationMarkReadResponse(BaseModel):
+    updated: int
+    notification_ids: List[UUID]
+    read_at: datetime
+
+
+# Web Push 購読（ブラウザの PushSubscription.toJSON() の形）
+class PushSubscriptionKeys(BaseModel):
+    p256dh: str
+    auth: str
+
+
+class PushSubscriptionCreate(BaseModel):
+    endpoint: HttpUrl
+    keys: PushSubscriptionKeys
+    user_agent: Optional[str] = Field(None, max_length=255)
+
+    @field_validator("endpoint")
+    @classmethod
+    def check_push_service(cls, v: HttpUrl) -> HttpUrl:
+        # 任意の URL を登録させるとサーバーから内部ネットワークへ送信できてしまう
+        error = push_endpoint_error(str(v))
+        if error:
+            raise ValueError(error)
+        return v
+
+
+class PushSubscriptionDelete(BaseModel):
+    endpoint: HttpUrl  # 登録時と同じ正規化で照合する
+
+
+# 通知保持期間（テナント単位）
+class NotificationRetentionPolicy(BaseModel):
+    retention_days: int = Field(..., ge=1)
+    read_retention_days: Optional[int] = Field(None, ge=1)  # 既読通知だけ早く削除する場合
+
+
 # 通知テンプレート用スキーマ
 class NotificationTemplateBase(BaseModel):
     name: str = Field(..., max_length=100)
@@ -1,8 +1,10 @@
-from typing import Optional
+from typing import Optional, List
 from datetime import datetime, date
-from pydantic import BaseModel, ConfigDict
+from pydantic import BaseModel, ConfigDict, Field
 from uuid import UUID
 
+from .task import Task
+
 
 class ProjectBase(BaseModel):
     name: str
@@ -23,6 +25,16 @@ class ProjectCreate(ProjectBase):
     pass
 
 
+class ProjectBatchCreate(BaseModel):
+    projects: List[ProjectCreate] = Field(..., min_length=1, max_length=1000)
+
+
+class ProjectBatchCreateResponse(BaseModel):
+    created: int
+    task_count: int
+    project_ids: List[UUID]
+
+
 class ProjectUpdate(BaseModel):
     name: Optional[str] = None
     customer_name: Optional[str] = None
@@ -48,4 +60,32 @@ class ProjectInDBBase(ProjectBase):
 
 
 class Project(ProjectInDBBase):
-    pass
\ No newline at end of file
+    pass
+
+
+class ProjectListResponse(BaseModel):
+    items: List[Project]
+    next_cursor: Optional[str] = None
+
+
+
+# プロジェクトツリー（フェーズ → ステージ → タスク）
+class ProjectTreeStage(BaseModel):
+    code: str
+    name: str
+    display_order: int
+    is_milestone: bool = False
+    tasks: List[Task]
+
+
+class ProjectTreePhase(BaseModel):
+    code: str
+    name: str
+    display_order: int
+    color_code: Optional[str] = None
+    stages: List[ProjectTreeStage]
+
+
+class ProjectTree(BaseModel):
+    project: Project
+    phases: List[ProjectTreePhase]
@@ -1,6 +1,6 @@
 from typing import Optional, List, Dict, Any
 from datetime import datetime, date
-from pydantic import BaseModel, ConfigDict
+from pydantic import BaseModel, ConfigDict, Field
 from uuid import UUID
 
 
@@ -45,4 +45,34 @@ class TaskInDBBase(TaskBase):
 
 
 class Task(TaskInDBBase):
-    pass
\ No newline at end of file
+    pass
+
+
+# 一括更新
+class TaskBulkUpdateItem(TaskUpdate):
+    id: UUID
+    # 楽観的排他制御: クライアントが取得した時点の updated_at（省略時はチェックしない）
+    updated_at: Optional[datetime] = None
+
+
+class TaskBulkUpdate(BaseModel):
+    items: List[TaskBulkUpdateItem] = Field(..., min_length=1, max_length=500)
+
+
+class TaskBulkUpdateResult(BaseModel):
+    id: UUID
+    status: str  # "updated", "conflict", "not_found"
+    updated_at: Optional[datetime] = None
+
+
+class TaskBulkUpdateResponse(BaseModel):
+    results: List[TaskBulkUpdateResult]
+    updated_count: int
+
+
+
+# マイタスク（期限別グループ）
+class MyTasksResponse(BaseModel):
+    overdue: List[Task]
+    today: List[Task]
+    this_week: List[Task]
@@ -0,0 +1,288 @@
+"""
+横断ボトルネック検出（バッチ）
+- テナントの未完了タスクを1クエリで取得し pandas/NumPy の列に展開
+- (ロール, ステージ) ごとの滞留件数・経過日数の分布・足止めしている後続プロジェクト数を
+  groupby でベクトル化して集計（行ごとの Python ループなし）
+- 経過日数はタスクが今のステージの待ち行列に入った日時から数える
+  （作成日時と、同じプロジェクトの手前のステージで最後にタスクが完了した日時の遅い方）
+- しきい値を超えたグループを notify_bottleneck_alert で通知
+"""
+
+import logging
+from dataclasses import dataclass
+from datetime import datetime
+from typing import List, Optional
+from uuid import UUID
+
+import numpy as np
+import pandas as pd
+from sqlalchemy import func, select
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.db.initial_data import ROLES, STAGES
+from app.db.session import AsyncSessionLocal, SessionLocal
+from app.models import Task, Tenant, User
+from app.services.notification_service import ConstructionNotificationHelpers, NotificationService
+from app.services.task_service import TASK_STATUS_DONE
+
+logger = logging.getLogger(__name__)
+
+UNASSIGNED_ROLE = "UNASSIGNED"
+
+OPEN_TASK_COLUMNS = ["role", "stage_code", "project_id", "created_at"]
+COMPLETED_STAGE_COLUMNS = ["project_id", "stage_code", "completed_at"]
+
+STAGE_ORDER = {stage["code"]: stage["display_order"] for stage in STAGES}
+STAGE_NAMES = {stage["code"]: stage["name"] for stage in STAGES}
+ROLE_NAMES = {role["code"]: role["name"] for role in ROLES}
+
+
+@dataclass
+class BottleneckThresholds:
+    min_queue_depth: int = 10
+    age_p90_days: float = 14.0
+    min_blocked_projects: int = 3
+
+
+@dataclass
+class BottleneckAlert:
+    role: str
+    stage_code: str
+    queue_depth: int
+    age_p50_days: float
+    age_p90_days: float
+    max_age_days: float
+    blocked_projects: int
+    severity: str
+
+
+def _to_datetime64(values: pd.Series) -> np.ndarray:
+    return pd.to_datetime(values).to_numpy(dtype="datetime64[ns]")
+
+
+def queue_entered_at(frame: pd.DataFrame, completed_stages: Optional[pd.DataFrame] = None) -> np.ndarray:
+    """
+    未完了タスクが今のステージの待ち行列に入った日時
+    タスクはプロジェクト開始時にまとめて作られることが多く、作成日時から数えると
+    手前のステージが終わるのを待っていた期間まで滞留に含めてしまう
+    completed_stages: (project_id, stage_code) ごとの最終完了日時（COMPLETED_STAGE_COLUMNS）
+    """
+    created_at = _to_datetime64(frame["created_at"])
+    if completed_stages is None or completed_stages.empty:
+        return created_at
+
+    done = pd.DataFrame({
+        "project_id": completed_stages["project_id"].to_numpy(),
+        "stage_order": completed_stages["stage_code"].map(STAGE_ORDER).fillna(np.inf).to_numpy(dtype=float),
+        "completed_at": _to_datetime64(completed_stages["completed_at"]),
+    }).sort_values(["project_id", "stage_order"], kind="stable")
+    # そのステージまでに完了したタスクの最終完了日時
+    done["completed_at"] = done.groupby("project_id", sort=False)["completed_at"].cummax()
+
+    tasks = pd.DataFrame({
+        "project_id": frame["project_id"].to_numpy(),
+        "stage_order": frame["stage_code"].map(STAGE_ORDER).fillna(np.inf).to_numpy(dtype=float),
+        "position": np.arange(len(frame)),
+    }).sort_values("stage_order", kind="stable")
+    # 同じプロジェクトで手前のステージ（stage_order が小さい）のうち直近のもの
+    previous = pd.merge_asof(
+        tasks, done.sort_values("stage_order", kind="stable"),
+        on="stage_order", by="project_id", allow_exact_matches=False, direction="backward"
+    )
+    previous_completed = np.empty(len(frame), dtype="datetime64[ns]")
+    previous_completed[previous["position"].to_numpy()] = previous["completed_at"].to_numpy(dtype="datetime64[ns]")
+    later = ~np.isnat(previous_completed) & (previous_completed > created_at)
+    return np.where(later, previous_completed, created_at)
+
+
+def summarize_open_tasks(
+    frame: pd.DataFrame,
+    now: datetime,
+    completed_stages: Optional[pd.DataFrame] = None
+) -> pd.DataFrame:
+    """
+    (role, stage_code) ごとの集計表
+    blocked_projects: そのグループのタスクがプロジェクト内で最も手前の未完了ステージにあり、
+    後続ステージを止めているプロジェクト数
+    """
+    if frame.empty:
+        return pd.DataFrame(columns=[
+            "role", "stage_code", "queue_depth", "age_p50_days",
+            "age_p90_days", "max_age_days", "blocked_projects"
+        ])
+
+    entered_at = queue_entered_at(frame, completed_stages)
+    age_days = (np.datetime64(now, "ns") - entered_at) / np.timedelta64(1, "D")
+    stage_order = frame["stage_code"].map(STAGE_ORDER).fillna(np.inf).to_numpy()
+
+    data = pd.DataFrame({
+        "role": frame["role"].to_numpy(),
+        "stage_code": frame["stage_code"].to_numpy(),
+        "project_id": frame["project_id"].to_numpy(),
+        "age_days": age_days,
+        "stage_order": stage_order,
+    })
+    earliest_open_stage = data.groupby("project_id", sort=False)["stage_order"].transform("min")
+    data["blocking_project"] = data["project_id"].where(data["stage_order"] == earliest_open_stage)
+
+    grouped = data.groupby(["role", "stage_code"], sort=False)
+    ages = grouped["age_days"]
+    summary = pd.DataFrame({
+        "queue_depth": grouped.size(),
+        "age_p50_days": ages.quantile(0.5),
+        "age_p90_days": ages.quantile(0.9),
+        "max_age_days": ages.max(),
+        "blocked_projects": grouped["blocking_project"].nunique(),
+    })
+    return summary.reset_index()
+
+
+def detect_bottlenecks(
+    frame: pd.DataFrame,
+    now: datetime,
+    thresholds: Optional[BottleneckThresholds] = None,
+    completed_stages: Optional[pd.DataFrame] = None
+) -> List[BottleneckAlert]:
+    """しきい値を超えた (role, stage) を深刻度の高い順に返す"""
+    thresholds = thresholds or BottleneckThresholds()
+    summary = summarize_open_tasks(frame, now, completed_stages)
+    if summary.empty:
+        return []
+
+    depth = summary["queue_depth"].to_numpy()
+    p90 = summary["age_p90_days"].to_numpy()
+    blocked = summary["blocked_projects"].to_numpy()
+
+    over_depth = depth >= thresholds.min_queue_depth
+    over_age = p90 >= thresholds.age_p90_days
+    over_blocked = blocked >= thresholds.min_blocked_projects
+    # 滞留件数に加えて、経過日数か後続への影響のどちらかが大きいものを検出
+    mask = over_depth & (over_age | over_blocked)
+
+    # 超過した指標の数と超過倍率から深刻度を決める
+    ratio = np.maximum.reduce([
+        depth / thresholds.min_queue_depth,
+        p90 / thresholds.age_p90_days,
+        blocked / thresholds.min_blocked_projects,
+    ])
+    severity = np.where(
+        (over_depth & over_age & over_blocked) | (ratio >= 4), "critical",
+        np.where(ratio >= 2, "high", "medium")
+    )
+
+    flagged = summary.assign(severity=severity, _ratio=ratio)[mask]
+    flagged = flagged.sort_values(["_ratio", "blocked_projects"], ascending=False)
+
+    return [
+        BottleneckAlert(
+            role=row.role,
+            stage_code=row.stage_code,
+            queue_depth=int(row.queue_depth),
+            age_p50_days=float(row.age_p50_days),
+            age_p90_days=float(row.age_p90_days),
+            max_age_days=float(row.max_age_days),
+            blocked_projects=int(row.blocked_projects),
+            severity=row.severity,
+        )
+        for row in flagged.itertuples(index=False)
+    ]
+
+
+class BottleneckDetector:
+    def __init__(self, db: AsyncSession, thresholds: Optional[BottleneckThresholds] = None):
+        self.db = db
+        self.thresholds = thresholds or BottleneckThresholds()
+
+    async def load_open_tasks(self, tenant_id: UUID) -> pd.DataFrame:
+        """テナントの未完了タスクを列指向で取得（ORMオブジェクトは生成しない）"""
+        result = await self.db.execute(
+            select(
+                func.coalesce(User.role_code, UNASSIGNED_ROLE),
+                Task.stage_code,
+                Task.project_id,
+                Task.created_at
+            )
+            .outerjoin(User, User.id == Task.assignee_id)
+            .where(Task.tenant_id == tenant_id, Task.status != TASK_STATUS_DONE)
+        )
+        return pd.DataFrame.from_records(result.all(), columns=OPEN_TASK_COLUMNS)
+
+    async def load_completed_stages(self, tenant_id: UUID) -> pd.DataFrame:
+        """未完了タスクのあるプロジェクトについて、ステージごとの最終完了日時"""
+        open_projects = select(Task.project_id).where(
+            Task.tenant_id == tenant_id, Task.status != TASK_STATUS_DONE
+        )
+        result = await self.db.execute(
+            select(Task.project_id, Task.stage_code, func.max(Task.completed_at))
+            .where(
+                Task.tenant_id == tenant_id,
+                Task.status == TASK_STATUS_DONE,
+                Task.completed_at.isnot(None),
+                Task.project_id.in_(open_projects)
+            )
+            .group_by(Task.project_id, Task.stage_code)
+        )
+        return pd.DataFrame.from_records(result.all(), columns=COMPLETED_STAGE_COLUMNS)
+
+    async def detect(self, tenant_id: UUID, now: Optional[datetime] = None) -> List[BottleneckAlert]:
+        frame = await self.load_open_tasks(tenant_id)
+        completed_stages = await self.load_completed_stages(tenant_id)
+        return detect_bottlenecks(frame, now or datetime.utcnow(), self.thresholds, completed_stages)
+
+    async def resolve_recipients(self, tenant_id: UUID) -> List[UUID]:
+        """通知先（テナントの有効な管理者）"""
+        result = await self.db.execute(
+            select(User.id).where(
+                User.tenant_id == tenant_id,
+                User.is_active == True,
+                User.is_superuser == True
+            )
+        )
+        return list(result.scalars().all())
+
+
+async def send_bottleneck_alerts(
+    helpers: ConstructionNotificationHelpers,
+    alerts: List[BottleneckAlert],
+    recipient_ids: List[UUID],
+    tenant_id: UUID
+) -> int:
+    """検出結果を通知し、送信した通知件数を返す"""
+    if not recipient_ids:
+        return 0
+    sent = 0
+    for alert in alerts:
+        notifications = await helpers.notify_bottleneck_alert(
+            role=ROLE_NAMES.get(alert.role, alert.role),
+            task_name=STAGE_NAMES.get(alert.stage_code, alert.stage_code),
+            impact_count=alert.blocked_projects,
+            severity=alert.severity,
+            recipient_ids=recipient_ids,
+            tenant_id=tenant_id
+        )
+        sent += len(notifications)
+    logger.info(f"Sent {sent} bottleneck notifications for {len(alerts)} alerts (tenant {tenant_id})")
+    return sent
+
+
+async def run_bottleneck_detection(
+    tenant_ids: Optional[List[UUID]] = None,
+    thresholds: Optional[BottleneckThresholds] = None
+) -> int:
+    """全テナント（または指定テナント）のボトルネック検出と通知を実行"""
+    sent = 0
+    async with AsyncSessionLocal() as db:
+        if tenant_ids is None:
+            result = await db.execute(select(Tenant.id).where(Tenant.is_active == True))
+            tenant_ids = list(result.scalars().all())
+
+        detector = BottleneckDetector(db, thresholds)
+        for tenant_id in tenant_ids:
+            alerts = await detector.detect(tenant_id)
+            if not alerts:
+                continue
+            recipient_ids = await detector.resolve_recipients(tenant_id)
+            with SessionLocal() as sync_db:
+                helpers = ConstructionNotificationHelpers(NotificationService(sync_db))
+                sent += await send_bottleneck_alerts(helpers, alerts, recipient_ids, tenant_id)
+    return sent
@@ -0,0 +1,156 @@
+"""
+タスク期限スキャン（Celery beat / asyncio ループから定期実行）
+- 期限まで 72時間 / 24時間 / 0時間 のしきい値を越えた未完了タスクを検出して担当者に通知
+- tasks.last_deadline_threshold に通知済みのしきい値を記録し、同じしきい値では1回だけ通知
+- 部分インデックス ix_tasks_deadline_scan (due_date, id) を範囲で読み、(due_date, id) のキーセットで
+  バッチ処理する。FOR UPDATE SKIP LOCKED なので複数ワーカーが同時に走っても同じタスクを二重に通知しない
+- 1バッチ = しきい値の更新 + 通知の一括作成 を1トランザクションでコミット
+"""
+
+import asyncio
+import logging
+from dataclasses import dataclass, field
+from datetime import date, datetime, time, timedelta, timezone
+from typing import Dict, Optional, Tuple
+from zoneinfo import ZoneInfo
+
+from sqlalchemy import or_, select, tuple_, update
+from sqlalchemy.orm import Session
+
+from app.core.config import settings
+from app.db.session import SessionLocal
+from app.models import Task
+from app.models.project import Project
+from app.services.notification_service import ConstructionNotificationHelpers, NotificationService
+from app.services.task_service import TASK_STATUS_DONE
+
+logger = logging.getLogger(__name__)
+
+# 小さい（緊急な）しきい値から処理する。0時間を越えたタスクは 24/72 時間では通知しない
+DEADLINE_THRESHOLDS_HOURS = (0, 24, 72)
+SCAN_BATCH_SIZE = 1000
+
+
+def task_deadline(due_date: date) -> datetime:
+    """期限日時（APP_TIMEZONE での期限日の終わり）"""
+    return datetime.combine(due_date + timedelta(days=1), time.min, tzinfo=ZoneInfo(settings.APP_TIMEZONE))
+
+
+def hours_remaining(due_date: date, now: datetime) -> int:
+    """now はタイムゾーン付き"""
+    return int((task_deadline(due_date) - now).total_seconds() // 3600)
+
+
+def threshold_cutoff(now: datetime, threshold_hours: int) -> date:
+    """残り threshold_hours 時間以内に期限が来るタスクの due_date の上限（期限日は現地の日付）"""
+    local = (now + timedelta(hours=threshold_hours)).astimezone(ZoneInfo(settings.APP_TIMEZONE))
+    return local.date() - timedelta(days=1)
+
+
+@dataclass
+class DeadlineScanResult:
+    scanned: int = 0
+    notified: int = 0
+    by_threshold: Dict[int, int] = field(default_factory=dict)
+
+
+class DeadlineScanner:
+    def __init__(self, db: Session, batch_size: int = SCAN_BATCH_SIZE):
+        self.db = db
+        self.batch_size = batch_size
+        self.service = NotificationService(db)
+
+    def _batch_query(self, threshold: int, cutoff: date, after: Optional[Tuple[date, object]]):
+        # ix_tasks_deadline_scan の述語と同じ条件を含める（部分インデックスを使わせるため）
+        stmt = (
+            select(
+                Task.id,
+                Task.tenant_id,
+                Task.project_id,
+                Task.assignee_id,
+                Task.title,
+                Task.due_date,
+                Project.name,
+            )
+            .join(Project, Project.id == Task.project_id)
+            .where(
+                Task.status != TASK_STATUS_DONE,
+                Task.assignee_id.isnot(None),
+                Task.due_date.isnot(None),
+                or_(Task.last_deadline_threshold.is_(None), Task.last_deadline_threshold > 0),
+                or_(Task.last_deadline_threshold.is_(None), Task.last_deadline_threshold > threshold),
+                Task.due_date <= cutoff,
+            )
+            .order_by(Task.due_date, Task.id)
+            .limit(self.batch_size)
+            .with_for_update(of=Task, skip_locked=True)
+        )
+        if after is not None:
+            stmt = stmt.where(tuple_(Task.due_date, Task.id) > after)
+        return stmt
+
+    async def scan(self, now: Optional[datetime] = None) -> DeadlineScanResult:
+        now = now or datetime.now(timezone.utc)
+        result = DeadlineScanResult()
+        for threshold in DEADLINE_THRESHOLDS_HOURS:
+            cutoff = threshold_cutoff(now, threshold)
+            after = None
+            count = 0
+            while True:
+                rows = self.db.execute(self._batch_query(threshold, cutoff, after)).all()
+                if not rows:
+                    self.db.rollback()
+                    break
+                after = (rows[-1].due_date, rows[-1].id)
+                count += await self._notify_batch(rows, threshold, now)
+                result.scanned += len(rows)
+                if len(rows) < self.batch_size:
+                    break
+            result.by_threshold[threshold] = count
+            result.notified += count
+        logger.info(f"Deadline scan: {result.notified} notifications {result.by_threshold}")
+        return result
+
+    async def _notify_batch(self, rows, threshold: int, now: datetime) -> int:
+        """しきい値を記録し、通知を一括作成（同じコミットでロックを解放）"""
+        # 通知の記録はタスク内容の変更ではないので updated_at は変えない
+        self.db.execute(
+            update(Task)
+            .where(Task.id.in_([row.id for row in rows]))
+            .values({Task.last_deadline_threshold: threshold, Task.updated_at: Task.updated_at})
+            .execution_options(synchronize_session=False)
+        )
+        items = [
+            (
+                ConstructionNotificationHelpers.task_deadline_notification(
+                    task_name=row.title,
+                    project_name=row.name,
+                    hours_remaining=hours_remaining(row.due_date, now),
+                    recipient_id=row.assignee_id,
+                    project_id=row.project_id,
+                    task_id=row.id,
+                ),
+                row.tenant_id,
+            )
+            for row in rows
+        ]
+        notifications = await self.service.create_notifications(items)
+        return len(notifications)
+
+
+async def run_deadline_scan(now: Optional[datetime] = None) -> DeadlineScanResult:
+    with SessionLocal() as db:
+        return await DeadlineScanner(db).scan(now)
+
+
+async def run_deadline_scanner_loop(interval_seconds: Optional[float] = None):
+    """Celery beat を使わない環境向けの常駐ループ"""
+    interval = interval_seconds or settings.DEADLINE_SCAN_INTERVAL_SECONDS
+    while True:
+        started = asyncio.get_running_loop().time()
+        try:
+            await run_deadline_scan()
+        except Exception:
+            logger.exception("Deadline scan failed")
+        elapsed = asyncio.get_running_loop().time() - started
+        await asyncio.sleep(max(interval - elapsed, 0))
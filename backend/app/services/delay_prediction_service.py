@@ -0,0 +1,77 @@
+"""
+ステージ遅延予測の通知
+- 全未完了ステージを一括で特徴量化し、キャッシュ済みモデルでバッチ予測
+- 予測遅延が PREDICTION_THRESHOLD_DAYS を超えるステージを notify_stage_delayed で通知
+"""
+
+import logging
+from datetime import date
+from typing import List
+from uuid import UUID
+
+import numpy as np
+import pandas as pd
+
+from app.core.config import settings
+from app.db.initial_data import STAGES
+from app.db.session import AsyncSessionLocal, SessionLocal
+from app.ml.feature_store import FeatureStore
+from app.ml.features import build_features, split_open_rows
+from app.ml.scorer import DelayScorer, get_delay_scorer
+from app.services.notification_service import ConstructionNotificationHelpers, NotificationService
+
+logger = logging.getLogger(__name__)
+
+STAGE_NAMES = {stage["code"]: stage["name"] for stage in STAGES}
+
+PREDICTION_REASON = "過去の実績に基づく遅延予測"
+
+
+def predict_open_stage_delays(
+    frame: pd.DataFrame,
+    today: date,
+    scorer: DelayScorer,
+    threshold_days: float
+) -> pd.DataFrame:
+    """予測遅延がしきい値を超えた未完了ステージ（predicted_delay_days 列付き）"""
+    features, meta = build_features(frame, today)
+    features, open_stages = split_open_rows(features, meta)
+    predicted = scorer.predict(features)
+    open_stages["predicted_delay_days"] = predicted
+    return open_stages[predicted > threshold_days]
+
+
+async def run_delay_predictions() -> int:
+    """全テナントの未完了ステージを予測して通知し、送信件数を返す"""
+    scorer = get_delay_scorer()
+    if not scorer.ensure_loaded():
+        logger.info("No delay model trained with the current features; skipping predictions")
+        return 0
+
+    store = FeatureStore()
+    async with AsyncSessionLocal() as db:
+        await store.refresh(db)
+    delayed = predict_open_stage_delays(
+        store.read(), date.today(), scorer, settings.PREDICTION_THRESHOLD_DAYS
+    )
+
+    sent = 0
+    with SessionLocal() as sync_db:
+        helpers = ConstructionNotificationHelpers(NotificationService(sync_db))
+        for row in delayed.itertuples(index=False):
+            notifications: List = await helpers.notify_stage_delayed(
+                stage_name=STAGE_NAMES.get(row.stage_code, row.stage_code),
+                project_name=row.project_name,
+                delay_days=int(np.ceil(row.predicted_delay_days)),
+                recipient_ids=[UUID(row.created_by_id)],
+                tenant_id=UUID(row.tenant_id),
+                project_id=UUID(row.project_id),
+                reason=PREDICTION_REASON
+            )
+            sent += len(notifications)
+
+    logger.info(
+        f"Delay predictions (model {scorer.version}): {len(delayed)} stages over "
+        f"{settings.PREDICTION_THRESHOLD_DAYS} days, {sent} notifications"
+    )
+    return sent
@@ -0,0 +1,339 @@
+"""
+通知配信のリトライ
+- 配信に失敗したチャネルは notification_delivery_retries に登録し、チャネルごとの指数バックオフ（ジッターあり）で再送
+- 上限回数に達したもの・再送しても届かない失敗（宛先がない等）は notification_dead_letters へ移す
+- 再送ワーカーは期限の来た行を FOR UPDATE SKIP LOCKED でバッチ取得し、送信結果を同じトランザクションで
+  反映してからコミットする（ロック中の行は他のワーカーが取らないので、並列に動かしても二重送信しない）
+- WebSocket はオフラインだと失敗になる。接続は API プロセスにしかないので定期ワーカーでは送らず、
+  再接続したときにそのユーザーの保留分を再送する（回数の上限ではなく期限。期限を過ぎたらデッドレターへ）
+"""
+
+import asyncio
+import logging
+import random
+import uuid
+from dataclasses import dataclass, field
+from datetime import datetime, timedelta, timezone
+from typing import Dict, List, Optional, Sequence, Tuple
+from uuid import UUID
+
+from sqlalchemy import (
+    Column, DateTime, Index, Integer, String, Table, Text, UniqueConstraint, column, delete, func, select,
+    update, values
+)
+from sqlalchemy.dialects.postgresql import UUID as PGUUID, insert as pg_insert
+from sqlalchemy.orm import Session
+
+from app.core.config import settings
+from app.db.base import Base
+from app.db.session import SessionLocal
+from app.models.notification import Notification
+
+logger = logging.getLogger(__name__)
+
+
+class DeliveryFailed(Exception):
+    """チャネルへの配信失敗。retryable=False なら再送せずデッドレターへ"""
+
+    def __init__(self, message: str, retryable: bool = True):
+        super().__init__(message)
+        self.retryable = retryable
+
+
+@dataclass(frozen=True)
+class RetryPolicy:
+    base_delay: float  # 1回目の失敗後の待ち（秒）
+    max_delay: float
+    max_attempts: int  # 最初の配信も含めた試行回数
+
+    def delay(self, attempt: int) -> float:
+        """attempt 回目の失敗後の待ち秒数（上限つきの指数。後半の半分をランダムにずらす）"""
+        ceiling = min(self.max_delay, self.base_delay * 2 ** (attempt - 1))
+        return ceiling / 2 + random.uniform(0, ceiling / 2)
+
+
+RETRY_POLICIES: Dict[str, RetryPolicy] = {
+    "email": RetryPolicy(base_delay=60, max_delay=3600, max_attempts=6),
+    "push": RetryPolicy(base_delay=30, max_delay=1800, max_attempts=5),
+}
+DEFAULT_RETRY_POLICY = RetryPolicy(base_delay=60, max_delay=3600, max_attempts=5)
+
+# 再接続時にだけ再送するチャネル。next_attempt_at は再送の期限として使う
+RECONNECT_CHANNELS = {"websocket"}
+
+
+def retry_policy(channel: str) -> RetryPolicy:
+    return RETRY_POLICIES.get(channel, DEFAULT_RETRY_POLICY)
+
+
+def reconnect_expiry() -> timedelta:
+    return timedelta(hours=settings.NOTIFICATION_RECONNECT_RETRY_HOURS)
+
+
+# notifications はパーティション分割しているため外部キーは張らない（通知の削除時はワーカーが行を捨てる）
+notification_delivery_retries = Table(
+    "notification_delivery_retries",
+    Base.metadata,
+    Column("id", PGUUID(as_uuid=True), primary_key=True),
+    Column("notification_id", PGUUID(as_uuid=True), nullable=False),
+    Column("tenant_id", PGUUID(as_uuid=True), nullable=False),
+    Column("recipient_id", PGUUID(as_uuid=True), nullable=False),
+    Column("channel", String(20), nullable=False),
+    Column("attempts", Integer, nullable=False),
+    Column("next_attempt_at", DateTime(timezone=True), nullable=False),
+    Column("last_error", Text, nullable=True),
+    Column("created_at", DateTime(timezone=True), server_default=func.now(), nullable=False),
+    Column("updated_at", DateTime(timezone=True), server_default=func.now(), onupdate=func.now(), nullable=False),
+    UniqueConstraint("notification_id", "channel", name="uq_notification_delivery_retries_notification_channel"),
+    Index("ix_notification_delivery_retries_due", "next_attempt_at"),
+    Index("ix_notification_delivery_retries_recipient", "recipient_id", "channel"),
+)
+
+notification_dead_letters = Table(
+    "notification_dead_letters",
+    Base.metadata,
+    Column("id", PGUUID(as_uuid=True), primary_key=True),
+    Column("notification_id", PGUUID(as_uuid=True), nullable=False),
+    Column("tenant_id", PGUUID(as_uuid=True), nullable=False),
+    Column("recipient_id", PGUUID(as_uuid=True), nullable=False),
+    Column("channel", String(20), nullable=False),
+    Column("attempts", Integer, nullable=False),
+    Column("last_error", Text, nullable=True),
+    Column("failed_at", DateTime(timezone=True), server_default=func.now(), nullable=False, index=True),
+)
+
+
+def _dead_letter_row(notification_id, tenant_id, recipient_id, channel: str, attempts: int, error: str) -> dict:
+    return {
+        "id": uuid.uuid4(),
+        "notification_id": notification_id,
+        "tenant_id": tenant_id,
+        "recipient_id": recipient_id,
+        "channel": channel,
+        "attempts": attempts,
+        "last_error": error,
+    }
+
+
+def schedule_retries(db: Session, failures: Sequence[Tuple[Notification, str, DeliveryFailed]]):
+    """
+    最初の配信で失敗したチャネルを登録（(通知, チャネル, 例外) の列）
+    同じ通知・チャネルが登録済みなら何もしない。再送しない失敗はデッドレターへ
+    """
+    now = datetime.now(timezone.utc)
+    retries = []
+    dead = []
+    for notification, channel, error in failures:
+        if channel in RECONNECT_CHANNELS:
+            next_attempt_at = now + reconnect_expiry()
+        else:
+            next_attempt_at = now + timedelta(seconds=retry_policy(channel).delay(1))
+        if error.retryable and (channel in RECONNECT_CHANNELS or retry_policy(channel).max_attempts > 1):
+            retries.append({
+                "id": uuid.uuid4(),
+                "notification_id": notification.id,
+                "tenant_id": notification.tenant_id,
+                "recipient_id": notification.recipient_id,
+                "channel": channel,
+                "attempts": 1,
+                "next_attempt_at": next_attempt_at,
+                "last_error": str(error),
+            })
+        else:
+            dead.append(_dead_letter_row(
+                notification.id, notification.tenant_id, notification.recipient_id, channel, 1, str(error)
+            ))
+    if retries:
+        db.execute(pg_insert(notification_delivery_retries).values(retries).on_conflict_do_nothing(
+            index_elements=[notification_delivery_retries.c.notification_id, notification_delivery_retries.c.channel]
+        ))
+    if dead:
+        db.execute(pg_insert(notification_dead_letters).values(dead))
+    if retries or dead:
+        db.commit()
+
+
+@dataclass
+class RetryResult:
+    delivered: int = 0
+    rescheduled: int = 0
+    dead_lettered: int = 0
+    dropped: int = 0  # 通知が削除済み
+    by_channel: Dict[str, int] = field(default_factory=dict)
+
+
+class DeliveryRetryWorker:
+    """
+    db: 再送行のロック用（バッチごとにコミット）
+    service_db: 通知の読み込みと送信用（配信ログのコミットがロックを外さないよう別セッション）
+    """
+
+    def __init__(self, db: Session, service_db: Session, batch_size: Optional[int] = None):
+        self.db = db
+        self.service_db = service_db
+        self.batch_size = batch_size or settings.NOTIFICATION_RETRY_BATCH_SIZE
+
+    async def run_once(self, now: Optional[datetime] = None) -> RetryResult:
+        """
+        期限の来た再送をバッチごとに処理
+        再接続時に再送するチャネルの行はここでは送らず、期限切れとしてデッドレターへ移す
+        """
+        now = now or datetime.now(timezone.utc)
+        table = notification_delivery_retries
+        result = RetryResult()
+        while True:
+            rows = self.db.execute(
+                select(table)
+                .where(table.c.next_attempt_at <= now)
+                .order_by(table.c.next_attempt_at)
+                .limit(self.batch_size)
+                .with_for_update(skip_locked=True)
+            ).all()
+            if not rows:
+                self.db.rollback()
+                break
+            await self._process(rows, result, now, expire_reconnect=True)
+            if len(rows) < self.batch_size:
+                break
+        logger.info(
+            f"Delivery retry: delivered {result.delivered}, rescheduled {result.rescheduled}, "
+            f"dead-lettered {result.dead_lettered}, dropped {result.dropped}"
+        )
+        return result
+
+    async def redeliver_for_recipient(self, recipient_id: UUID, tenant_id: UUID, channel: str) -> RetryResult:
+        """期限を待たずにそのユーザーの保留分を再送（WebSocket 再接続時）"""
+        table = notification_delivery_retries
+        rows = self.db.execute(
+            select(table)
+            .where(
+                table.c.recipient_id == recipient_id,
+                table.c.tenant_id == tenant_id,
+                table.c.channel == channel
+            )
+            .order_by(table.c.created_at)
+            .limit(self.batch_size)
+            .with_for_update(skip_locked=True)
+        ).all()
+        result = RetryResult()
+        if rows:
+            await self._process(rows, result, datetime.now(timezone.utc))
+        else:
+            self.db.rollback()
+        return result
+
+    async def _process(self, rows, result: RetryResult, now: datetime, expire_reconnect: bool = False):
+        """送信して結果を反映し、コミットでロックを外す"""
+        finished: List[UUID] = []
+        rescheduled = []
+        dead = []
+        if expire_reconnect:
+            for row in rows:
+                if row.channel in RECONNECT_CHANNELS:
+                    finished.append(row.id)
+                    dead.append(_dead_letter_row(
+                        row.notification_id, row.tenant_id, row.recipient_id, row.channel, row.attempts,
+                        f"Not redelivered before expiry: {row.last_error}"
+                    ))
+            rows = [row for row in rows if row.channel not in RECONNECT_CHANNELS]
+
+        notifications = self._load_notifications({row.notification_id for row in rows}) if rows else {}
+        missing = [row.id for row in rows if row.notification_id not in notifications]
+        finished += missing
+        result.dropped += len(missing)
+        sendable = [row for row in rows if row.notification_id in notifications]
+        outcomes = await asyncio.gather(*[
+            self._deliver(notifications[row.notification_id], row.channel) for row in sendable
+        ], return_exceptions=True)
+
+        for row, outcome in zip(sendable, outcomes):
+            if not isinstance(outcome, Exception):
+                finished.append(row.id)
+                result.delivered += 1
+                result.by_channel[row.channel] = result.by_channel.get(row.channel, 0) + 1
+                continue
+            if not isinstance(outcome, DeliveryFailed):
+                logger.error(f"Unexpected error retrying {row.channel} for {row.notification_id}: {outcome}")
+                outcome = DeliveryFailed(str(outcome) or type(outcome).__name__)
+            attempts = row.attempts + 1
+            if row.channel in RECONNECT_CHANNELS:
+                # 再接続直後に切れた等。期限まで次の再接続を待つ
+                exhausted = False
+                next_attempt_at = row.next_attempt_at
+            else:
+                policy = retry_policy(row.channel)
+                exhausted = attempts >= policy.max_attempts
+                next_attempt_at = now + timedelta(seconds=policy.delay(attempts))
+            if not outcome.retryable or exhausted:
+                finished.append(row.id)
+                dead.append(_dead_letter_row(
+                    row.notification_id, row.tenant_id, row.recipient_id, row.channel, attempts, str(outcome)
+                ))
+            else:
+                rescheduled.append((row.id, attempts, next_attempt_at, str(outcome)))
+
+        self._apply(finished, rescheduled, dead)
+        result.rescheduled += len(rescheduled)
+        result.dead_lettered += len(dead)
+
+    def _apply(self, finished: List[UUID], rescheduled: List[tuple], dead: List[dict]):
+        """
+        finished: 削除する再送行、rescheduled: (id, 試行回数, 次回日時, エラー)、dead: デッドレター行
+        """
+        table = notification_delivery_retries
+        if rescheduled:
+            v = values(
+                column("id", table.c.id.type),
+                column("attempts", table.c.attempts.type),
+                column("next_attempt_at", table.c.next_attempt_at.type),
+                column("last_error", table.c.last_error.type),
+                name="v"
+            ).data(rescheduled)
+            self.db.execute(
+                update(table)
+                .where(table.c.id == v.c.id)
+                .values(
+                    attempts=v.c.attempts,
+                    next_attempt_at=v.c.next_attempt_at,
+                    last_error=v.c.last_error,
+                    updated_at=func.now()
+                )
+            )
+        if dead:
+            self.db.execute(pg_insert(notification_dead_letters).values(dead))
+        if finished:
+            self.db.execute(delete(table).where(table.c.id.in_(finished)))
+        self.db.commit()
+
+    def _load_notifications(self, notification_ids) -> Dict[UUID, Notification]:
+        return {
+            n.id: n for n in self.service_db.query(Notification).filter(Notification.id.in_(notification_ids))
+        }
+
+    async def _deliver(self, notification: Notification, channel: str):
+        from app.services.notification_service import NotificationService
+
+        await NotificationService(self.service_db).deliver_channel(notification, channel)
+
+
+async def run_delivery_retries(now: Optional[datetime] = None) -> RetryResult:
+    with SessionLocal() as db, SessionLocal() as service_db:
+        return await DeliveryRetryWorker(db, service_db).run_once(now)
+
+
+async def redeliver_pending(recipient_id: UUID, tenant_id: UUID, channel: str = "websocket") -> RetryResult:
+    with SessionLocal() as db, SessionLocal() as service_db:
+        return await DeliveryRetryWorker(db, service_db).redeliver_for_recipient(recipient_id, tenant_id, channel)
+
+
+async def run_delivery_retry_loop(interval_seconds: Optional[float] = None):
+    """Celery beat を使わない環境向けの常駐ループ"""
+    interval = interval_seconds or settings.NOTIFICATION_RETRY_INTERVAL_SECONDS
+    while True:
+        started = asyncio.get_running_loop().time()
+        try:
+            await run_delivery_retries()
+        except Exception:
+            logger.exception("Delivery retry failed")
+        elapsed = asyncio.get_running_loop().time() - started
+        await asyncio.sleep(max(interval - elapsed, 0))
@@ -0,0 +1,244 @@
+"""
+通知配信スケジューラー
+- 優先度ごとのキュー（urgent / high / medium / low）を重み付きラウンドロビン（8:4:2:1）で取り出す。
+  urgent が先に配信されるが、low も止まらない
+- 同じ優先度の中では (テナント, チャネル) ごとのレーンを順番に回す
+- チャネル（websocket / email / push）ごと・テナントごとのトークンバケットで配信速度を制限する。
+  トークンのないレーンは飛ばすので、1つのテナントや遅いチャネルが他を止めない
+- 同時配信数は max_concurrency まで。バッチは submit の Future を await して配信完了を待つ
+  （API リクエストは NotificationService(wait_for_delivery=False) で待たずに返す）
+- イベントループごとに1つ（Celery の run_async は呼び出しごとにループを作るため）
+"""
+
+import asyncio
+import logging
+import time
+import weakref
+from collections import OrderedDict, deque
+from typing import Any, Awaitable, Callable, Deque, Dict, Optional, Set, Tuple
+
+from app.core.config import settings
+
+logger = logging.getLogger(__name__)
+
+# 優先度ごとの重み（取り出し回数の比）
+PRIORITY_WEIGHTS: Dict[str, int] = {"urgent": 8, "high": 4, "medium": 2, "low": 1}
+DEFAULT_PRIORITY = "medium"
+
+Lane = Tuple[str, str]  # (テナントID, チャネル)
+
+
+class TokenBucket:
+    """rate 個/秒で補充され、最大 capacity 個まで貯まるトークン（rate <= 0 は無制限）"""
+
+    __slots__ = ("rate", "capacity", "tokens", "updated_at")
+
+    def __init__(self, rate: float, capacity: float, now: float):
+        self.rate = rate
+        self.capacity = max(capacity, 1.0)
+        self.tokens = self.capacity
+        self.updated_at = now
+
+    def wait_time(self, now: float) -> float:
+        """トークンが1つ使えるようになるまでの秒数（今使えるなら 0）"""
+        if self.rate <= 0:
+            return 0.0
+        self.tokens = min(self.capacity, self.tokens + (now - self.updated_at) * self.rate)
+        self.updated_at = now
+        return 0.0 if self.tokens >= 1 else (1 - self.tokens) / self.rate
+
+    def take(self):
+        if self.rate > 0:
+            self.tokens -= 1
+
+    def is_full(self) -> bool:
+        return self.rate <= 0 or self.tokens >= self.capacity
+
+
+class DeliveryJob:
+    __slots__ = ("priority", "lane", "send", "future")
+
+    def __init__(self, priority: str, lane: Lane, send: Callable[[], Awaitable[Any]], future: asyncio.Future):
+        self.priority = priority
+        self.lane = lane
+        self.send = send
+        self.future = future
+
+
+def _normalize_priority(priority: Any) -> str:
+    value = getattr(priority, "value", priority)
+    return value if value in PRIORITY_WEIGHTS else DEFAULT_PRIORITY
+
+
+class DeliveryScheduler:
+    def __init__(
+        self,
+        channel_rates: Optional[Dict[str, float]] = None,
+        tenant_rate: Optional[float] = None,
+        burst_seconds: Optional[float] = None,
+        max_concurrency: Optional[int] = None,
+        clock: Callable[[], float] = time.monotonic
+    ):
+        self.channel_rates = channel_rates if channel_rates is not None else {
+            "websocket": settings.NOTIFICATION_WEBSOCKET_RATE_PER_SECOND,
+            "email": settings.NOTIFICATION_EMAIL_RATE_PER_SECOND,
+            "push": settings.NOTIFICATION_PUSH_RATE_PER_SECOND,
+        }
+        self.tenant_rate = settings.NOTIFICATION_TENANT_RATE_PER_SECOND if tenant_rate is None else tenant_rate
+        self.burst_seconds = settings.NOTIFICATION_RATE_BURST_SECONDS if burst_seconds is None else burst_seconds
+        self.max_concurrency = max_concurrency or settings.NOTIFICATION_DELIVERY_CONCURRENCY
+        self.clock = clock
+
+        # 優先度 -> レーン -> ジョブ（レーンは先頭から順に回す）
+        self._queues: Dict[str, "OrderedDict[Lane, Deque[DeliveryJob]]"] = {
+            priority: OrderedDict() for priority in PRIORITY_WEIGHTS
+        }
+        self._current_weights: Dict[str, int] = {priority: 0 for priority in PRIORITY_WEIGHTS}
+        self._channel_buckets: Dict[str, TokenBucket] = {}
+        self._tenant_buckets: Dict[str, TokenBucket] = {}
+        self._pending = 0
+        self._wakeup = asyncio.Event()
+        self._slots: Optional[asyncio.Semaphore] = None
+        self._tasks: Set[asyncio.Task] = set()
+        self._dispatcher: Optional[asyncio.Task] = None
+
+    # --- 受付 ---
+
+    def submit(
+        self,
+        send: Callable[[], Awaitable[Any]],
+        priority: Any,
+        tenant_id: Any,
+        channel: str
+    ) -> asyncio.Future:
+        """配信を予約する。返り値の Future は send の結果（例外）で完了する"""
+        priority = _normalize_priority(priority)
+        future = asyncio.get_running_loop().create_future()
+        lane = (str(tenant_id), channel)
+        self._queues[priority].setdefault(lane, deque()).append(DeliveryJob(priority, lane, send, future))
+        self._pending += 1
+        self._wakeup.set()
+        if self._dispatcher is None or self._dispatcher.done():
+            self._dispatcher = asyncio.create_task(self._dispatch())
+        return future
+
+    async def deliver(self, send: Callable[[], Awaitable[Any]], priority: Any, tenant_id: Any, channel: str):
+        return await self.submit(send, priority, tenant_id, channel)
+
+    def pending_counts(self) -> Dict[str, int]:
+        return {
+            priority: sum(len(jobs) for jobs in lanes.values())
+            for priority, lanes in self._queues.items()
+        }
+
+    # --- 取り出し ---
+
+    def _bucket(self, buckets: Dict[str, TokenBucket], key: str, rate: float, now: float) -> TokenBucket:
+        bucket = buckets.get(key)
+        if bucket is None:
+            bucket = buckets[key] = TokenBucket(rate, rate * self.burst_seconds, now)
+        return bucket
+
+    def _take_from(self, priority: str, now: float) -> Tuple[Optional[DeliveryJob], float]:
+        """トークンのある最初のレーンから1件取り出す。なければ (None, 最短の待ち秒数)"""
+        lanes = self._queues[priority]
+        shortest_wait = float("inf")
+        for lane in list(lanes):
+            tenant_id, channel = lane
+            channel_bucket = self._bucket(self._channel_buckets, channel, self.channel_rates.get(channel, 0), now)
+            tenant_bucket = self._bucket(self._tenant_buckets, tenant_id, self.tenant_rate, now)
+            wait = max(channel_bucket.wait_time(now), tenant_bucket.wait_time(now))
+            if wait > 0:
+                shortest_wait = min(shortest_wait, wait)
+                continue
+            channel_bucket.take()
+            tenant_bucket.take()
+            jobs = lanes[lane]
+            job = jobs.popleft()
+            if jobs:
+                lanes.move_to_end(lane)
+            else:
+                del lanes[lane]
+            return job, 0.0
+        return None, shortest_wait
+
+    def _next_job(self) -> Tuple[Optional[DeliveryJob], float]:
+        """
+        重み付きラウンドロビン（smooth weighted round-robin）で優先度を選んで1件取り出す
+        どのレーンもトークン待ちなら (None, 最短の待ち秒数)
+        """
+        now = self.clock()
+        active = [priority for priority, lanes in self._queues.items() if lanes]
+        total = sum(PRIORITY_WEIGHTS[priority] for priority in active)
+        for priority in active:
+            self._current_weights[priority] += PRIORITY_WEIGHTS[priority]
+
+        shortest_wait = float("inf")
+        for priority in sorted(active, key=lambda p: self._current_weights[p], reverse=True):
+            job, wait = self._take_from(priority, now)
+            if job is not None:
+                self._current_weights[priority] -= total
+                if not self._queues[priority]:
+                    # 空になった優先度の持ち越しは捨てる
+                    self._current_weights[priority] = 0
+                return job, 0.0
+            shortest_wait = min(shortest_wait, wait)
+
+        for priority in active:
+            self._current_weights[priority] -= PRIORITY_WEIGHTS[priority]
+        return None, shortest_wait
+
+    async def _dispatch(self):
+        if self._slots is None:
+            self._slots = asyncio.Semaphore(self.max_concurrency)
+        slots = self._slots
+        while self._pending:
+            await slots.acquire()
+            job, wait = self._next_job()
+            if job is None:
+                slots.release()
+                # トークンの補充か、新しいジョブ（別のレーン）を待つ
+                self._wakeup.clear()
+                try:
+                    await asyncio.wait_for(self._wakeup.wait(), timeout=wait)
+                except asyncio.TimeoutError:
+                    pass
+                continue
+            self._pending -= 1
+            if job.future.cancelled():
+                slots.release()
+                continue
+            task = asyncio.create_task(self._run(job))
+            self._tasks.add(task)
+            task.add_done_callback(self._tasks.discard)
+            task.add_done_callback(lambda _: slots.release())
+        self._prune_buckets(self.clock())
+
+    async def _run(self, job: DeliveryJob):
+        try:
+            result = await job.send()
+        except Exception as e:
+            if not job.future.done():
+                job.future.set_exception(e)
+        else:
+            if not job.future.done():
+                job.future.set_result(result)
+
+    def _prune_buckets(self, now: float):
+        """満タンに戻ったテナントのバケットを捨てる（テナント数だけ増え続けないように）"""
+        for bucket in self._tenant_buckets.values():
+            bucket.wait_time(now)
+        for tenant_id in [key for key, bucket in self._tenant_buckets.items() if bucket.is_full()]:
+            del self._tenant_buckets[tenant_id]
+
+
+_schedulers: "weakref.WeakKeyDictionary[asyncio.AbstractEventLoop, DeliveryScheduler]" = weakref.WeakKeyDictionary()
+
+
+def get_delivery_scheduler() -> DeliveryScheduler:
+    """実行中のイベントループのスケジューラー"""
+    loop = asyncio.get_running_loop()
+    scheduler = _schedulers.get(loop)
+    if scheduler is None:
+        scheduler = _schedulers[loop] = DeliveryScheduler()
+    return scheduler
@@ -290,7 +290,7 @@ class EmailService:
                 'message': notification.message,
                 'priority': notification.priority,
                 'action_url': notification.action_url,
-                'metadata': notification.metadata or {},
+                'metadata': notification.meta or {},
                 'created_at': notification.created_at,
                 'notification_type': notification.type
             }
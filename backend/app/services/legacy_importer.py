@@ -0,0 +1,311 @@
+"""
+旧Excel TODOワークブックの取り込み
+- openpyxl の read_only モードで行をストリーミング（ワークブックごとにメモリ一定）
+- シート先頭の数十行だけをバッファし、workbook_structure の検出器でレイアウトを判定
+    一覧形式: 「邸名」列とステージ名の列を持つヘッダー行、以降1行1プロジェクト
+    個別形式: 「邸名」ラベルの右にプロジェクト名、ステージ名の行の右に日付（1シート1プロジェクト）
+- ステージ名は STAGES の name と照合してコードに変換
+- プロジェクト/タスクは一定件数ごとに一括INSERT（既存コードはスキップするので再実行可能）
+- プロジェクトコードはワークブックのパス（root からの相対パス、未指定なら絶対パス）とシート名・行から生成。
+  既存のコードが別名のプロジェクトならスキップせず衝突として報告する
+- 複数ワークブックはプロセスプールで並列に処理
+"""
+
+import hashlib
+import logging
+import re
+import uuid
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import dataclass, field
+from datetime import date, datetime
+from itertools import chain, islice
+from pathlib import Path
+from typing import Any, Dict, Iterable, List, Optional, Sequence, Tuple
+from uuid import UUID
+
+import openpyxl
+from sqlalchemy import insert, select
+from sqlalchemy.orm import Session
+
+from app.db.initial_data import STAGES
+from app.db.session import SessionLocal, sync_engine
+from app.models import Task
+from app.models.project import Project
+from app.schemas.project import ProjectCreate
+from app.services.workbook_structure import detect_structure, first_header_row, normalize_label
+
+logger = logging.getLogger(__name__)
+
+HEADER_SCAN_ROWS = 30
+DETAIL_CHUNK_ROWS = 1000
+DONE_MARKERS = {"済", "完了", "○", "〇", "✓", "✔"}
+
+DATE_PATTERN = re.compile(r"(?:(\d{4})[/\-.年])?(\d{1,2})[/\-.月](\d{1,2})日?")
+
+
+STAGE_NAMES_BY_CODE = {stage["code"]: stage["name"] for stage in STAGES}
+
+
+def parse_date(value: Any, default_year: int) -> Optional[date]:
+    """セル値を日付に変換（datetime / 'YYYY/M/D' / 'M/D' / 'M月D日'）"""
+    if isinstance(value, datetime):
+        return value.date()
+    if isinstance(value, date):
+        return value
+    if not isinstance(value, str):
+        return None
+    match = DATE_PATTERN.search(normalize_label(value))
+    if not match:
+        return None
+    year, month, day = match.groups()
+    try:
+        return date(int(year) if year else default_year, int(month), int(day))
+    except ValueError:
+        return None
+
+
+def is_done(value: Any) -> bool:
+    return value is True or any(marker in normalize_label(value) for marker in DONE_MARKERS)
+
+
+@dataclass
+class SheetLayout:
+    header_row: int
+    name_column: int
+    # 一覧形式: 列番号 → ステージコード（個別形式では空）
+    stage_columns: Dict[int, str] = field(default_factory=dict)
+    # 個別形式のプロジェクト名
+    project_name: Optional[str] = None
+
+    @property
+    def is_board(self) -> bool:
+        return bool(self.stage_columns)
+
+
+def detect_layout(head_rows: Sequence[Sequence[Any]]) -> Optional[SheetLayout]:
+    """シート先頭の行からレイアウトを判定（該当しなければ None）"""
+    structure = detect_structure(head_rows, header_scan_rows=len(head_rows))
+    header_row = first_header_row(structure)
+    if header_row is None:
+        return None
+    name_column = min(col for row, col in structure.project_name_cells if row == header_row)
+
+    stage_columns = {
+        col: code for row, col, code in structure.stage_cells if row == header_row
+    }
+    if stage_columns:
+        return SheetLayout(header_row, name_column, stage_columns)
+
+    row = head_rows[header_row]
+    project_name = next((str(v).strip() for v in row[name_column + 1:] if v not in (None, "")), None)
+    if project_name:
+        return SheetLayout(header_row, name_column, project_name=project_name)
+    return None
+
+
+@dataclass
+class WorkbookImportResult:
+    path: str
+    projects: int = 0
+    tasks: int = 0
+    skipped_projects: int = 0
+    errors: List[str] = field(default_factory=list)
+    # 既存の別プロジェクトとコードが衝突して取り込めなかった行
+    collisions: List[str] = field(default_factory=list)
+
+
+class LegacyWorkbookImporter:
+    def __init__(
+        self,
+        session: Session,
+        tenant_id: UUID,
+        created_by_id: UUID,
+        batch_size: int = 500,
+        today: Optional[date] = None,
+        root: Optional[str] = None
+    ):
+        self.session = session
+        self.tenant_id = tenant_id
+        self.created_by_id = created_by_id
+        self.batch_size = batch_size
+        self.today = today or date.today()
+        self.root = Path(root).resolve() if root else None
+        self._projects: List[dict] = []
+        self._tasks: List[dict] = []
+
+    def import_workbook(self, path: str) -> WorkbookImportResult:
+        result = WorkbookImportResult(path=str(path))
+        workbook = openpyxl.load_workbook(path, read_only=True, data_only=True)
+        try:
+            for sheet in workbook.worksheets:
+                try:
+                    self._import_sheet(sheet, result)
+                except Exception as e:
+                    self.session.rollback()
+                    self._projects.clear()
+                    self._tasks.clear()
+                    result.errors.append(f"{sheet.title}: {e}")
+                    logger.exception(f"Failed to import sheet {sheet.title} of {path}")
+        finally:
+            workbook.close()
+        return result
+
+    def _source_key(self, path: str) -> str:
+        """コード生成に使うパス（同名ファイルが別ディレクトリにあっても区別する）"""
+        resolved = Path(path).resolve()
+        if self.root is not None and resolved.is_relative_to(self.root):
+            return resolved.relative_to(self.root).as_posix()
+        return resolved.as_posix()
+
+    def _code_prefix(self, path: str, sheet_title: str) -> str:
+        digest = hashlib.sha1(f"{self._source_key(path)}:{sheet_title}".encode()).hexdigest()[:10]
+        return f"LEGACY-{digest}"
+
+    def _import_sheet(self, sheet, result: WorkbookImportResult):
+        rows = sheet.iter_rows(values_only=True)
+        head = list(islice(rows, HEADER_SCAN_ROWS))
+        layout = detect_layout(head)
+        if layout is None:
+            return
+
+        body = chain(head[layout.header_row + 1:], rows)
+        prefix = self._code_prefix(result.path, sheet.title)
+        if layout.is_board:
+            for offset, row in enumerate(body, start=layout.header_row + 1):
+                self._add_board_row(layout, row, f"{prefix}-{offset:05d}")
+                if len(self._projects) >= self.batch_size:
+                    self._flush(result)
+        else:
+            self._add_detail_sheet(layout, body, prefix)
+        self._flush(result)
+
+    def _add_project(self, name: str, code: str, stage_cells: Iterable[Tuple[str, Any]]):
+        project_id = uuid.uuid4()
+        self._projects.append({
+            **ProjectCreate(name=name, code=code, customer_name=name).model_dump(),
+            "id": project_id,
+            "tenant_id": self.tenant_id,
+            "created_by_id": self.created_by_id,
+        })
+        for stage_code, value in stage_cells:
+            self._tasks.append({
+                "id": uuid.uuid4(),
+                "tenant_id": self.tenant_id,
+                "project_id": project_id,
+                "created_by_id": self.created_by_id,
+                "stage_code": stage_code,
+                "title": STAGE_NAMES_BY_CODE[stage_code],
+                "due_date": parse_date(value, self.today.year),
+                "priority": "MEDIUM",
+                "status": "DONE" if is_done(value) else "PENDING",
+                "checklist_items": [],
+                "custom_fields": {"legacy_value": str(value)},
+            })
+
+    def _add_board_row(self, layout: SheetLayout, row: Sequence[Any], code: str):
+        name = row[layout.name_column] if layout.name_column < len(row) else None
+        if name in (None, ""):
+            return
+        self._add_project(str(name).strip(), code, (
+            (stage_code, row[col])
+            for col, stage_code in layout.stage_columns.items()
+            if col < len(row) and row[col] not in (None, "")
+        ))
+
+    def _add_detail_sheet(self, layout: SheetLayout, rows: Iterable[Sequence[Any]], code: str):
+        """
+        ステージ名セルの右側で最初に見つかった値をそのステージの日付とする
+        行は DETAIL_CHUNK_ROWS 行ずつ検出器にかけ、ステージ名セルのある行だけを見る
+        """
+        stage_cells: Dict[str, Any] = {}
+        rows = iter(rows)
+        while True:
+            chunk = list(islice(rows, DETAIL_CHUNK_ROWS))
+            if not chunk:
+                break
+            seen_rows = set()
+            for row_index, col, stage_code in detect_structure(chunk, header_scan_rows=0).stage_cells:
+                if row_index in seen_rows or stage_code in stage_cells:
+                    continue
+                seen_rows.add(row_index)
+                row = chunk[row_index]
+                stage_value = next((v for v in row[col + 1:] if v not in (None, "")), None)
+                if stage_value is not None:
+                    stage_cells[stage_code] = stage_value
+        self._add_project(layout.project_name, code, stage_cells.items())
+
+    def _flush(self, result: WorkbookImportResult):
+        """バッファ済みのプロジェクト/タスクを一括INSERT（取り込み済みのコードは除外）"""
+        if not self._projects:
+            return
+        codes = [p["code"] for p in self._projects]
+        existing = dict(self.session.execute(
+            select(Project.code, Project.name).where(Project.tenant_id == self.tenant_id, Project.code.in_(codes))
+        ).all())
+
+        projects = []
+        skipped = 0
+        for project in self._projects:
+            existing_name = existing.get(project["code"])
+            if existing_name is None:
+                projects.append(project)
+            elif existing_name == project["name"]:
+                # 取り込み済み
+                skipped += 1
+            else:
+                result.collisions.append(f"{project['code']}: {project['name']}（既存: {existing_name}）")
+        project_ids = {p["id"] for p in projects}
+        tasks = [t for t in self._tasks if t["project_id"] in project_ids]
+
+        if projects:
+            self.session.execute(insert(Project), projects)
+        if tasks:
+            self.session.execute(insert(Task), tasks)
+        self.session.commit()
+
+        result.projects += len(projects)
+        result.tasks += len(tasks)
+        result.skipped_projects += skipped
+        self._projects.clear()
+        self._tasks.clear()
+
+
+def _init_worker():
+    # fork 元から引き継いだ接続プールを子プロセスで使わない
+    sync_engine.dispose(close=False)
+
+
+def _import_one(
+    path: str, tenant_id: UUID, created_by_id: UUID, batch_size: int, root: Optional[str]
+) -> WorkbookImportResult:
+    with SessionLocal() as session:
+        return LegacyWorkbookImporter(
+            session, tenant_id, created_by_id, batch_size, root=root
+        ).import_workbook(path)
+
+
+def import_workbooks(
+    paths: Sequence[str],
+    tenant_id: UUID,
+    created_by_id: UUID,
+    workers: int = 4,
+    batch_size: int = 500,
+    root: Optional[str] = None
+) -> List[WorkbookImportResult]:
+    """ワークブックをプロセスプールで並列に取り込む（root: コード生成の基準ディレクトリ）"""
+    if workers <= 1:
+        return [_import_one(path, tenant_id, created_by_id, batch_size, root) for path in paths]
+
+    with ProcessPoolExecutor(max_workers=workers, initializer=_init_worker) as executor:
+        futures = {
+            executor.submit(_import_one, str(path), tenant_id, created_by_id, batch_size, root): str(path)
+            for path in paths
+        }
+        results = []
+        for future, path in futures.items():
+            try:
+                results.append(future.result())
+            except Exception as e:
+                logger.exception(f"Failed to import workbook {path}")
+                results.append(WorkbookImportResult(path=path, errors=[str(e)]))
+        return results
@@ -0,0 +1,183 @@
+"""
+マスターデータ（フェーズ・ステージ・ロール）のプロセス内レジストリ
+- 起動時に1回読み込み、不変のスナップショット（タプル + __slots__ レコード + コード/表示順の索引）として共有
+- バージョンは各テーブルの件数と max(updated_at) から作る。一定間隔でバージョンだけを確認し、
+  変わっていたときだけ読み直してスナップショットを差し替える
+- GET /master-data 用の JSON と強い ETag はスナップショット作成時に1回だけ計算する
+"""
+
+import asyncio
+import hashlib
+import json
+import logging
+import time
+from types import MappingProxyType
+from typing import Any, Dict, Iterable, Mapping, Optional, Tuple
+
+from sqlalchemy import func, literal, select, union_all
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.core.config import settings
+from app.db.initial_data import PHASES, ROLES, STAGES
+from app.models import Phase, Role, Stage
+
+logger = logging.getLogger(__name__)
+
+BUILTIN_VERSION = "builtin"
+
+
+class _Record:
+    """読み取り専用のマスターデータレコード"""
+
+    __slots__ = ()
+
+    def __init__(self, **values: Any):
+        for name in self.__slots__:
+            object.__setattr__(self, name, values.get(name))
+
+    def __setattr__(self, name: str, value: Any):
+        raise AttributeError(f"{type(self).__name__} is read-only")
+
+    def __repr__(self) -> str:
+        return f"{type(self).__name__}(code={self.code!r})"
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {name: getattr(self, name) for name in self.__slots__}
+
+
+class PhaseRecord(_Record):
+    __slots__ = ("code", "name", "display_order", "color_code")
+
+
+class StageRecord(_Record):
+    __slots__ = ("code", "name", "display_order", "phase_code", "is_milestone")
+
+
+class RoleRecord(_Record):
+    __slots__ = ("code", "name")
+
+
+class MasterDataSnapshot:
+    """ある時点のマスターデータ（作成後は変更しない）"""
+
+    __slots__ = (
+        "version", "phases", "stages", "roles",
+        "phases_by_code", "stages_by_code", "stages_by_order", "roles_by_code",
+        "stages_by_phase", "payload", "etag",
+    )
+
+    def __init__(
+        self,
+        version: str,
+        phases: Iterable[PhaseRecord],
+        stages: Iterable[StageRecord],
+        roles: Iterable[RoleRecord]
+    ):
+        self.version = version
+        self.phases: Tuple[PhaseRecord, ...] = tuple(sorted(phases, key=lambda p: p.display_order))
+        self.stages: Tuple[StageRecord, ...] = tuple(sorted(stages, key=lambda s: s.display_order))
+        self.roles: Tuple[RoleRecord, ...] = tuple(roles)
+
+        self.phases_by_code: Mapping[str, PhaseRecord] = MappingProxyType({p.code: p for p in self.phases})
+        self.stages_by_code: Mapping[str, StageRecord] = MappingProxyType({s.code: s for s in self.stages})
+        self.stages_by_order: Mapping[int, StageRecord] = MappingProxyType({s.display_order: s for s in self.stages})
+        self.roles_by_code: Mapping[str, RoleRecord] = MappingProxyType({r.code: r for r in self.roles})
+        self.stages_by_phase: Mapping[str, Tuple[StageRecord, ...]] = MappingProxyType({
+            phase.code: tuple(s for s in self.stages if s.phase_code == phase.code)
+            for phase in self.phases
+        })
+
+        self.payload = json.dumps({
+            "version": version,
+            "phases": [p.to_dict() for p in self.phases],
+            "stages": [s.to_dict() for s in self.stages],
+            "roles": [r.to_dict() for r in self.roles],
+        }, ensure_ascii=False, separators=(",", ":")).encode("utf-8")
+        self.etag = f'"{hashlib.sha256(self.payload).hexdigest()[:32]}"'
+
+    def stage_name(self, code: str) -> str:
+        stage = self.stages_by_code.get(code)
+        return stage.name if stage else code
+
+    def role_name(self, code: str) -> str:
+        role = self.roles_by_code.get(code)
+        return role.name if role else code
+
+    def phase_of(self, stage_code: str) -> Optional[PhaseRecord]:
+        stage = self.stages_by_code.get(stage_code)
+        return self.phases_by_code.get(stage.phase_code) if stage else None
+
+
+def builtin_snapshot() -> MasterDataSnapshot:
+    """initial_data の定義から作るスナップショット（DBに接続できない場合の初期値）"""
+    return MasterDataSnapshot(
+        BUILTIN_VERSION,
+        (PhaseRecord(**p) for p in PHASES),
+        (StageRecord(**{"is_milestone": False, **s}) for s in STAGES),
+        (RoleRecord(**r) for r in ROLES),
+    )
+
+
+async def fetch_master_data_version(db: AsyncSession) -> str:
+    """件数と最終更新日時から作るバージョン（1クエリ）"""
+    result = await db.execute(union_all(*(
+        select(literal(model.__tablename__), func.count(), func.max(model.updated_at))
+        for model in (Phase, Stage, Role)
+    )))
+    parts = sorted(f"{name}:{count}:{updated_at.isoformat() if updated_at else ''}" for name, count, updated_at in result.all())
+    return hashlib.sha1("|".join(parts).encode()).hexdigest()[:16]
+
+
+async def load_master_data(db: AsyncSession, version: Optional[str] = None) -> MasterDataSnapshot:
+    version = version or await fetch_master_data_version(db)
+    phases = (await db.execute(select(Phase.code, Phase.name, Phase.display_order, Phase.color_code))).all()
+    stages = (await db.execute(
+        select(Stage.code, Stage.name, Stage.display_order, Stage.phase_code, Stage.is_milestone)
+    )).all()
+    roles = (await db.execute(select(Role.code, Role.name))).all()
+    return MasterDataSnapshot(
+        version,
+        (PhaseRecord(**row._mapping) for row in phases),
+        (StageRecord(**row._mapping) for row in stages),
+        (RoleRecord(**row._mapping) for row in roles),
+    )
+
+
+class MasterDataRegistry:
+    """プロセス全体で共有するレジストリ。current の参照の差し替えだけで更新する"""
+
+    def __init__(self, check_interval: Optional[float] = None):
+        self.current = builtin_snapshot()
+        self.check_interval = (
+            settings.MASTER_DATA_VERSION_CHECK_SECONDS if check_interval is None else check_interval
+        )
+        self._checked_at = float("-inf")
+        self._lock = asyncio.Lock()
+
+    async def refresh(self, db: AsyncSession, force: bool = False) -> MasterDataSnapshot:
+        """
+        前回の確認から check_interval 秒以上経っていればバージョンを確認し、
+        変わっていれば読み直す（同時に呼ばれても確認は1回）
+        """
+        if not force and time.monotonic() - self._checked_at < self.check_interval:
+            return self.current
+        async with self._lock:
+            if not force and time.monotonic() - self._checked_at < self.check_interval:
+                return self.current
+            version = await fetch_master_data_version(db)
+            if force or version != self.current.version:
+                snapshot = await load_master_data(db, version)
+                if snapshot.stages:
+                    self.current = snapshot
+                    logger.info(f"Loaded master data version {version}")
+                else:
+                    logger.warning("Master data tables are empty; keeping built-in definitions")
+            self._checked_at = time.monotonic()
+        return self.current
+
+
+master_data_registry = MasterDataRegistry()
+
+
+def get_master_data() -> MasterDataSnapshot:
+    return master_data_registry.current
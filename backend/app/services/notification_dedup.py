@@ -0,0 +1,111 @@
+"""
+通知の重複排除（同じ宛先・同じ対象への繰り返し通知を1件にまとめる）
+- キー: (テナント, 宛先, 種別, 対象)。対象は related_task_id / related_stage_id、
+  どちらもない種別は metadata の項目から作る（ボトルネックなら role と task_name。
+  検出バッチは task_name にステージ名を入れるので、実質ロール+ステージ名になる）
+- DB では notification_dedup_keys（キー → 通知ID・作成日時）が正。notifications は作成月で
+  パーティション分割しているため、一意制約は通知テーブルではなくこの表に持つ
+- ウィンドウ内の繰り返しは既存行の更新（metadata.occurrences の加算）になり、配信はしない
+- プロセス内の TTL キャッシュで、直近に作成したキー → (通知ID, 作成日時) を覚えておき、キーの確保を省く
+"""
+
+import hashlib
+import threading
+import time
+from typing import Any, Dict, Optional, Tuple
+from uuid import UUID
+
+from sqlalchemy import Column, DateTime, String, Table
+from sqlalchemy.dialects.postgresql import UUID as PGUUID
+
+from app.core.config import settings
+from app.db.base import Base
+from app.models.notification import NotificationTypeEnum
+from app.schemas.notification import NotificationCreate
+
+# 重複排除する種別と、関連IDがない場合に対象を表す metadata の項目
+DEDUP_SUBJECT_METADATA: Dict[NotificationTypeEnum, Tuple[str, ...]] = {
+    NotificationTypeEnum.TASK_DEADLINE: ("task_name",),
+    NotificationTypeEnum.STAGE_DELAYED: ("stage_name",),
+    NotificationTypeEnum.BOTTLENECK_ALERT: ("role", "task_name"),
+}
+
+OCCURRENCES_KEY = "occurrences"
+
+# キーの所有者（ウィンドウ内で最初に作成された通知）。期限切れの行はパージで削除する
+notification_dedup_keys = Table(
+    "notification_dedup_keys",
+    Base.metadata,
+    Column("dedup_key", String(64), primary_key=True),
+    Column("notification_id", PGUUID(as_uuid=True), nullable=False),
+    Column("notification_created_at", DateTime(timezone=True), nullable=False, index=True),
+)
+
+
+def dedup_key(notification_data: NotificationCreate, tenant_id: UUID) -> Optional[str]:
+    """重複排除キー（対象外の種別なら None）"""
+    metadata_keys = DEDUP_SUBJECT_METADATA.get(notification_data.type)
+    if metadata_keys is None:
+        return None
+    if notification_data.related_task_id:
+        subject = f"task:{notification_data.related_task_id}"
+    elif notification_data.related_stage_id:
+        subject = f"stage:{notification_data.related_stage_id}"
+    else:
+        metadata = notification_data.metadata or {}
+        subject = ":".join(
+            [f"project:{notification_data.related_project_id}"]
+            + [str(metadata.get(key)) for key in metadata_keys]
+        )
+    raw = f"{tenant_id}:{notification_data.recipient_id}:{notification_data.type}:{subject}"
+    return hashlib.sha1(raw.encode()).hexdigest()
+
+
+class DedupCache:
+    """キー → 値 の TTL キャッシュ（スレッドセーフ・上限件数あり）"""
+
+    def __init__(self, ttl_seconds: float, max_entries: int = 100_000):
+        self.ttl_seconds = ttl_seconds
+        self.max_entries = max_entries
+        self._entries: Dict[str, Tuple[Any, float]] = {}
+        self._lock = threading.Lock()
+
+    def get(self, key: str) -> Optional[Any]:
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return None
+            if entry[1] <= time.monotonic():
+                del self._entries[key]
+                return None
+            return entry[0]
+
+    def put(self, key: str, value: Any, created_at_age: float = 0.0):
+        """created_at_age: 既存通知の経過秒数（ウィンドウの残りだけ保持する）"""
+        ttl = self.ttl_seconds - created_at_age
+        if ttl <= 0:
+            return
+        with self._lock:
+            if len(self._entries) >= self.max_entries:
+                self._evict_expired()
+                if len(self._entries) >= self.max_entries:
+                    # 挿入順で古いものから捨てる
+                    for stale in list(self._entries)[: self.max_entries // 10 or 1]:
+                        del self._entries[stale]
+            self._entries[key] = (value, time.monotonic() + ttl)
+
+    def discard(self, key: str):
+        with self._lock:
+            self._entries.pop(key, None)
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+    def _evict_expired(self):
+        now = time.monotonic()
+        for key in [k for k, (_, expires_at) in self._entries.items() if expires_at <= now]:
+            del self._entries[key]
+
+
+notification_dedup_cache = DedupCache(settings.NOTIFICATION_DEDUP_WINDOW_MINUTES * 60)
@@ -0,0 +1,303 @@
+"""
+通知の保持期間管理
+- notifications / notification_delivery_logs は created_at の月単位でレンジパーティション分割
+  （<テーブル>_pYYYY_MM、範囲外は <テーブル>_default）
+- パージジョブ
+    1. 数か月先までのパーティションを作成（default に同じ月の行があれば、default を切り離して作成し、
+       行を移してから default を戻す）
+    2. 全テナントの保持期間より古い月のパーティションは DETACH + DROP（行削除なし）
+    3. 期限切れ（expires_at）・テナントごとの保持期間を過ぎた通知をチャンクごとに DELETE してコミット
+       （長いロックや巨大なトランザクションを避ける）
+    4. 重複排除キー・配信ログ・配信のデッドレターの古い行を同様に削除
+- テナントごとの保持期間は notification_retention_policies（未設定のテナントは設定値の既定）
+"""
+
+import logging
+import re
+from dataclasses import dataclass, field
+from datetime import date, datetime, timedelta, timezone
+from typing import Dict, List, Optional, Tuple
+from uuid import UUID
+
+from sqlalchemy import (
+    Column, DateTime, ForeignKey, Integer, Table, and_, delete, func, or_, select, text
+)
+from sqlalchemy.dialects.postgresql import UUID as PGUUID, insert as pg_insert
+from sqlalchemy.orm import Session
+
+from app.core.config import settings
+from app.db.base import Base
+from app.db.session import SessionLocal
+from app.models.notification import Notification, NotificationDeliveryLog
+from app.services.delivery_retry import notification_dead_letters
+from app.services.notification_dedup import notification_dedup_keys
+
+logger = logging.getLogger(__name__)
+
+# テナントごとの保持期間（日数）。read_retention_days は既読通知に短い期間を設定する場合のみ
+notification_retention_policies = Table(
+    "notification_retention_policies",
+    Base.metadata,
+    Column("tenant_id", PGUUID(as_uuid=True), ForeignKey("tenants.id", ondelete="CASCADE"), primary_key=True),
+    Column("retention_days", Integer, nullable=False),
+    Column("read_retention_days", Integer, nullable=True),
+    Column("created_at", DateTime(timezone=True), server_default=func.now(), nullable=False),
+    Column("updated_at", DateTime(timezone=True), server_default=func.now(), onupdate=func.now(), nullable=False),
+)
+
+PARTITION_NAME_PATTERN = re.compile(r"_p(\d{4})_(\d{2})$")
+
+
+def month_start(value: date) -> date:
+    return date(value.year, value.month, 1)
+
+
+def add_months(value: date, months: int) -> date:
+    index = value.year * 12 + value.month - 1 + months
+    return date(index // 12, index % 12 + 1, 1)
+
+
+def partition_name(table_name: str, month: date) -> str:
+    return f"{table_name}_p{month:%Y_%m}"
+
+
+def default_partition_name(table_name: str) -> str:
+    return f"{table_name}_default"
+
+
+@dataclass
+class RetentionPolicy:
+    retention_days: int
+    read_retention_days: Optional[int] = None
+
+
+@dataclass
+class PurgeResult:
+    created_partitions: List[str] = field(default_factory=list)
+    dropped_partitions: List[str] = field(default_factory=list)
+    deleted: Dict[str, int] = field(default_factory=dict)
+
+    def add(self, name: str, count: int):
+        self.deleted[name] = self.deleted.get(name, 0) + count
+
+
+class NotificationRetentionManager:
+    def __init__(self, db: Session, chunk_size: Optional[int] = None):
+        self.db = db
+        self.chunk_size = chunk_size or settings.NOTIFICATION_PURGE_CHUNK_SIZE
+        self.notifications = Notification.__table__
+        self.delivery_logs = NotificationDeliveryLog.__table__
+
+    # --- 保持期間設定 ---
+
+    def default_policy(self) -> RetentionPolicy:
+        return RetentionPolicy(
+            retention_days=settings.NOTIFICATION_RETENTION_DAYS,
+            read_retention_days=settings.NOTIFICATION_READ_RETENTION_DAYS
+        )
+
+    def get_policy(self, tenant_id: UUID) -> RetentionPolicy:
+        row = self.db.execute(
+            select(
+                notification_retention_policies.c.retention_days,
+                notification_retention_policies.c.read_retention_days
+            ).where(notification_retention_policies.c.tenant_id == tenant_id)
+        ).first()
+        return RetentionPolicy(*row) if row else self.default_policy()
+
+    def set_policy(self, tenant_id: UUID, policy: RetentionPolicy) -> RetentionPolicy:
+        stmt = pg_insert(notification_retention_policies).values(
+            tenant_id=tenant_id,
+            retention_days=policy.retention_days,
+            read_retention_days=policy.read_retention_days
+        )
+        self.db.execute(stmt.on_conflict_do_update(
+            index_elements=[notification_retention_policies.c.tenant_id],
+            set_={
+                "retention_days": stmt.excluded.retention_days,
+                "read_retention_days": stmt.excluded.read_retention_days,
+                "updated_at": func.now(),
+            }
+        ))
+        self.db.commit()
+        return policy
+
+    def _policies(self) -> Dict[UUID, RetentionPolicy]:
+        result = self.db.execute(select(
+            notification_retention_policies.c.tenant_id,
+            notification_retention_policies.c.retention_days,
+            notification_retention_policies.c.read_retention_days
+        ))
+        return {tenant_id: RetentionPolicy(days, read_days) for tenant_id, days, read_days in result}
+
+    # --- パーティション ---
+
+    def list_partitions(self, table_name: str) -> List[Tuple[str, date]]:
+        """月パーティションの (名前, 月初) を古い順に返す（default は含まない）"""
+        result = self.db.execute(text(
+            "SELECT child.relname FROM pg_inherits "
+            "JOIN pg_class parent ON parent.oid = pg_inherits.inhparent "
+            "JOIN pg_class child ON child.oid = pg_inherits.inhrelid "
+            "WHERE parent.relname = :parent"
+        ), {"parent": table_name})
+        partitions = []
+        for (name,) in result:
+            match = PARTITION_NAME_PATTERN.search(name)
+            if match:
+                partitions.append((name, date(int(match.group(1)), int(match.group(2)), 1)))
+        return sorted(partitions, key=lambda p: p[1])
+
+    def default_partition_has_rows(self, table_name: str, start: date, end: date) -> bool:
+        """default パーティションに [start, end) の行があるか（default がなければ False）"""
+        default = default_partition_name(table_name)
+        if self.db.execute(text("SELECT to_regclass(:name)"), {"name": default}).scalar() is None:
+            return False
+        return bool(self.db.execute(text(
+            f'SELECT EXISTS (SELECT 1 FROM "{default}" WHERE created_at >= :start AND created_at < :end)'
+        ), {"start": start, "end": end}).scalar())
+
+    def create_partition(self, table_name: str, start: date):
+        """月パーティションを作成。default に同じ範囲の行があると作成できないため、その行を新しいパーティションへ移す"""
+        name = partition_name(table_name, start)
+        end = add_months(start, 1)
+        bounds = f"FOR VALUES FROM ('{start.isoformat()}') TO ('{end.isoformat()}')"
+        if not self.default_partition_has_rows(table_name, start, end):
+            self.db.execute(text(f'CREATE TABLE IF NOT EXISTS "{name}" PARTITION OF "{table_name}" {bounds}'))
+            self.db.commit()
+            return
+
+        default = default_partition_name(table_name)
+        params = {"start": start, "end": end}
+        self.db.execute(text(f'ALTER TABLE "{table_name}" DETACH PARTITION "{default}"'))
+        self.db.execute(text(f'CREATE TABLE "{name}" PARTITION OF "{table_name}" {bounds}'))
+        self.db.execute(text(
+            f'INSERT INTO "{name}" SELECT * FROM "{default}" WHERE created_at >= :start AND created_at < :end'
+        ), params)
+        self.db.execute(text(f'DELETE FROM "{default}" WHERE created_at >= :start AND created_at < :end'), params)
+        self.db.execute(text(f'ALTER TABLE "{table_name}" ATTACH PARTITION "{default}" DEFAULT'))
+        self.db.commit()
+        logger.warning(f"Moved rows for {name} out of {default}")
+
+    def ensure_partitions(self, table_name: str, today: date, months_ahead: int) -> List[str]:
+        """今月から months_ahead か月先までのパーティションを作成"""
+        existing = {name for name, _ in self.list_partitions(table_name)}
+        created = []
+        for offset in range(months_ahead + 1):
+            start = add_months(month_start(today), offset)
+            name = partition_name(table_name, start)
+            if name in existing:
+                continue
+            try:
+                self.create_partition(table_name, start)
+            except Exception:
+                self.db.rollback()
+                logger.exception(f"Failed to create partition {name}")
+                continue
+            created.append(name)
+        return created
+
+    def drop_partitions_before(self, table_name: str, cutoff: datetime) -> List[str]:
+        """月末が cutoff 以前のパーティションを切り離して削除"""
+        dropped = []
+        for name, start in self.list_partitions(table_name):
+            end = add_months(start, 1)
+            if datetime.combine(end, datetime.min.time(), tzinfo=timezone.utc) > cutoff:
+                break
+            self.db.execute(text(f'ALTER TABLE "{table_name}" DETACH PARTITION "{name}"'))
+            self.db.execute(text(f'DROP TABLE "{name}"'))
+            self.db.commit()
+            dropped.append(name)
+        return dropped
+
+    # --- 行の削除 ---
+
+    def _delete_in_chunks(self, table: Table, condition, key_columns) -> int:
+        """condition に一致する行を chunk_size 件ずつ削除し、チャンクごとにコミット"""
+        total = 0
+        while True:
+            chunk = select(*key_columns).where(condition).limit(self.chunk_size).subquery()
+            result = self.db.execute(
+                delete(table).where(*[column == chunk.c[column.name] for column in key_columns])
+            )
+            self.db.commit()
+            total += result.rowcount
+            if result.rowcount < self.chunk_size:
+                return total
+
+    def _notification_condition(self, policy: RetentionPolicy, now: datetime):
+        table = self.notifications
+        condition = table.c.created_at < now - timedelta(days=policy.retention_days)
+        if policy.read_retention_days is not None:
+            condition = or_(condition, and_(
+                table.c.is_read == True,
+                table.c.created_at < now - timedelta(days=policy.read_retention_days)
+            ))
+        return condition
+
+    def purge_notifications(self, now: datetime, result: PurgeResult):
+        table = self.notifications
+        keys = (table.c.id, table.c.created_at)
+
+        result.add("expired", self._delete_in_chunks(
+            table, and_(table.c.expires_at.isnot(None), table.c.expires_at < now), keys
+        ))
+
+        policies = self._policies()
+        for tenant_id, policy in policies.items():
+            result.add("retention", self._delete_in_chunks(
+                table, and_(table.c.tenant_id == tenant_id, self._notification_condition(policy, now)), keys
+            ))
+        default_condition = self._notification_condition(self.default_policy(), now)
+        if policies:
+            default_condition = and_(table.c.tenant_id.notin_(list(policies)), default_condition)
+        result.add("retention", self._delete_in_chunks(table, default_condition, keys))
+
+    def purge_dedup_keys(self, now: datetime, result: PurgeResult):
+        window_start = now - timedelta(minutes=settings.NOTIFICATION_DEDUP_WINDOW_MINUTES)
+        result.add("dedup_keys", self._delete_in_chunks(
+            notification_dedup_keys,
+            notification_dedup_keys.c.notification_created_at < window_start,
+            (notification_dedup_keys.c.dedup_key,)
+        ))
+
+    def purge_delivery_logs(self, cutoff: datetime, result: PurgeResult):
+        table = self.delivery_logs
+        result.add("delivery_logs", self._delete_in_chunks(
+            table, table.c.created_at < cutoff, (table.c.id, table.c.created_at)
+        ))
+        result.add("dead_letters", self._delete_in_chunks(
+            notification_dead_letters, notification_dead_letters.c.failed_at < cutoff, (notification_dead_letters.c.id,)
+        ))
+
+    # --- まとめて実行 ---
+
+    def run(self, now: Optional[datetime] = None) -> PurgeResult:
+        now = now or datetime.now(timezone.utc)
+        result = PurgeResult()
+        months_ahead = settings.NOTIFICATION_PARTITION_MONTHS_AHEAD
+        for table in (self.notifications, self.delivery_logs):
+            result.created_partitions += self.ensure_partitions(table.name, now.date(), months_ahead)
+
+        # どのテナントの保持期間よりも古い月は丸ごと削除できる
+        longest_days = max(
+            [self.default_policy().retention_days] + [p.retention_days for p in self._policies().values()]
+        )
+        notification_cutoff = now - timedelta(days=longest_days)
+        log_cutoff = now - timedelta(days=settings.NOTIFICATION_DELIVERY_LOG_RETENTION_DAYS)
+        result.dropped_partitions += self.drop_partitions_before(self.notifications.name, notification_cutoff)
+        result.dropped_partitions += self.drop_partitions_before(self.delivery_logs.name, log_cutoff)
+
+        self.purge_notifications(now, result)
+        self.purge_dedup_keys(now, result)
+        self.purge_delivery_logs(log_cutoff, result)
+
+        logger.info(
+            f"Notification purge: created {result.created_partitions}, "
+            f"dropped {result.dropped_partitions}, deleted {result.deleted}"
+        )
+        return result
+
+
+def run_notification_purge(now: Optional[datetime] = None) -> PurgeResult:
+    with SessionLocal() as db:
+        return NotificationRetentionManager(db).run(now)
@@ -1,10 +1,13 @@
-from datetime import datetime, timedelta
-from typing import List, Optional, Dict, Any
+from datetime import date, datetime, timedelta, timezone
+from typing import List, Optional, Dict, Any, Sequence, Set, Tuple
 from uuid import UUID
 from sqlalchemy.orm import Session
-from sqlalchemy import and_, or_, desc, func
+from sqlalchemy import Integer, and_, any_, bindparam, or_, cast, column, desc, func, select, tuple_, update, values
+from sqlalchemy.dialects.postgresql import ARRAY, JSONB, insert as pg_insert
 import json
 import asyncio
+import logging
+import uuid
 
 from app.models.notification import (
     Notification, 
@@ -13,8 +16,19 @@ from app.models.notification import (
     NotificationTypeEnum,
     NotificationPriorityEnum
 )
+from app.core.config import settings
+from app.db.session import SessionLocal
 from app.models.user import User
 from app.models.project import Project
+from app.services.delivery_retry import DeliveryFailed, schedule_retries
+from app.services.delivery_scheduler import get_delivery_scheduler
+from app.services.notification_dedup import (
+    OCCURRENCES_KEY,
+    dedup_key,
+    notification_dedup_cache,
+    notification_dedup_keys,
+)
+from app.services.schedule_engine import ProjectSchedule
 from app.schemas.notification import (
     NotificationCreate,
     NotificationCreateBulk,
@@ -25,10 +39,26 @@ from app.schemas.notification import (
     NotificationStats
 )
 
+# notifications テーブルの metadata 列（モデル属性名ではなく列名で参照する）
+METADATA_COLUMN = "metadata"
+
+# 重複排除キーの確保と既存通知への合流を試す回数（並行する作成と競合した場合）
+DEDUP_CLAIM_ATTEMPTS = 3
+
+logger = logging.getLogger(__name__)
+
+# 完了を待たずに始めた配信（タスクが GC されないよう参照を持っておく）
+_background_deliveries: Set[asyncio.Task] = set()
+
 
 class NotificationService:
-    def __init__(self, db: Session):
+    def __init__(self, db: Session, wait_for_delivery: bool = True):
+        """
+        wait_for_delivery=False なら配信の完了（レート制限の待ちを含む）を待たずに返す（API リクエスト用）。
+        バッチや Celery タスクはイベントループが終わる前に配信を終えるため既定の True のまま使う
+        """
         self.db = db
+        self.wait_for_delivery = wait_for_delivery
     
     # 通知作成
     async def create_notification(
@@ -36,18 +66,14 @@ class NotificationService:
         notification_data: NotificationCreate,
         tenant_id: UUID
     ) -> Notification:
-        """単一通知を作成"""
-        notification = Notification(
-            **notification_data.dict(),
-            tenant_id=tenant_id
-        )
-        self.db.add(notification)
-        self.db.commit()
-        self.db.refresh(notification)
+        """単一通知を作成（重複排除の対象なら既存通知を更新し、配信しない）"""
+        notifications, created = self._store_notifications([(notification_data, tenant_id)])
         
         # 通知配信を実行
-        await self._deliver_notification(notification)
-        return notification
+        await self._deliver(created)
+        if not notifications:
+            raise RuntimeError("Notification was not stored")
+        return notifications[0]
     
     async def create_bulk_notification(
         self, 
@@ -55,28 +81,265 @@ class NotificationService:
         tenant_id: UUID
     ) -> List[Notification]:
         """一括通知作成"""
-        notifications = []
         base_data = notification_data.dict()
         recipient_ids = base_data.pop('recipient_ids')
+        return await self.create_notifications([
+            (NotificationCreate(**base_data, recipient_id=recipient_id), tenant_id)
+            for recipient_id in recipient_ids
+        ])
+    
+    async def create_notifications(
+        self,
+        items: Sequence[Tuple[NotificationCreate, UUID]]
+    ) -> List[Notification]:
+        """
+        宛先・内容の異なる通知をまとめて作成（(通知内容, tenant_id) の列、コミットは1回）
+        配信設定は宛先分を1クエリで先読みし、新規作成した通知だけを配信する
+        """
+        if not items:
+            return []
+        notifications, created = self._store_notifications(items)
+        
+        await self._deliver(created)
+        return notifications
+    
+    # 重複排除
+    def _store_notifications(
+        self,
+        items: Sequence[Tuple[NotificationCreate, UUID]]
+    ) -> Tuple[List[Notification], List[Notification]]:
+        """
+        通知を保存してコミットし、(全通知, 新規作成した通知) を返す
+        重複排除キーのある通知は notification_dedup_keys でキーを確保できたものだけ作成し、
+        ウィンドウ内に同じキーの通知があればその行を更新する（内容を最新にし metadata.occurrences を加算）
+        """
+        now = datetime.now(timezone.utc)
+        window_start = now - timedelta(minutes=settings.NOTIFICATION_DEDUP_WINDOW_MINUTES)
+        
+        plain: List[Notification] = []
+        keyed: Dict[str, Dict[str, Any]] = {}
+        for notification_data, tenant_id in items:
+            key = dedup_key(notification_data, tenant_id)
+            if key is None:
+                plain.append(Notification(**notification_data.dict(), tenant_id=tenant_id))
+            elif key in keyed:
+                # 同じ呼び出し内の重複は1行にまとめて回数だけ数える
+                keyed[key][METADATA_COLUMN][OCCURRENCES_KEY] += 1
+            else:
+                row = {
+                    **notification_data.dict(),
+                    "id": uuid.uuid4(),
+                    "tenant_id": tenant_id,
+                    "dedup_key": key,
+                    "created_at": now,
+                }
+                row[METADATA_COLUMN] = {**(row.get(METADATA_COLUMN) or {}), OCCURRENCES_KEY: 1}
+                keyed[key] = row
+        
+        self.db.add_all(plain)
+        self.db.flush()
+        
+        # key -> (通知ID, 作成日時, 新規作成か)
+        stored: Dict[str, Tuple[UUID, datetime, bool]] = {}
+        untracked: List[str] = []
+        if keyed:
+            stored, untracked = self._store_keyed(keyed, now, window_start)
+        self.db.commit()
         
-        for recipient_id in recipient_ids:
-            notification = Notification(
-                **base_data,
-                recipient_id=recipient_id,
-                tenant_id=tenant_id
+        # コミットで失効した属性を1クエリで読み直す
+        stored_ids = [notification_id for notification_id, _, _ in stored.values()]
+        by_id = {
+            n.id: n for n in self.db.query(Notification).filter(
+                Notification.id.in_([n.id for n in plain] + stored_ids)
             )
+        }
+        notifications = list(plain)
+        created = list(plain)
+        for key, (notification_id, created_at, is_new) in stored.items():
+            notification = by_id[notification_id]
             notifications.append(notification)
-            self.db.add(notification)
-        
-        self.db.commit()
-        
-        # 通知配信を並行実行
-        await asyncio.gather(*[
-            self._deliver_notification(notification) 
-            for notification in notifications
+            if is_new:
+                created.append(notification)
+            if key in untracked:
+                continue
+            notification_dedup_cache.put(
+                key, (notification_id, created_at), (now - created_at).total_seconds()
+            )
+        return notifications, created
+    
+    def _store_keyed(
+        self,
+        keyed: Dict[str, Dict[str, Any]],
+        now: datetime,
+        window_start: datetime
+    ) -> Tuple[Dict[str, Tuple[UUID, datetime, bool]], List[str]]:
+        """
+        重複排除キーのある通知を作成するか、ウィンドウ内の既存通知に合流させる
+        返り値: (key -> (通知ID, 作成日時, 新規作成か), キーを確保できず重複排除なしで作成したキー)
+        """
+        owners: Dict[str, Tuple[UUID, datetime]] = {}
+        for key in keyed:
+            owner = notification_dedup_cache.get(key)
+            if owner is not None:
+                owners[key] = owner
+        pending = [key for key in keyed if key not in owners]
+        
+        stored = self._insert_claimed(keyed, pending, now, window_start)
+        unclaimed = [key for key in pending if key not in stored]
+        for _ in range(DEDUP_CLAIM_ATTEMPTS):
+            if unclaimed:
+                found = self._dedup_key_owners(unclaimed)
+                owners.update(found)
+                # 確認までの間に登録が消えたキーはそのまま確保できる
+                stored.update(self._insert_claimed(
+                    keyed, [key for key in unclaimed if key not in found], now, window_start
+                ))
+            if owners:
+                # ウィンドウ内の既存通知を更新する
+                coalesced = self._coalesce({key: keyed[key] for key in owners}, owners, window_start)
+                stored.update({
+                    key: (notification_id, created_at, False)
+                    for key, (notification_id, created_at) in coalesced.items()
+                })
+                # 更新できなかったキー（通知がウィンドウ外・削除済み）は、確認した所有者のままなら奪って作り直す
+                stale = {key: owner[0] for key, owner in owners.items() if key not in coalesced}
+                for key in stale:
+                    notification_dedup_cache.discard(key)
+                stored.update(self._insert_claimed(keyed, list(stale), now, window_start, stale))
+            unclaimed = [key for key in keyed if key not in stored]
+            owners = {}
+            if not unclaimed:
+                break
+        
+        # 競合が続いたキーは重複排除なしで作成する（通知を落とさない）
+        if unclaimed:
+            self._insert_rows([{**keyed[key], "dedup_key": None} for key in unclaimed])
+            stored.update({key: (keyed[key]["id"], now, True) for key in unclaimed})
+        return stored, unclaimed
+    
+    def _insert_claimed(
+        self,
+        keyed: Dict[str, Dict[str, Any]],
+        keys: List[str],
+        now: datetime,
+        window_start: datetime,
+        replace_owners: Optional[Dict[str, UUID]] = None
+    ) -> Dict[str, Tuple[UUID, datetime, bool]]:
+        """キーを確保できた通知だけを作成"""
+        claimed = self._claim_dedup_keys([keyed[key] for key in keys], window_start, replace_owners)
+        if not claimed:
+            return {}
+        self._insert_rows([keyed[key] for key in claimed])
+        return {key: (keyed[key]["id"], now, True) for key in claimed}
+    
+    def _insert_rows(self, rows: List[Dict[str, Any]]):
+        self.db.execute(pg_insert(Notification.__table__).values(rows))
+    
+    def _claim_dedup_keys(
+        self,
+        rows: List[Dict[str, Any]],
+        window_start: datetime,
+        replace_owners: Optional[Dict[str, UUID]] = None
+    ) -> List[str]:
+        """
+        通知のキーを確保（未登録か、登録済みの通知がウィンドウ外なら置き換え）
+        replace_owners（key -> 通知ID）のキーは、登録がその通知のままならウィンドウ内でも置き換える
+        （通知が削除済みで合流できなかった場合）
+        確保できたキーを返す。確保したキーの行はコミットまでロックされる
+        """
+        if not rows:
+            return []
+        claimable = notification_dedup_keys.c.notification_created_at < window_start
+        if replace_owners:
+            claimable = or_(claimable, tuple_(
+                notification_dedup_keys.c.dedup_key, notification_dedup_keys.c.notification_id
+            ).in_(list(replace_owners.items())))
+        stmt = pg_insert(notification_dedup_keys).values([
+            {
+                "dedup_key": row["dedup_key"],
+                "notification_id": row["id"],
+                "notification_created_at": row["created_at"],
+            }
+            for row in rows
         ])
-        
-        return notifications
+        stmt = stmt.on_conflict_do_update(
+            index_elements=[notification_dedup_keys.c.dedup_key],
+            set_={
+                "notification_id": stmt.excluded.notification_id,
+                "notification_created_at": stmt.excluded.notification_created_at,
+            },
+            where=claimable
+        ).returning(notification_dedup_keys.c.dedup_key)
+        return list(self.db.execute(stmt).scalars())
+    
+    def _dedup_key_owners(self, keys: List[str]) -> Dict[str, Tuple[UUID, datetime]]:
+        result = self.db.execute(
+            select(
+                notification_dedup_keys.c.dedup_key,
+                notification_dedup_keys.c.notification_id,
+                notification_dedup_keys.c.notification_created_at
+            ).where(notification_dedup_keys.c.dedup_key.in_(keys))
+        )
+        return {key: (notification_id, created_at) for key, notification_id, created_at in result}
+    
+    def _coalesce(
+        self,
+        rows: Dict[str, Dict[str, Any]],
+        owners: Dict[str, Tuple[UUID, datetime]],
+        window_start: datetime
+    ) -> Dict[str, Tuple[UUID, datetime]]:
+        """
+        既存通知を1つの UPDATE ... FROM (VALUES ...) で更新（内容を最新にし回数を加算）
+        created_at も条件に含めてパーティションを絞る。更新できたキーを返す
+        """
+        table = Notification.__table__
+        v = values(
+            column("id", table.c.id.type),
+            column("created_at", table.c.created_at.type),
+            column("dedup_key", table.c.dedup_key.type),
+            column("title", table.c.title.type),
+            column("message", table.c.message.type),
+            column("priority", table.c.priority.type),
+            column(METADATA_COLUMN, JSONB),
+            name="v"
+        ).data([
+            (
+                owners[key][0],
+                owners[key][1],
+                key,
+                row["title"],
+                row["message"],
+                row["priority"],
+                row[METADATA_COLUMN],
+            )
+            for key, row in rows.items()
+        ])
+        existing_metadata = table.c[METADATA_COLUMN]
+        incoming_metadata = cast(v.c[METADATA_COLUMN], JSONB)
+        occurrences = (
+            func.coalesce(cast(existing_metadata.op("->>")(OCCURRENCES_KEY), Integer), 1)
+            + cast(incoming_metadata.op("->>")(OCCURRENCES_KEY), Integer)
+        )
+        result = self.db.execute(
+            update(table)
+            .where(
+                table.c.id == v.c.id,
+                table.c.created_at == v.c.created_at,
+                table.c.dedup_key == v.c.dedup_key,
+                table.c.created_at >= window_start
+            )
+            .values({
+                "title": v.c.title,
+                "message": v.c.message,
+                "priority": cast(v.c.priority, table.c.priority.type),
+                METADATA_COLUMN: incoming_metadata.op("||")(
+                    func.jsonb_build_object(OCCURRENCES_KEY, occurrences)
+                ),
+                "updated_at": func.now(),
+            })
+            .returning(table.c.id, table.c.created_at, table.c.dedup_key)
+        )
+        return {key: (notification_id, created_at) for notification_id, created_at, key in result}
     
     # 通知取得
     def get_notifications(
@@ -147,6 +410,45 @@ class NotificationService:
             self.db.refresh(notification)
         return notification
     
+    def mark_read_batch(
+        self,
+        user_id: UUID,
+        tenant_id: UUID,
+        notification_ids: Sequence[UUID] = (),
+        up_to: Optional[datetime] = None
+    ) -> Tuple[List[UUID], datetime]:
+        """
+        指定IDの通知と up_to 以前に作成された通知を1回の UPDATE で既読にする
+        既読にした通知ID（既に既読だったものは含まない）と既読日時を返す
+        """
+        read_at = datetime.utcnow()
+        table = Notification.__table__
+        conditions = []
+        if notification_ids:
+            # id = ANY(:notification_ids) なら件数によらず同じ SQL になる
+            conditions.append(table.c.id == any_(bindparam(
+                "notification_ids", list(notification_ids), type_=ARRAY(table.c.id.type)
+            )))
+        if up_to is not None:
+            conditions.append(table.c.created_at <= up_to)
+        if not conditions:
+            return [], read_at
+        
+        result = self.db.execute(
+            update(table)
+            .where(
+                table.c.recipient_id == user_id,
+                table.c.tenant_id == tenant_id,
+                table.c.is_read == False,
+                or_(*conditions)
+            )
+            .values(is_read=True, read_at=read_at)
+            .returning(table.c.id)
+        )
+        updated = list(result.scalars())
+        self.db.commit()
+        return updated, read_at
+    
     def mark_all_as_read(self, user_id: UUID, tenant_id: UUID) -> int:
         """全通知を既読にする"""
         updated = self.db.query(Notification).filter(
@@ -234,6 +536,17 @@ class NotificationService:
             NotificationPreferences.tenant_id == tenant_id
         ).first()
     
+    def _get_preferences_for(
+        self,
+        notifications: Sequence[Notification]
+    ) -> Dict[Tuple[UUID, UUID], NotificationPreferences]:
+        """通知の宛先ごとの通知設定を一括取得"""
+        keys = list({(n.recipient_id, n.tenant_id) for n in notifications})
+        preferences = self.db.query(NotificationPreferences).filter(
+            tuple_(NotificationPreferences.user_id, NotificationPreferences.tenant_id).in_(keys)
+        ).all()
+        return {(p.user_id, p.tenant_id): p for p in preferences}
+    
     def create_or_update_preferences(
         self,
         user_id: UUID,
@@ -262,35 +575,95 @@ class NotificationService:
         return preferences
     
     # 通知配信
-    async def _deliver_notification(self, notification: Notification):
-        """通知を配信する"""
-        preferences = self.get_notification_preferences(
-            notification.recipient_id, 
-            notification.tenant_id
-        )
-        
+    async def _deliver(self, notifications: Sequence[Notification]):
+        """通知を配信し、失敗したチャネルをまとめて再送に登録する（INSERT・コミットは1回）"""
+        if not notifications:
+            return
+        if not self.wait_for_delivery:
+            task = asyncio.create_task(_deliver_in_background([n.id for n in notifications]))
+            _background_deliveries.add(task)
+            task.add_done_callback(_background_deliveries.discard)
+            return
+        preferences = self._get_preferences_for(notifications)
+        results = await asyncio.gather(*[
+            self._deliver_with_preferences(
+                notification,
+                preferences.get((notification.recipient_id, notification.tenant_id))
+            )
+            for notification in notifications
+        ])
+        failures = [failure for result in results for failure in result]
+        if failures:
+            schedule_retries(self.db, failures)
+    
+    async def _deliver_with_preferences(
+        self,
+        notification: Notification,
+        preferences: Optional[NotificationPreferences]
+    ) -> List[Tuple[Notification, str, DeliveryFailed]]:
+        """取得済みの通知設定に従って配信し、失敗したチャネルを返す"""
         if not preferences:
             # デフォルト設定で配信
-            await self._send_websocket_notification(notification)
-            return
+            return await self._schedule_delivery(notification, ["websocket"])
         
         # 勤務時間外チェック
         if not self._should_deliver_now(notification, preferences):
-            return
+            return []
         
         # 配信方法に応じて送信
         delivery_methods = notification.delivery_methods or ["websocket"]
         
-        tasks = []
+        channels = []
         if "websocket" in delivery_methods:
-            tasks.append(self._send_websocket_notification(notification))
+            channels.append("websocket")
         if "email" in delivery_methods and preferences.enable_email_notifications:
-            tasks.append(self._send_email_notification(notification))
+            channels.append("email")
         if "push" in delivery_methods and preferences.enable_push_notifications:
-            tasks.append(self._send_push_notification(notification))
+            channels.append("push")
         
-        if tasks:
-            await asyncio.gather(*tasks)
+        return await self._schedule_delivery(notification, channels)
+    
+    async def _schedule_delivery(
+        self,
+        notification: Notification,
+        channels: List[str]
+    ) -> List[Tuple[Notification, str, DeliveryFailed]]:
+        """
+        チャネルごとの送信を優先度・レート制限つきのスケジューラーに載せ、完了を待つ
+        失敗したチャネルを (通知, チャネル, 例外) で返す
+        """
+        if not channels:
+            return []
+        results = await asyncio.gather(*[
+            self.deliver_channel(notification, channel) for channel in channels
+        ], return_exceptions=True)
+        
+        failures = []
+        for channel, result in zip(channels, results):
+            if isinstance(result, Exception):
+                if not isinstance(result, DeliveryFailed):
+                    # 送信処理の想定外の例外も配信ログに残して再送に回す
+                    result = DeliveryFailed(str(result) or type(result).__name__)
+                    self._log_delivery(notification.id, channel, "failed", str(result))
+                failures.append((notification, channel, result))
+        return failures
+    
+    async def deliver_channel(self, notification: Notification, channel: str):
+        """1チャネルへ送信（スケジューラー経由）。失敗時は DeliveryFailed"""
+        senders = {
+            "websocket": self._send_websocket_notification,
+            "email": self._send_email_notification,
+            "push": self._send_push_notification,
+        }
+        send = senders.get(channel)
+        if send is None:
+            raise DeliveryFailed(f"Unknown delivery channel: {channel}", retryable=False)
+        await get_delivery_scheduler().submit(
+            lambda: send(notification),
+            notification.priority,
+            notification.tenant_id,
+            channel
+        )
     
     def _should_deliver_now(
         self, 
@@ -335,16 +708,19 @@ class NotificationService:
                 "message": notification.message,
                 "action_url": notification.action_url,
                 "created_at": notification.created_at.isoformat(),
-                "metadata": notification.metadata
+                "metadata": notification.meta
             }
         }
         
-        await websocket_manager.send_personal_message(
+        delivered = await websocket_manager.send_personal_message(
             str(notification.recipient_id),
             json.dumps(message)
         )
         
-        # 配信ログ記録
+        # 配信ログ記録（オフラインなら再接続時に再送する）
+        if not delivered:
+            self._log_delivery(notification.id, "websocket", "failed", "Recipient offline")
+            raise DeliveryFailed("Recipient offline")
         self._log_delivery(notification.id, "websocket", "sent")
     
     async def _send_email_notification(self, notification: Notification):
@@ -354,7 +730,7 @@ class NotificationService:
             user = self.db.query(User).filter(User.id == notification.recipient_id).first()
             if not user or not user.email:
                 self._log_delivery(notification.id, "email", "failed", "Recipient email not found")
-                return
+                raise DeliveryFailed("Recipient email not found", retryable=False)
             
             # Import email service
             from app.services.email_service import email_service
@@ -369,14 +745,51 @@ class NotificationService:
                 self.db.commit()
             else:
                 self._log_delivery(notification.id, "email", "failed", "Email sending failed")
+                raise DeliveryFailed("Email sending failed")
                 
+        except DeliveryFailed:
+            raise
         except Exception as e:
             self._log_delivery(notification.id, "email", "failed", str(e))
+            raise DeliveryFailed(str(e))
     
     async def _send_push_notification(self, notification: Notification):
-        """プッシュ通知を送信"""
-        # プッシュ通知の実装（後で実装）
-        self._log_delivery(notification.id, "push", "pending")
+        """プッシュ通知を送信（宛先の全端末へ。失効した購読は削除）"""
+        from app.services import web_push
+        
+        sender = web_push.get_web_push_sender()
+        if sender is None:
+            self._log_delivery(notification.id, "push", "failed", "Web Push is not configured")
+            raise DeliveryFailed("Web Push is not configured", retryable=False)
+        subscriptions = web_push.subscriptions_for(self.db, notification.recipient_id, notification.tenant_id)
+        if not subscriptions:
+            self._log_delivery(notification.id, "push", "failed", "No push subscriptions")
+            raise DeliveryFailed("No push subscriptions", retryable=False)
+        
+        priority = getattr(notification.priority, "value", notification.priority)
+        result = await sender.send(
+            subscriptions,
+            {
+                "id": str(notification.id),
+                "type": getattr(notification.type, "value", notification.type),
+                "priority": priority,
+                "title": notification.title,
+                "message": notification.message,
+                "action_url": notification.action_url,
+            },
+            urgency=web_push.URGENCY_BY_PRIORITY.get(priority, "normal")
+        )
+        web_push.prune_subscriptions(self.db, result.expired)
+        
+        if result.sent:
+            self._log_delivery(notification.id, "push", "sent")
+        elif result.failed:
+            error = "; ".join(result.failed.values())
+            self._log_delivery(notification.id, "push", "failed", error)
+            raise DeliveryFailed(error)
+        else:
+            self._log_delivery(notification.id, "push", "failed", "All push subscriptions expired")
+            raise DeliveryFailed("All push subscriptions expired", retryable=False)
     
     def _log_delivery(
         self, 
@@ -396,6 +809,19 @@ class NotificationService:
         self.db.commit()
 
 
+async def _deliver_in_background(notification_ids: List[UUID]):
+    """
+    通知を別セッションで読み直して配信する
+    リクエストのセッションは応答後に閉じられ、配信ログ・再送の登録に使えないため
+    """
+    try:
+        with SessionLocal() as db:
+            notifications = db.query(Notification).filter(Notification.id.in_(notification_ids)).all()
+            await NotificationService(db)._deliver(notifications)
+    except Exception:
+        logger.exception(f"Background delivery failed for {len(notification_ids)} notifications")
+
+
 # 建築業界特化のヘルパー関数
 class ConstructionNotificationHelpers:
     def __init__(self, service: NotificationService):
@@ -430,32 +856,34 @@ class ConstructionNotificationHelpers:
         
         return await self.service.create_notification(notification_data, tenant_id)
     
-    async def notify_task_deadline(
-        self,
+    @staticmethod
+    def task_deadline_notification(
         task_name: str,
         project_name: str,
         hours_remaining: int,
         recipient_id: UUID,
-        tenant_id: UUID,
         project_id: UUID,
         task_id: Optional[UUID] = None
-    ):
-        """タスク期限通知"""
+    ) -> NotificationCreate:
+        """タスク期限通知の内容（残り時間で優先度を決める）"""
         if hours_remaining <= 0:
             priority = NotificationPriorityEnum.URGENT
             title = "⚠️ タスクの期限が過ぎています"
+            message = f"「{task_name}」の期限を過ぎています（{project_name}）"
         elif hours_remaining <= 24:
             priority = NotificationPriorityEnum.HIGH
             title = "⏰ タスクの期限が迫っています"
+            message = f"「{task_name}」の期限まで{hours_remaining}時間（{project_name}）"
         else:
             priority = NotificationPriorityEnum.MEDIUM
             title = "タスクの期限が近づいています"
+            message = f"「{task_name}」の期限まで{hours_remaining}時間（{project_name}）"
         
-        notification_data = NotificationCreate(
+        return NotificationCreate(
             type=NotificationTypeEnum.TASK_DEADLINE,
             priority=priority,
             title=title,
-            message=f"「{task_name}」の期限まで{hours_remaining}時間（{project_name}）",
+            message=message,
             recipient_id=recipient_id,
             related_project_id=project_id,
             related_task_id=task_id,
@@ -466,7 +894,21 @@ class ConstructionNotificationHelpers:
                 "hours_remaining": hours_remaining
             }
         )
-        
+    
+    async def notify_task_deadline(
+        self,
+        task_name: str,
+        project_name: str,
+        hours_remaining: int,
+        recipient_id: UUID,
+        tenant_id: UUID,
+        project_id: UUID,
+        task_id: Optional[UUID] = None
+    ):
+        """タスク期限通知"""
+        notification_data = self.task_deadline_notification(
+            task_name, project_name, hours_remaining, recipient_id, project_id, task_id
+        )
         return await self.service.create_notification(notification_data, tenant_id)
     
     async def notify_stage_delayed(
@@ -505,7 +947,35 @@ class ConstructionNotificationHelpers:
         )
         
         return await self.service.create_bulk_notification(notification_data, tenant_id)
-    
+
+    async def notify_task_rescheduled(
+        self,
+        schedule: ProjectSchedule,
+        task_id: UUID,
+        new_due_date: Optional[date],
+        project_name: str,
+        recipient_ids: List[UUID],
+        tenant_id: UUID,
+        project_id: UUID,
+        reason: Optional[str] = None
+    ):
+        """タスク期限変更をスケジュールに反映し、遅延したステージを通知（遅延日数はスケジュールから算出）"""
+        changed_delays = schedule.reschedule_task(task_id, new_due_date)
+        stage_names = {stage["code"]: stage["name"] for stage in schedule.stages}
+
+        notifications = []
+        for stage_code, delay_days in schedule.delays_to_notify(task_id, changed_delays).items():
+            notifications.extend(await self.notify_stage_delayed(
+                stage_name=stage_names[stage_code],
+                project_name=project_name,
+                delay_days=delay_days,
+                recipient_ids=recipient_ids,
+                tenant_id=tenant_id,
+                project_id=project_id,
+                reason=reason
+            ))
+        return notifications
+
     async def notify_bottleneck_alert(
         self,
         role: str,
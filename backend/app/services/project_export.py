@@ -0,0 +1,126 @@
+"""
+プロジェクト × ステージのマトリクス出力（現場ボード形式の CSV / XLSX）
+- (プロジェクト, ステージ) 集計を1クエリで取得し、サーバーサイドカーソルで yield_per 件ずつ読む
+- プロジェクト順に並べた行を連続したまとまりごとに1行へ組み立てるため、全件をメモリに載せない
+- XLSX は openpyxl の write_only モードで書き、一時ファイル経由でチャンクごとに返す
+"""
+
+import csv
+import io
+import tempfile
+from datetime import date
+from typing import Any, AsyncIterator, List, Optional
+from uuid import UUID
+
+from openpyxl import Workbook
+from sqlalchemy import and_, case, func, select
+from sqlalchemy.ext.asyncio import AsyncSession
+from starlette.concurrency import run_in_threadpool
+
+from app.db.initial_data import STAGES
+from app.models import Task
+from app.models.project import Project
+from app.services.task_service import TASK_STATUS_DONE
+
+EXPORT_FETCH_SIZE = 2000
+CSV_ROWS_PER_CHUNK = 500
+FILE_CHUNK_SIZE = 64 * 1024
+
+DONE_MARKER = "済"
+
+PROJECT_HEADERS = ["工事コード", "邸名", "顧客名", "ステータス", "着工予定日"]
+
+# 出力するステージ列（表示順）
+EXPORT_STAGES = sorted(STAGES, key=lambda s: s["display_order"])
+STAGE_COLUMN_INDEX = {stage["code"]: i for i, stage in enumerate(EXPORT_STAGES)}
+
+
+def header_row() -> List[str]:
+    return PROJECT_HEADERS + [stage["name"] for stage in EXPORT_STAGES]
+
+
+def stage_cell(due_date: Optional[date], all_done: bool) -> Any:
+    """ステージのセル値（期限日。完了済みは取り込み時と同じ「日付 済」形式）"""
+    if all_done:
+        return f"{due_date:%Y/%m/%d} {DONE_MARKER}" if due_date else DONE_MARKER
+    return due_date
+
+
+class ProjectExporter:
+    def __init__(self, db: AsyncSession, fetch_size: int = EXPORT_FETCH_SIZE):
+        self.db = db
+        self.fetch_size = fetch_size
+
+    def _matrix_query(self, tenant_id: UUID):
+        all_done = func.min(case((Task.status == TASK_STATUS_DONE, 1), else_=0))
+        return (
+            select(
+                Project.id,
+                Project.code,
+                Project.name,
+                Project.customer_name,
+                Project.status,
+                Project.estimated_start_date,
+                Task.stage_code,
+                func.max(Task.due_date),
+                all_done,
+            )
+            .outerjoin(Task, and_(Task.project_id == Project.id, Task.tenant_id == Project.tenant_id))
+            .where(Project.tenant_id == tenant_id)
+            .group_by(
+                Project.id, Project.code, Project.name, Project.customer_name,
+                Project.status, Project.estimated_start_date, Task.stage_code
+            )
+            .order_by(Project.code, Project.id)
+            .execution_options(yield_per=self.fetch_size)
+        )
+
+    async def iter_rows(self, tenant_id: UUID) -> AsyncIterator[List[Any]]:
+        """1プロジェクト1行（プロジェクト列 + ステージ列）を順に返す"""
+        result = await self.db.stream(self._matrix_query(tenant_id))
+        current_id = None
+        row: List[Any] = []
+        async for project_id, code, name, customer_name, status, start_date, stage_code, due_date, all_done in result:
+            if project_id != current_id:
+                if current_id is not None:
+                    yield row
+                current_id = project_id
+                row = [code, name, customer_name, status, start_date] + [None] * len(EXPORT_STAGES)
+            index = STAGE_COLUMN_INDEX.get(stage_code)
+            if index is not None:
+                row[len(PROJECT_HEADERS) + index] = stage_cell(due_date, bool(all_done))
+        if current_id is not None:
+            yield row
+
+    async def iter_csv(self, tenant_id: UUID) -> AsyncIterator[bytes]:
+        """CSV（Excelで開けるよう BOM 付き UTF-8）"""
+        buffer = io.StringIO()
+        writer = csv.writer(buffer)
+        buffer.write("\ufeff")
+        writer.writerow(header_row())
+        count = 0
+        async for row in self.iter_rows(tenant_id):
+            writer.writerow(["" if value is None else value for value in row])
+            count += 1
+            if count % CSV_ROWS_PER_CHUNK == 0:
+                yield buffer.getvalue().encode("utf-8")
+                buffer.seek(0)
+                buffer.truncate()
+        yield buffer.getvalue().encode("utf-8")
+
+    async def iter_xlsx(self, tenant_id: UUID) -> AsyncIterator[bytes]:
+        """XLSX（write_only で行を追記し、完成したファイルをチャンクで返す）"""
+        workbook = Workbook(write_only=True)
+        sheet = workbook.create_sheet("一覧確認")
+        sheet.append(header_row())
+        async for row in self.iter_rows(tenant_id):
+            sheet.append(row)
+
+        with tempfile.SpooledTemporaryFile(max_size=8 * 1024 * 1024) as output:
+            await run_in_threadpool(workbook.save, output)
+            output.seek(0)
+            while True:
+                chunk = await run_in_threadpool(output.read, FILE_CHUNK_SIZE)
+                if not chunk:
+                    break
+                yield chunk
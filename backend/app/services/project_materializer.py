@@ -0,0 +1,129 @@
+"""
+プロジェクトの実体化（TASK_TEMPLATES から全ステージの標準タスクを生成）
+- テンプレートとロール別担当者はそれぞれ1クエリで取得
+- プロジェクト・タスクは executemany の一括INSERTで投入（1トランザクション）
+"""
+
+import uuid
+from dataclasses import dataclass, field
+from typing import Dict, List, Sequence
+from uuid import UUID
+
+from sqlalchemy import insert, select
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.models import Stage, Task, TaskTemplate, User
+from app.models.project import Project
+from app.schemas.project import ProjectCreate
+
+
+@dataclass
+class MaterializationResult:
+    project_ids: List[UUID] = field(default_factory=list)
+    task_count: int = 0
+
+
+class ProjectMaterializer:
+    def __init__(self, db: AsyncSession, batch_size: int = 5000):
+        self.db = db
+        self.batch_size = batch_size
+
+    async def _load_templates(self) -> List[TaskTemplate]:
+        """全ステージのタスクテンプレートをステージ順に取得"""
+        result = await self.db.execute(
+            select(TaskTemplate)
+            .join(Stage, Stage.code == TaskTemplate.stage_code)
+            .order_by(Stage.display_order, TaskTemplate.display_order)
+        )
+        return list(result.scalars().all())
+
+    async def _resolve_role_assignees(self, tenant_id: UUID, role_codes: Sequence[str]) -> Dict[str, UUID]:
+        """ロールごとのデフォルト担当者（テナント内で最初に登録された有効ユーザー）を1クエリで解決"""
+        if not role_codes:
+            return {}
+        result = await self.db.execute(
+            select(User.role_code, User.id)
+            .where(
+                User.tenant_id == tenant_id,
+                User.is_active == True,
+                User.role_code.in_(role_codes)
+            )
+            .order_by(User.role_code, User.created_at)
+        )
+        assignees: Dict[str, UUID] = {}
+        for role_code, user_id in result.all():
+            assignees.setdefault(role_code, user_id)
+        return assignees
+
+    async def _insert_batched(self, model, rows: List[dict]):
+        for start in range(0, len(rows), self.batch_size):
+            await self.db.execute(insert(model), rows[start:start + self.batch_size])
+
+    async def create_projects(
+        self,
+        tenant_id: UUID,
+        created_by_id: UUID,
+        projects: Sequence[ProjectCreate],
+        commit: bool = True
+    ) -> MaterializationResult:
+        """プロジェクトと全ステージの標準タスクを一括作成"""
+        templates = await self._load_templates()
+        assignees = await self._resolve_role_assignees(
+            tenant_id,
+            sorted({t.default_assignee_role for t in templates if t.default_assignee_role})
+        )
+
+        # テンプレートごとに共通のタスク属性を事前に組み立てておく
+        template_rows = [
+            {
+                "tenant_id": tenant_id,
+                "created_by_id": created_by_id,
+                "stage_code": template.stage_code,
+                "title": template.name,
+                "assignee_id": assignees.get(template.default_assignee_role),
+                "priority": "MEDIUM",
+                "status": "PENDING",
+                "checklist_items": [
+                    {"title": item, "checked": False}
+                    for item in (template.checklist_items or [])
+                ],
+                "custom_fields": {"template_code": template.code},
+            }
+            for template in templates
+        ]
+
+        result = MaterializationResult()
+        project_rows = []
+        task_rows = []
+        for project_data in projects:
+            project_id = uuid.uuid4()
+            result.project_ids.append(project_id)
+            project_rows.append({
+                **project_data.model_dump(),
+                "id": project_id,
+                "tenant_id": tenant_id,
+                "created_by_id": created_by_id,
+            })
+            for row in template_rows:
+                task_rows.append({
+                    **row,
+                    "id": uuid.uuid4(),
+                    "project_id": project_id,
+                })
+
+        await self._insert_batched(Project, project_rows)
+        await self._insert_batched(Task, task_rows)
+        result.task_count = len(task_rows)
+
+        if commit:
+            await self.db.commit()
+        return result
+
+    async def create_project(
+        self,
+        tenant_id: UUID,
+        created_by_id: UUID,
+        project: ProjectCreate
+    ) -> UUID:
+        result = await self.create_projects(tenant_id, created_by_id, [project])
+        return result.project_ids[0]
@@ -0,0 +1,180 @@
+import base64
+from collections import defaultdict
+from datetime import date, datetime
+from typing import Dict, Iterator, List, Optional, Sequence, Tuple
+from uuid import UUID
+
+from sqlalchemy import select, tuple_
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.models import Phase, Stage, Task
+from app.models.project import Project
+from app.schemas.project import Project as ProjectSchema, ProjectTreePhase, ProjectTreeStage
+from app.schemas.task import Task as TaskSchema
+
+
+class InvalidCursorError(ValueError):
+    pass
+
+
+def encode_cursor(updated_at: datetime, project_id: UUID) -> str:
+    """キーセットページネーション用カーソル (updated_at, id) をエンコード"""
+    raw = f"{updated_at.isoformat()}|{project_id}".encode()
+    return base64.urlsafe_b64encode(raw).decode().rstrip("=")
+
+
+def decode_cursor(cursor: str) -> Tuple[datetime, UUID]:
+    try:
+        padded = cursor + "=" * (-len(cursor) % 4)
+        updated_at, project_id = base64.urlsafe_b64decode(padded).decode().split("|")
+        return datetime.fromisoformat(updated_at), UUID(project_id)
+    except (ValueError, UnicodeDecodeError) as e:
+        raise InvalidCursorError(str(e)) from e
+
+
+class ProjectTreeData:
+    """プロジェクトツリーの構築に必要な行（クエリ数はタスク数に依存しない）"""
+
+    def __init__(
+        self,
+        project: Project,
+        stage_rows: List[Tuple[Stage, Phase]],
+        tasks: List[Task]
+    ):
+        self.project = project
+        self.stage_rows = stage_rows
+        self.tasks = tasks
+
+    def iter_json(self) -> Iterator[bytes]:
+        """
+        ProjectTree スキーマの JSON をフェーズ単位のチャンクで生成する
+        （StreamingResponse にそのまま渡せる）
+        """
+        tasks_by_stage: Dict[str, List[Task]] = defaultdict(list)
+        for task in self.tasks:
+            tasks_by_stage[task.stage_code].append(task)
+
+        stages_by_phase: Dict[str, List[Stage]] = defaultdict(list)
+        phases: List[Phase] = []
+        for stage, phase in self.stage_rows:
+            if phase.code not in stages_by_phase:
+                phases.append(phase)
+            stages_by_phase[phase.code].append(stage)
+
+        project_json = ProjectSchema.model_validate(self.project).model_dump_json()
+        yield f'{{"project":{project_json},"phases":['.encode()
+
+        for index, phase in enumerate(phases):
+            if index:
+                yield b","
+            yield ProjectTreePhase(
+                code=phase.code,
+                name=phase.name,
+                display_order=phase.display_order,
+                color_code=phase.color_code,
+                stages=[
+                    ProjectTreeStage(
+                        code=stage.code,
+                        name=stage.name,
+                        display_order=stage.display_order,
+                        is_milestone=bool(stage.is_milestone),
+                        tasks=[
+                            TaskSchema.model_validate(task)
+                            for task in tasks_by_stage.get(stage.code, ())
+                        ]
+                    )
+                    for stage in stages_by_phase[phase.code]
+                ]
+            ).model_dump_json().encode()
+
+        yield b"]}"
+
+
+class ProjectService:
+    def __init__(self, db: AsyncSession):
+        self.db = db
+
+    async def list_projects(
+        self,
+        tenant_id: UUID,
+        statuses: Optional[Sequence[str]] = None,
+        customer_name: Optional[str] = None,
+        code: Optional[str] = None,
+        start_date_from: Optional[date] = None,
+        start_date_to: Optional[date] = None,
+        cursor: Optional[str] = None,
+        limit: int = 50
+    ) -> Tuple[List[Project], Optional[str]]:
+        """
+        プロジェクト一覧を取得（updated_at DESC, id DESC のキーセットページネーション）
+        テナント単位の複合インデックス (tenant_id, [status,] updated_at, id) を使用する
+        """
+        query = select(Project).where(Project.tenant_id == tenant_id)
+
+        if statuses:
+            query = query.where(Project.status.in_(statuses))
+        if customer_name:
+            query = query.where(Project.customer_name.startswith(customer_name, autoescape=True))
+        if code:
+            query = query.where(Project.code.startswith(code, autoescape=True))
+        if start_date_from:
+            query = query.where(Project.estimated_start_date >= start_date_from)
+        if start_date_to:
+            query = query.where(Project.estimated_start_date <= start_date_to)
+
+        if cursor:
+            cursor_updated_at, cursor_id = decode_cursor(cursor)
+            query = query.where(
+                tuple_(Project.updated_at, Project.id) < tuple_(cursor_updated_at, cursor_id)
+            )
+
+        # 次ページの有無を判定するため1件多く取得
+        query = query.order_by(Project.updated_at.desc(), Project.id.desc()).limit(limit + 1)
+        result = await self.db.execute(query)
+        projects = list(result.scalars().all())
+
+        next_cursor = None
+        if len(projects) > limit:
+            projects = projects[:limit]
+            last = projects[-1]
+            next_cursor = encode_cursor(last.updated_at, last.id)
+
+        return projects, next_cursor
+
+    async def get_project(self, tenant_id: UUID, project_id: UUID) -> Optional[Project]:
+        """テナント内のプロジェクトを取得"""
+        result = await self.db.execute(
+            select(Project).where(
+                Project.id == project_id,
+                Project.tenant_id == tenant_id
+            )
+        )
+        return result.scalar_one_or_none()
+
+    async def get_project_tasks(self, tenant_id: UUID, project_id: UUID) -> List[Task]:
+        """プロジェクトの全タスクを1クエリで取得"""
+        result = await self.db.execute(
+            select(Task)
+            .where(Task.project_id == project_id, Task.tenant_id == tenant_id)
+            .order_by(Task.stage_code, Task.created_at, Task.id)
+        )
+        return list(result.scalars().all())
+
+    async def get_project_tree(self, tenant_id: UUID, project_id: UUID) -> Optional[ProjectTreeData]:
+        """
+        プロジェクト・フェーズ・ステージ・タスクを固定回数のクエリで取得
+        （プロジェクト1回、ステージ+フェーズ1回、タスク1回。ステージごとの遅延ロードは行わない）
+        """
+        project = await self.get_project(tenant_id, project_id)
+        if project is None:
+            return None
+
+        result = await self.db.execute(
+            select(Stage, Phase)
+            .join(Phase, Phase.code == Stage.phase_code)
+            .order_by(Phase.display_order, Stage.display_order)
+        )
+        stage_rows = [(stage, phase) for stage, phase in result.all()]
+
+        tasks = await self.get_project_tasks(tenant_id, project_id)
+        return ProjectTreeData(project, stage_rows, tasks)
@@ -0,0 +1,359 @@
+"""
+工程スケジュールエンジン
+- ステージ/タスクのDAGに対してクリティカルパス法（CPM）で
+  最早開始・最遅開始・余裕日数・クリティカルパスを O(V+E) で計算
+- 1タスクの期限変更時は影響を受ける部分グラフのみ再計算
+- ステージの遅延日数（基準計画との差）を notify_stage_delayed に渡す
+"""
+
+import heapq
+from datetime import date
+from typing import Any, Dict, Iterable, List, Optional, Sequence, Set
+from uuid import UUID
+
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.db.initial_data import STAGES
+from app.models import Task
+from app.models.project import Project
+
+
+class ScheduleGraph:
+    """
+    ノード（所要日数付き）と先行関係からなるDAG
+    時刻はプロジェクト開始日からの日数で扱う
+    deadline を指定すると最遅時刻はその日を終点として計算する（遅延は負の余裕日数になる）
+    """
+
+    def __init__(self, deadline: Optional[int] = None):
+        self.deadline = deadline
+        self._index: Dict[str, int] = {}
+        self.keys: List[str] = []
+        self.durations: List[int] = []
+        self.successors: List[List[int]] = []
+        self.predecessors: List[List[int]] = []
+
+        self.order: List[int] = []
+        self.position: List[int] = []
+        self.earliest_start: List[int] = []
+        self.earliest_finish: List[int] = []
+        self.latest_start: List[int] = []
+        self.latest_finish: List[int] = []
+        self.finish = 0
+
+    def add_node(self, key: str, duration: int = 0):
+        if key in self._index:
+            raise ValueError(f"Duplicate node: {key}")
+        self._index[key] = len(self.keys)
+        self.keys.append(key)
+        self.durations.append(duration)
+        self.successors.append([])
+        self.predecessors.append([])
+
+    def add_edge(self, before: str, after: str):
+        b, a = self._index[before], self._index[after]
+        self.successors[b].append(a)
+        self.predecessors[a].append(b)
+
+    def __contains__(self, key: str) -> bool:
+        return key in self._index
+
+    # --- 全体計算 ---
+
+    def _topological_order(self) -> List[int]:
+        indegree = [len(preds) for preds in self.predecessors]
+        order = [i for i, d in enumerate(indegree) if d == 0]
+        for node in order:
+            for succ in self.successors[node]:
+                indegree[succ] -= 1
+                if indegree[succ] == 0:
+                    order.append(succ)
+        if len(order) != len(self.keys):
+            raise ValueError("Schedule graph contains a cycle")
+        return order
+
+    def compute(self):
+        """トポロジカル順の前進計算・後退計算（O(V+E)）"""
+        n = len(self.keys)
+        self.order = self._topological_order()
+        self.position = [0] * n
+        for pos, node in enumerate(self.order):
+            self.position[node] = pos
+
+        self.earliest_start = [0] * n
+        self.earliest_finish = [0] * n
+        for node in self.order:
+            self._forward(node)
+
+        self.latest_start = [0] * n
+        self.latest_finish = [0] * n
+        self._backward_all()
+
+    def _forward(self, node: int) -> bool:
+        """最早開始/終了を先行ノードから再計算。変化したら True"""
+        es = max((self.earliest_finish[p] for p in self.predecessors[node]), default=0)
+        ef = es + self.durations[node]
+        changed = es != self.earliest_start[node] or ef != self.earliest_finish[node]
+        self.earliest_start[node] = es
+        self.earliest_finish[node] = ef
+        return changed
+
+    def _backward(self, node: int) -> bool:
+        """最遅開始/終了を後続ノードから再計算。変化したら True"""
+        lf = min((self.latest_start[s] for s in self.successors[node]), default=self.finish)
+        ls = lf - self.durations[node]
+        changed = lf != self.latest_finish[node] or ls != self.latest_start[node]
+        self.latest_finish[node] = lf
+        self.latest_start[node] = ls
+        return changed
+
+    def _project_finish(self) -> int:
+        if self.deadline is not None:
+            return self.deadline
+        return max(self.earliest_finish, default=0)
+
+    def _backward_all(self):
+        self.finish = self._project_finish()
+        for node in reversed(self.order):
+            self._backward(node)
+
+    # --- 差分計算 ---
+
+    def set_duration(self, key: str, duration: int) -> Set[str]:
+        """
+        ノードの所要日数を変更し、影響を受けるノードのみ再計算する
+        戻り値: 最早/最遅時刻が変化したノード
+        """
+        node = self._index[key]
+        if self.durations[node] == duration:
+            return set()
+        self.durations[node] = duration
+        changed: Set[int] = set()
+
+        # 前進: トポロジカル順に、最早時刻が変化した後続のみたどる
+        queue = [self.position[node]]
+        queued = {node}
+        while queue:
+            current = self.order[heapq.heappop(queue)]
+            if self._forward(current) or current == node:
+                changed.add(current)
+                for succ in self.successors[current]:
+                    if succ not in queued:
+                        queued.add(succ)
+                        heapq.heappush(queue, self.position[succ])
+
+        # 後退: 終点が動いた場合は全体、そうでなければ先行ノードのみたどる
+        if self._project_finish() != self.finish:
+            before = list(zip(self.latest_start, self.latest_finish))
+            self._backward_all()
+            changed.update(
+                i for i, times in enumerate(zip(self.latest_start, self.latest_finish))
+                if times != before[i]
+            )
+        else:
+            queue = [-self.position[node]]
+            queued = {node}
+            while queue:
+                current = self.order[-heapq.heappop(queue)]
+                if self._backward(current) or current == node:
+                    changed.add(current)
+                    for pred in self.predecessors[current]:
+                        if pred not in queued:
+                            queued.add(pred)
+                            heapq.heappush(queue, -self.position[pred])
+
+        return {self.keys[i] for i in changed}
+
+    # --- 参照 ---
+
+    def slack(self, key: str) -> int:
+        node = self._index[key]
+        return self.latest_start[node] - self.earliest_start[node]
+
+    def earliest_finish_of(self, key: str) -> int:
+        return self.earliest_finish[self._index[key]]
+
+    def critical_path(self) -> List[str]:
+        """余裕日数が最小のノードを始点から終点までたどった経路"""
+        if not self.order:
+            return []
+        min_slack = min(
+            self.latest_start[i] - self.earliest_start[i] for i in range(len(self.keys))
+        )
+
+        def is_critical(i: int) -> bool:
+            return self.latest_start[i] - self.earliest_start[i] == min_slack
+
+        current = next(
+            (i for i in self.order if not self.predecessors[i] and is_critical(i)), None
+        )
+        path = []
+        while current is not None:
+            path.append(self.keys[current])
+            current = next(
+                (
+                    s for s in self.successors[current]
+                    if is_critical(s) and self.earliest_start[s] == self.earliest_finish[current]
+                ),
+                None
+            )
+        return path
+
+
+def _stage_key(stage_code: str) -> str:
+    return f"stage:{stage_code}"
+
+
+def _task_key(task_id: Any) -> str:
+    return f"task:{task_id}"
+
+
+class ProjectSchedule:
+    """
+    プロジェクトのステージ/タスクからスケジュールグラフを構築する
+    - 各ステージは所要0日のゲートノード。ステージ内のタスクは前ステージのゲートから並列に開始し、
+      すべて終わるとそのステージのゲートが完了する
+    - タスクの所要日数は「期限日 − 前ステージの計画完了日」
+    - 構築時の最早終了日を基準計画とし、以降の差を遅延日数とする
+    """
+
+    def __init__(
+        self,
+        start_date: date,
+        tasks: Iterable[Any],
+        stages: Sequence[Dict[str, Any]] = STAGES
+    ):
+        self.start_date = start_date
+        self.stages = sorted(stages, key=lambda s: s["display_order"])
+        self.graph = ScheduleGraph()
+        self.task_due_dates: Dict[str, Optional[date]] = {}
+        self.task_stage: Dict[str, str] = {}
+        # タスクの所要日数の起点（構築時の前ステージ計画完了日）
+        self.task_base: Dict[str, int] = {}
+
+        tasks_by_stage: Dict[str, List[Any]] = {}
+        for task in tasks:
+            tasks_by_stage.setdefault(task.stage_code, []).append(task)
+
+        previous_gate: Optional[str] = None
+        previous_finish = 0
+        for stage in self.stages:
+            gate = _stage_key(stage["code"])
+            self.graph.add_node(gate)
+            if previous_gate:
+                self.graph.add_edge(previous_gate, gate)
+
+            stage_finish = previous_finish
+            for task in tasks_by_stage.get(stage["code"], ()):
+                key = _task_key(task.id)
+                duration = self._duration(task.due_date, previous_finish)
+                self.graph.add_node(key, duration)
+                if previous_gate:
+                    self.graph.add_edge(previous_gate, key)
+                self.graph.add_edge(key, gate)
+                self.task_due_dates[key] = task.due_date
+                self.task_stage[key] = stage["code"]
+                self.task_base[key] = previous_finish
+                stage_finish = max(stage_finish, previous_finish + duration)
+
+            previous_gate = gate
+            previous_finish = stage_finish
+
+        self.graph.compute()
+        self.baseline_finish: Dict[str, int] = {
+            stage["code"]: self.graph.earliest_finish_of(_stage_key(stage["code"]))
+            for stage in self.stages
+        }
+
+    def _offset(self, value: Optional[date]) -> Optional[int]:
+        if value is None:
+            return None
+        return (value - self.start_date).days
+
+    def _duration(self, due_date: Optional[date], base: int) -> int:
+        """期限日 − 前ステージの計画完了日（期限なし・前倒しは0日）"""
+        offset = self._offset(due_date)
+        return max(0, offset - base) if offset is not None else 0
+
+    def stage_delays(self) -> Dict[str, int]:
+        """基準計画からの遅延日数（遅延しているステージのみ）"""
+        delays = {}
+        for stage in self.stages:
+            code = stage["code"]
+            delay = self.graph.earliest_finish_of(_stage_key(code)) - self.baseline_finish[code]
+            if delay > 0:
+                delays[code] = delay
+        return delays
+
+    def stage_slack(self, stage_code: str) -> int:
+        return self.graph.slack(_stage_key(stage_code))
+
+    def critical_stages(self) -> List[str]:
+        return [
+            key.split(":", 1)[1] for key in self.graph.critical_path()
+            if key.startswith("stage:")
+        ]
+
+    def reschedule_task(self, task_id: Any, new_due_date: Optional[date]) -> Dict[str, int]:
+        """
+        タスクの期限変更を反映し、影響を受けたステージの遅延日数を返す
+        （影響範囲の部分グラフのみ再計算）
+        """
+        key = _task_key(task_id)
+        if key not in self.graph:
+            raise KeyError(f"Unknown task: {task_id}")
+
+        self.task_due_dates[key] = new_due_date
+        # 構築時と同じ式で求め直す（差分で足し引きすると 0 で切り詰めた分がずれる）
+        changed = self.graph.set_duration(key, self._duration(new_due_date, self.task_base[key]))
+
+        delays = self.stage_delays()
+        return {
+            code: delay for code, delay in delays.items()
+            if _stage_key(code) in changed
+        }
+
+    def delays_to_notify(self, task_id: Any, changed_delays: Dict[str, int]) -> Dict[str, int]:
+        """
+        通知対象のステージ遅延（タスクのステージと、影響を受けたマイルストーン）
+        下流の全ステージを通知すると件数が多すぎるため絞り込む
+        """
+        own_stage = self.task_stage.get(_task_key(task_id))
+        milestones = {stage["code"] for stage in self.stages if stage.get("is_milestone")}
+        return {
+            code: delay for code, delay in changed_delays.items()
+            if code == own_stage or code in milestones
+        }
+
+
+class ScheduleService:
+    """DBからプロジェクトのスケジュールグラフを構築する（2クエリ）"""
+
+    def __init__(self, db: AsyncSession):
+        self.db = db
+
+    async def load_project_schedule(
+        self,
+        tenant_id: UUID,
+        project_id: UUID
+    ) -> Optional[ProjectSchedule]:
+        result = await self.db.execute(
+            select(Project.actual_start_date, Project.estimated_start_date)
+            .where(Project.id == project_id, Project.tenant_id == tenant_id)
+        )
+        row = result.one_or_none()
+        if row is None:
+            return None
+
+        result = await self.db.execute(
+            select(Task.id, Task.stage_code, Task.due_date)
+            .where(Task.project_id == project_id, Task.tenant_id == tenant_id)
+        )
+        tasks = result.all()
+
+        # 開始日が未設定の場合は最も早いタスク期限を起点にする
+        start_date = row.actual_start_date or row.estimated_start_date or min(
+            (task.due_date for task in tasks if task.due_date), default=date.today()
+        )
+        return ProjectSchedule(start_date, tasks)
@@ -0,0 +1,168 @@
+import hashlib
+from datetime import date, datetime, timedelta, timezone
+from typing import Dict, List, Optional, Sequence
+from uuid import UUID
+from zoneinfo import ZoneInfo
+
+from sqlalchemy import Boolean, case, cast, column, func, or_, select, update, values
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.core.config import settings
+from app.models import Task
+from app.schemas.task import TaskBulkUpdateItem, TaskBulkUpdateResult, TaskUpdate
+
+# 一括更新で変更可能なフィールド（TaskUpdate と同じ）
+UPDATABLE_FIELDS = tuple(TaskUpdate.model_fields)
+
+TASK_STATUS_DONE = "DONE"
+
+# マイタスクの期限グループ
+MY_TASK_BUCKETS = ("overdue", "today", "this_week")
+MY_TASKS_WINDOW_DAYS = 7
+
+
+def local_today(now: Optional[datetime] = None) -> date:
+    """APP_TIMEZONE での今日（期限日は現地の日付なので UTC の日付で区切らない）"""
+    now = now or datetime.now(timezone.utc)
+    return now.astimezone(ZoneInfo(settings.APP_TIMEZONE)).date()
+
+
+class TaskService:
+    def __init__(self, db: AsyncSession):
+        self.db = db
+
+    def _my_open_tasks_filter(self, tenant_id: UUID, user_id: UUID, today: date):
+        # 部分インデックス ix_tasks_my_open_tasks (tenant_id, assignee_id, due_date)
+        # WHERE status <> 'DONE' に一致する条件
+        return (
+            Task.tenant_id == tenant_id,
+            Task.assignee_id == user_id,
+            Task.status != TASK_STATUS_DONE,
+            Task.due_date <= today + timedelta(days=MY_TASKS_WINDOW_DAYS),
+        )
+
+    async def get_my_tasks_etag(self, tenant_id: UUID, user_id: UUID, today: date) -> str:
+        """
+        マイタスク一覧のETag（最終更新日時・件数・日付から算出）
+        インデックスに INCLUDE した updated_at のみを読むため一覧取得より軽い
+        """
+        result = await self.db.execute(
+            select(func.max(Task.updated_at), func.count())
+            .where(*self._my_open_tasks_filter(tenant_id, user_id, today))
+        )
+        max_updated_at, count = result.one()
+        digest = hashlib.sha1(f"{today}:{max_updated_at}:{count}".encode()).hexdigest()
+        return f'"{digest}"'
+
+    async def get_my_tasks(
+        self,
+        tenant_id: UUID,
+        user_id: UUID,
+        today: date
+    ) -> Dict[str, List[Task]]:
+        """
+        担当中の未完了タスクを期限別（期限切れ / 今日 / 今後7日以内）に取得
+        グループ分けはSQLの CASE で行い、1クエリで取得する
+        """
+        bucket = case(
+            (Task.due_date < today, "overdue"),
+            (Task.due_date == today, "today"),
+            else_="this_week"
+        ).label("bucket")
+
+        result = await self.db.execute(
+            select(Task, bucket)
+            .where(*self._my_open_tasks_filter(tenant_id, user_id, today))
+            .order_by(Task.due_date, Task.id)
+        )
+
+        buckets: Dict[str, List[Task]] = {name: [] for name in MY_TASK_BUCKETS}
+        for task, bucket_name in result.all():
+            buckets[bucket_name].append(task)
+        return buckets
+
+    async def bulk_update(
+        self,
+        tenant_id: UUID,
+        items: Sequence[TaskBulkUpdateItem]
+    ) -> List[TaskBulkUpdateResult]:
+        """
+        複数タスクを1トランザクション・1つの UPDATE ... FROM (VALUES ...) 文で更新する
+        - 各行は送信されたフィールドのみ更新（CASE WHEN v.set_<field>）
+        - updated_at が指定された行は一致する場合のみ更新（楽観的排他制御）
+        """
+        item_data = [item.model_dump(exclude_unset=True) for item in items]
+        # いずれかの行で指定されたフィールドだけを VALUES に含める
+        fields = [f for f in UPDATABLE_FIELDS if any(f in data for data in item_data)]
+
+        v = values(
+            column("id", Task.id.type),
+            column("expected_updated_at", Task.updated_at.type),
+            *[column(f, getattr(Task, f).type) for f in fields],
+            *[column(f"set_{f}", Boolean) for f in fields],
+            name="v"
+        ).data([
+            (
+                item.id,
+                item.updated_at,
+                *[data.get(f) for f in fields],
+                *[f in data for f in fields],
+            )
+            for item, data in zip(items, item_data)
+        ])
+
+        # VALUES 内の NULL は型が決まらないため列の型へキャストする
+        assignments = {
+            getattr(Task, f): case(
+                (v.c[f"set_{f}"], cast(v.c[f], getattr(Task, f).type)),
+                else_=getattr(Task, f)
+            )
+            for f in fields
+        }
+        # 期限が変わったタスクは期限通知をやり直す
+        if "due_date" in fields:
+            assignments[Task.last_deadline_threshold] = case(
+                (v.c.set_due_date, None),
+                else_=Task.last_deadline_threshold
+            )
+        assignments[Task.updated_at] = func.now()
+
+        stmt = (
+            update(Task)
+            .where(
+                Task.id == v.c.id,
+                Task.tenant_id == tenant_id,
+                or_(
+                    v.c.expected_updated_at.is_(None),
+                    Task.updated_at == cast(v.c.expected_updated_at, Task.updated_at.type)
+                )
+            )
+            .values(assignments)
+            .returning(Task.id, Task.updated_at)
+            .execution_options(synchronize_session=False)
+        )
+        result = await self.db.execute(stmt)
+        updated: Dict[UUID, datetime] = {row.id: row.updated_at for row in result}
+
+        # 更新されなかった行は存在確認して conflict / not_found に分類
+        missing = [item.id for item in items if item.id not in updated]
+        existing = set()
+        if missing:
+            result = await self.db.execute(
+                select(Task.id).where(Task.id.in_(missing), Task.tenant_id == tenant_id)
+            )
+            existing = set(result.scalars().all())
+
+        await self.db.commit()
+
+        results = []
+        for item in items:
+            if item.id in updated:
+                results.append(TaskBulkUpdateResult(
+                    id=item.id, status="updated", updated_at=updated[item.id]
+                ))
+            elif item.id in existing:
+                results.append(TaskBulkUpdateResult(id=item.id, status="conflict"))
+            else:
+                results.append(TaskBulkUpdateResult(id=item.id, status="not_found"))
+        return results
@@ -0,0 +1,362 @@
+"""
+Web Push（VAPID）配信
+- 購読（ブラウザ・端末ごとの endpoint と鍵）は push_subscriptions に保存
+- ペイロードは RFC 8291（aes128gcm）で購読ごとに暗号化し、RFC 8292 の VAPID JWT（ES256）を付けて送る
+- httpx.AsyncClient を使い回して接続を再利用（h2 があれば HTTP/2）。同時送信数は Semaphore で制限
+- 404 / 410 が返った購読は失効として削除する
+- endpoint は https かつ許可したプッシュサービスのホストに限る（内部アドレスへの送信を防ぐ）
+"""
+
+import asyncio
+import base64
+import ipaddress
+import json
+import logging
+import os
+import struct
+import time
+import uuid
+import weakref
+from dataclasses import dataclass, field
+from typing import Any, Dict, Iterable, List, Optional, Sequence, Tuple
+from urllib.parse import urlsplit
+from uuid import UUID
+
+import httpx
+from cryptography.hazmat.primitives import hashes, serialization
+from cryptography.hazmat.primitives.asymmetric import ec
+from cryptography.hazmat.primitives.asymmetric.utils import decode_dss_signature
+from cryptography.hazmat.primitives.ciphers.aead import AESGCM
+from cryptography.hazmat.primitives.kdf.hkdf import HKDF
+from sqlalchemy import Column, DateTime, ForeignKey, String, Table, Text, delete, func, select
+from sqlalchemy.dialects.postgresql import UUID as PGUUID, insert as pg_insert
+from sqlalchemy.orm import Session
+
+from app.core.config import settings
+from app.db.base import Base
+
+logger = logging.getLogger(__name__)
+
+# ブラウザ・端末ごとの購読
+push_subscriptions = Table(
+    "push_subscriptions",
+    Base.metadata,
+    Column("id", PGUUID(as_uuid=True), primary_key=True),
+    Column("tenant_id", PGUUID(as_uuid=True), ForeignKey("tenants.id", ondelete="CASCADE"), nullable=False),
+    Column("user_id", PGUUID(as_uuid=True), ForeignKey("users.id", ondelete="CASCADE"), nullable=False, index=True),
+    Column("endpoint", Text, nullable=False, unique=True),
+    Column("p256dh", String(128), nullable=False),
+    Column("auth", String(64), nullable=False),
+    Column("user_agent", String(255), nullable=True),
+    Column("created_at", DateTime(timezone=True), server_default=func.now(), nullable=False),
+    Column("updated_at", DateTime(timezone=True), server_default=func.now(), onupdate=func.now(), nullable=False),
+)
+
+RECORD_SIZE = 4096
+EXPIRED_STATUS_CODES = (404, 410)
+VAPID_TOKEN_LIFETIME = 12 * 3600
+
+# 通知の優先度 -> Urgency ヘッダー（端末が省電力中に起こすかどうかの目安）
+URGENCY_BY_PRIORITY = {"urgent": "high", "high": "high", "medium": "normal", "low": "low"}
+
+
+def b64url_encode(data: bytes) -> str:
+    return base64.urlsafe_b64encode(data).rstrip(b"=").decode("ascii")
+
+
+def b64url_decode(value: str) -> bytes:
+    return base64.urlsafe_b64decode(value + "=" * (-len(value) % 4))
+
+
+def push_endpoint_error(endpoint: str, allowed_hosts: Optional[Sequence[str]] = None) -> Optional[str]:
+    """送信先として使えない endpoint なら理由を返す"""
+    parts = urlsplit(endpoint)
+    host = (parts.hostname or "").rstrip(".")
+    if parts.scheme != "https" or not host:
+        return "endpoint must be an https URL"
+    if host == "localhost" or host.endswith(".localhost"):
+        return "endpoint host is not public"
+    try:
+        if not ipaddress.ip_address(host).is_global:
+            return "endpoint host is not public"
+    except ValueError:
+        pass
+    allowed = settings.WEB_PUSH_ALLOWED_HOSTS if allowed_hosts is None else allowed_hosts
+    if allowed and not any(host == h or host.endswith("." + h) for h in (h.lower() for h in allowed)):
+        return "endpoint host is not an allowed push service"
+    return None
+
+
+def _public_bytes(key: ec.EllipticCurvePublicKey) -> bytes:
+    return key.public_bytes(serialization.Encoding.X962, serialization.PublicFormat.UncompressedPoint)
+
+
+def load_vapid_private_key(value: str) -> ec.EllipticCurvePrivateKey:
+    """PEM か、base64url の生の秘密鍵（32バイト。web-push 系ツールの出力形式）"""
+    if value.lstrip().startswith("-----BEGIN"):
+        return serialization.load_pem_private_key(value.encode(), password=None)
+    return ec.derive_private_key(int.from_bytes(b64url_decode(value.strip()), "big"), ec.SECP256R1())
+
+
+def generate_vapid_keys() -> Tuple[str, str]:
+    """(秘密鍵, 公開鍵) を base64url で返す"""
+    key = ec.generate_private_key(ec.SECP256R1())
+    private = key.private_numbers().private_value.to_bytes(32, "big")
+    return b64url_encode(private), b64url_encode(_public_bytes(key.public_key()))
+
+
+def encrypt_payload(
+    payload: bytes,
+    p256dh: str,
+    auth: str,
+    salt: Optional[bytes] = None,
+    server_key: Optional[ec.EllipticCurvePrivateKey] = None
+) -> bytes:
+    """RFC 8291 の aes128gcm（1レコード）。salt と server_key はテスト用"""
+    ua_public_bytes = b64url_decode(p256dh)
+    ua_public = ec.EllipticCurvePublicKey.from_encoded_point(ec.SECP256R1(), ua_public_bytes)
+    server_key = server_key or ec.generate_private_key(ec.SECP256R1())
+    server_public_bytes = _public_bytes(server_key.public_key())
+    salt = salt or os.urandom(16)
+
+    shared_secret = server_key.exchange(ec.ECDH(), ua_public)
+    ikm = HKDF(
+        hashes.SHA256(), 32, salt=b64url_decode(auth),
+        info=b"WebPush: info\x00" + ua_public_bytes + server_public_bytes
+    ).derive(shared_secret)
+    cek = HKDF(hashes.SHA256(), 16, salt=salt, info=b"Content-Encoding: aes128gcm\x00").derive(ikm)
+    nonce = HKDF(hashes.SHA256(), 12, salt=salt, info=b"Content-Encoding: nonce\x00").derive(ikm)
+
+    if len(payload) + 1 + 16 > RECORD_SIZE:
+        raise ValueError("Push payload is too large")
+    # 最後のレコードの区切りは 0x02
+    ciphertext = AESGCM(cek).encrypt(nonce, payload + b"\x02", None)
+    header = salt + struct.pack("!IB", RECORD_SIZE, len(server_public_bytes)) + server_public_bytes
+    return header + ciphertext
+
+
+class VapidSigner:
+    """送信先のオリジンごとに VAPID JWT を作り、有効期限の半分まで使い回す"""
+
+    def __init__(self, private_key: ec.EllipticCurvePrivateKey, subject: str):
+        self.private_key = private_key
+        self.subject = subject
+        self.public_key = b64url_encode(_public_bytes(private_key.public_key()))
+        self._tokens: Dict[str, Tuple[str, float]] = {}
+
+    def authorization(self, endpoint: str) -> str:
+        parts = urlsplit(endpoint)
+        audience = f"{parts.scheme}://{parts.netloc}"
+        now = time.time()
+        cached = self._tokens.get(audience)
+        if cached is None or cached[1] - now < VAPID_TOKEN_LIFETIME / 2:
+            expires_at = now + VAPID_TOKEN_LIFETIME
+            cached = self._tokens[audience] = (self._token(audience, int(expires_at)), expires_at)
+        return f"vapid t={cached[0]}, k={self.public_key}"
+
+    def _token(self, audience: str, expires_at: int) -> str:
+        header = b64url_encode(json.dumps({"typ": "JWT", "alg": "ES256"}, separators=(",", ":")).encode())
+        claims = b64url_encode(json.dumps(
+            {"aud": audience, "exp": expires_at, "sub": self.subject}, separators=(",", ":")
+        ).encode())
+        signing_input = f"{header}.{claims}".encode()
+        r, s = decode_dss_signature(self.private_key.sign(signing_input, ec.ECDSA(hashes.SHA256())))
+        signature = r.to_bytes(32, "big") + s.to_bytes(32, "big")
+        return f"{header}.{claims}.{b64url_encode(signature)}"
+
+
+@dataclass
+class PushSubscriptionInfo:
+    id: UUID
+    endpoint: str
+    p256dh: str
+    auth: str
+
+
+@dataclass
+class PushResult:
+    sent: List[UUID] = field(default_factory=list)
+    expired: List[UUID] = field(default_factory=list)
+    failed: Dict[UUID, str] = field(default_factory=dict)
+
+
+def _http2_available() -> bool:
+    try:
+        import h2  # noqa: F401
+    except ImportError:
+        return False
+    return True
+
+
+class WebPushSender:
+    def __init__(
+        self,
+        signer: VapidSigner,
+        client: Optional[httpx.AsyncClient] = None,
+        concurrency: Optional[int] = None,
+        ttl_seconds: Optional[int] = None,
+        allowed_hosts: Optional[Sequence[str]] = None
+    ):
+        self.signer = signer
+        self.allowed_hosts = allowed_hosts
+        self.concurrency = concurrency or settings.WEB_PUSH_CONCURRENCY
+        self.ttl_seconds = settings.WEB_PUSH_TTL_SECONDS if ttl_seconds is None else ttl_seconds
+        self.client = client or httpx.AsyncClient(
+            http2=settings.WEB_PUSH_HTTP2 and _http2_available(),
+            timeout=settings.WEB_PUSH_TIMEOUT_SECONDS,
+            limits=httpx.Limits(
+                max_connections=self.concurrency,
+                max_keepalive_connections=self.concurrency
+            ),
+        )
+        self._semaphore = asyncio.Semaphore(self.concurrency)
+
+    async def send(
+        self,
+        subscriptions: Iterable[PushSubscriptionInfo],
+        payload: Dict[str, Any],
+        urgency: str = "normal"
+    ) -> PushResult:
+        """同じペイロードを複数の購読へ送る（購読ごとに暗号化）"""
+        body = json.dumps(payload, ensure_ascii=False, default=str).encode("utf-8")
+        result = PushResult()
+        await asyncio.gather(*[
+            self._send_one(subscription, body, urgency, result) for subscription in subscriptions
+        ])
+        return result
+
+    async def _send_one(self, subscription: PushSubscriptionInfo, body: bytes, urgency: str, result: PushResult):
+        # 登録時に検証済みでも、許可ホストの変更や古い行に備えて送信前にも確認する
+        error = push_endpoint_error(subscription.endpoint, self.allowed_hosts)
+        if error:
+            result.failed[subscription.id] = error
+            return
+        async with self._semaphore:
+            try:
+                content = encrypt_payload(body, subscription.p256dh, subscription.auth)
+                response = await self.client.post(
+                    subscription.endpoint,
+                    content=content,
+                    headers={
+                        "Authorization": self.signer.authorization(subscription.endpoint),
+                        "Content-Encoding": "aes128gcm",
+                        "Content-Type": "application/octet-stream",
+                        "TTL": str(self.ttl_seconds),
+                        "Urgency": urgency,
+                    },
+                )
+            except (httpx.HTTPError, ValueError) as e:
+                result.failed[subscription.id] = str(e) or type(e).__name__
+                return
+        if response.status_code in EXPIRED_STATUS_CODES:
+            result.expired.append(subscription.id)
+        elif response.is_success:
+            result.sent.append(subscription.id)
+        else:
+            result.failed[subscription.id] = f"HTTP {response.status_code}"
+
+    async def aclose(self):
+        await self.client.aclose()
+
+
+_senders: "weakref.WeakKeyDictionary[asyncio.AbstractEventLoop, WebPushSender]" = weakref.WeakKeyDictionary()
+
+
+def get_web_push_sender() -> Optional[WebPushSender]:
+    """実行中のイベントループの送信クライアント（VAPID 鍵が未設定なら None）"""
+    if not settings.WEB_PUSH_VAPID_PRIVATE_KEY:
+        return None
+    loop = asyncio.get_running_loop()
+    sender = _senders.get(loop)
+    if sender is None:
+        signer = VapidSigner(
+            load_vapid_private_key(settings.WEB_PUSH_VAPID_PRIVATE_KEY), settings.WEB_PUSH_VAPID_SUBJECT
+        )
+        sender = _senders[loop] = WebPushSender(signer)
+    return sender
+
+
+async def close_web_push_sender():
+    sender = _senders.pop(asyncio.get_running_loop(), None)
+    if sender is not None:
+        await sender.aclose()
+
+
+def vapid_public_key() -> Optional[str]:
+    if not settings.WEB_PUSH_VAPID_PRIVATE_KEY:
+        return None
+    private_key = load_vapid_private_key(settings.WEB_PUSH_VAPID_PRIVATE_KEY)
+    return b64url_encode(_public_bytes(private_key.public_key()))
+
+
+# --- 購読の保存 ---
+
+def save_subscription(
+    db: Session,
+    user_id: UUID,
+    tenant_id: UUID,
+    endpoint: str,
+    p256dh: str,
+    auth: str,
+    user_agent: Optional[str] = None
+) -> Optional[UUID]:
+    """endpoint 単位で登録（同じユーザーの再登録は鍵を更新。他のユーザーの endpoint なら None）"""
+    stmt = pg_insert(push_subscriptions).values(
+        id=uuid.uuid4(),
+        tenant_id=tenant_id,
+        user_id=user_id,
+        endpoint=endpoint,
+        p256dh=p256dh,
+        auth=auth,
+        user_agent=user_agent,
+    )
+    subscription_id = db.execute(
+        stmt.on_conflict_do_update(
+            index_elements=[push_subscriptions.c.endpoint],
+            set_={
+                "p256dh": stmt.excluded.p256dh,
+                "auth": stmt.excluded.auth,
+                "user_agent": stmt.excluded.user_agent,
+                "updated_at": func.now(),
+            },
+            where=(push_subscriptions.c.user_id == stmt.excluded.user_id)
+            & (push_subscriptions.c.tenant_id == stmt.excluded.tenant_id)
+        ).returning(push_subscriptions.c.id)
+    ).scalar_one_or_none()
+    db.commit()
+    return subscription_id
+
+
+def delete_subscription(db: Session, user_id: UUID, endpoint: str) -> bool:
+    result = db.execute(
+        delete(push_subscriptions).where(
+            push_subscriptions.c.user_id == user_id,
+            push_subscriptions.c.endpoint == endpoint
+        )
+    )
+    db.commit()
+    return result.rowcount > 0
+
+
+def subscriptions_for(db: Session, user_id: UUID, tenant_id: UUID) -> List[PushSubscriptionInfo]:
+    result = db.execute(
+        select(
+            push_subscriptions.c.id,
+            push_subscriptions.c.endpoint,
+            push_subscriptions.c.p256dh,
+            push_subscriptions.c.auth
+        ).where(
+            push_subscriptions.c.user_id == user_id,
+            push_subscriptions.c.tenant_id == tenant_id
+        )
+    )
+    return [PushSubscriptionInfo(*row) for row in result]
+
+
+def prune_subscriptions(db: Session, subscription_ids: Sequence[UUID]) -> int:
+    """失効した購読を削除"""
+    if not subscription_ids:
+        return 0
+    result = db.execute(delete(push_subscriptions).where(push_subscriptions.c.id.in_(list(subscription_ids))))
+    db.commit()
+    return result.rowcount
@@ -1,10 +1,14 @@
-from typing import Dict, List, Set
+from datetime import datetime
+from typing import Awaitable, Callable, Dict, Iterable, List, Optional, Set, Tuple
 from fastapi import WebSocket, WebSocketDisconnect
+from starlette.concurrency import run_in_threadpool
 import json
 import logging
 from uuid import UUID
 import asyncio
 
+from app.core.config import settings
+
 logger = logging.getLogger(__name__)
 
 
@@ -51,11 +55,11 @@ class ConnectionManager:
         
         logger.info(f"User {user_id} disconnected from WebSocket")
     
-    async def send_personal_message(self, user_id: str, message: str):
-        """特定のユーザーにメッセージを送信"""
+    async def send_personal_message(self, user_id: str, message: str) -> bool:
+        """特定のユーザーにメッセージを送信（1つ以上の接続に届いたら True）"""
         if user_id not in self.active_connections:
             logger.warning(f"No active connections for user {user_id}")
-            return
+            return False
         
         connections = self.active_connections[user_id].copy()
         disconnected_connections = []
@@ -70,6 +74,7 @@ class ConnectionManager:
         # 切断された接続を削除
         for connection in disconnected_connections:
             self.disconnect(connection)
+        return len(disconnected_connections) < len(connections)
     
     async def send_to_multiple_users(self, user_ids: List[str], message: str):
         """複数のユーザーにメッセージを送信"""
@@ -117,16 +122,85 @@ class ConnectionManager:
 websocket_manager = ConnectionManager()
 
 
+class _PendingRead:
+    __slots__ = ("notification_ids", "up_to")
+    
+    def __init__(self):
+        self.notification_ids: Set[UUID] = set()
+        self.up_to: Optional[datetime] = None
+
+
+class MarkReadCoalescer:
+    """
+    mark_read をユーザーごとに window_seconds だけ溜めてから flush を1回呼ぶ
+    （スクロールしながら1件ずつ既読にするクライアントでも UPDATE は window ごとに1回）
+    """
+    
+    def __init__(
+        self,
+        flush: Callable[[str, str, Set[UUID], Optional[datetime]], Awaitable[None]],
+        window_seconds: Optional[float] = None
+    ):
+        self.flush = flush
+        self.window_seconds = (
+            settings.NOTIFICATION_MARK_READ_WINDOW_SECONDS if window_seconds is None else window_seconds
+        )
+        self._pending: Dict[Tuple[str, str], _PendingRead] = {}
+        self._tasks: Set[asyncio.Task] = set()
+    
+    def submit(
+        self,
+        user_id: str,
+        tenant_id: str,
+        notification_ids: Iterable[UUID],
+        up_to: Optional[datetime] = None
+    ):
+        key = (user_id, tenant_id)
+        pending = self._pending.get(key)
+        if pending is None:
+            pending = self._pending[key] = _PendingRead()
+            task = asyncio.create_task(self._flush_later(key))
+            self._tasks.add(task)
+            task.add_done_callback(self._tasks.discard)
+        pending.notification_ids.update(notification_ids)
+        if up_to is not None and (pending.up_to is None or up_to > pending.up_to):
+            pending.up_to = up_to
+    
+    async def _flush_later(self, key: Tuple[str, str]):
+        await asyncio.sleep(self.window_seconds)
+        pending = self._pending.pop(key)
+        try:
+            await self.flush(key[0], key[1], pending.notification_ids, pending.up_to)
+        except Exception as e:
+            logger.error(f"Failed to mark notifications as read for user {key[0]}: {e}")
+    
+    async def drain(self):
+        """保留中の既読をすべて書き込むまで待つ"""
+        while self._tasks:
+            await asyncio.gather(*list(self._tasks), return_exceptions=True)
+
+
 class NotificationWebSocketHandler:
     """通知用WebSocketハンドラー"""
     
     def __init__(self, connection_manager: ConnectionManager):
         self.connection_manager = connection_manager
+        self.mark_read_coalescer = MarkReadCoalescer(self._flush_mark_read)
+        # ユーザーID -> テナントID（既読処理用）
+        self.user_tenants: Dict[str, str] = {}
+        self._redelivery_tasks: Set[asyncio.Task] = set()
     
-    async def handle_connection(self, websocket: WebSocket, user_id: str):
+    async def handle_connection(self, websocket: WebSocket, user_id: str, tenant_id: Optional[str] = None):
         """WebSocket接続を処理"""
+        if tenant_id:
+            self.user_tenants[user_id] = tenant_id
         try:
             await self.connection_manager.connect(websocket, user_id)
+            if tenant_id:
+                # オフライン中に届かなかった通知を再送
+                task = asyncio.create_task(self._redeliver_pending(user_id, tenant_id))
+                self._redelivery_tasks.add(task)
+                task.add_done_callback(self._redelivery_tasks.discard)
             
             while True:
                 try:
@@ -150,6 +224,18 @@ class NotificationWebSocketHandler:
         
         finally:
             self.connection_manager.disconnect(websocket)
+            if not self.connection_manager.is_user_online(user_id):
+                self.user_tenants.pop(user_id, None)
+    
+    async def _redeliver_pending(self, user_id: str, tenant_id: str):
+        from app.services.delivery_retry import redeliver_pending
+        
+        try:
+            result = await redeliver_pending(UUID(user_id), UUID(tenant_id))
+            if result.delivered:
+                logger.info(f"Redelivered {result.delivered} notifications to user {user_id}")
+        except Exception as e:
+            logger.error(f"Failed to redeliver notifications to user {user_id}: {e}")
     
     async def handle_message(self, user_id: str, message: dict):
         """クライアントからのメッセージを処理"""
@@ -163,11 +249,11 @@ class NotificationWebSocketHandler:
             )
         
         elif message_type == "mark_read":
-            # 通知既読処理
-            notification_id = message.get("notification_id")
-            if notification_id:
-                # ここで通知を既読にする処理を実装
-                await self.mark_notification_as_read(user_id, notification_id)
+            # 通知既読処理（notification_id / notification_ids / up_to）
+            notification_ids = list(message.get("notification_ids") or [])
+            if message.get("notification_id"):
+                notification_ids.append(message["notification_id"])
+            await self.mark_notifications_as_read(user_id, notification_ids, message.get("up_to"))
         
         elif message_type == "get_status":
             # オンラインユーザー数などのステータス情報を送信
@@ -182,9 +268,60 @@ class NotificationWebSocketHandler:
             )
     
     async def mark_notification_as_read(self, user_id: str, notification_id: str):
-        """通知を既読にする（実装は後で追加）"""
-        # TODO: NotificationServiceを使用して通知を既読にする
-        pass
+        """通知を既読にする"""
+        await self.mark_notifications_as_read(user_id, [notification_id])
+    
+    async def mark_notifications_as_read(
+        self,
+        user_id: str,
+        notification_ids: List[str],
+        up_to: Optional[str] = None
+    ):
+        """既読要求を受け付ける（短い時間内の要求はまとめて書き込み、notifications_read で応答）"""
+        tenant_id = self.user_tenants.get(user_id)
+        if tenant_id is None:
+            logger.warning(f"mark_read from user {user_id} without tenant; ignored")
+            return
+        try:
+            ids = [UUID(str(notification_id)) for notification_id in notification_ids]
+            watermark = datetime.fromisoformat(up_to) if up_to else None
+        except ValueError:
+            logger.warning(f"Invalid mark_read message from user {user_id}")
+            return
+        if ids or watermark:
+            self.mark_read_coalescer.submit(user_id, tenant_id, ids, watermark)
+    
+    async def _flush_mark_read(
+        self,
+        user_id: str,
+        tenant_id: str,
+        notification_ids: Set[UUID],
+        up_to: Optional[datetime]
+    ):
+        from app.db.session import SessionLocal
+        from app.services.notification_service import NotificationService
+        
+        def mark():
+            with SessionLocal() as db:
+                return NotificationService(db).mark_read_batch(
+                    UUID(user_id), UUID(tenant_id), list(notification_ids), up_to
+                )
+        
+        updated, read_at = await run_in_threadpool(mark)
+        await self.send_read_receipt(user_id, updated, read_at)
+    
+    async def send_read_receipt(self, user_id: str, notification_ids: List[UUID], read_at: datetime):
+        """既読になった通知をユーザーの全接続に通知（他のタブ・端末の未読表示も更新される）"""
+        if not self.connection_manager.is_user_online(user_id):
+            return
+        await self.connection_manager.send_personal_message(
+            user_id,
+            json.dumps({
+                "type": "notifications_read",
+                "notification_ids": [str(notification_id) for notification_id in notification_ids],
+                "read_at": read_at.isoformat()
+            })
+        )
     
     async def send_notification(
         self,
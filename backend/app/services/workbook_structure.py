@@ -0,0 +1,185 @@
+"""
+ワークブックのシート構造検出（ベクトル化）
+- シートを一度だけ1次元のセル配列に展開し、重複値は factorize でまとめて1回だけ判定
+- ワークフロー/ロール/見出しのキーワードは1つのコンパイル済み正規表現（選択）で照合
+- ヘッダー行・ステージ列・日付列などを返す（analyze_excel.py / focused_analysis.py / 旧Excel取り込みで共用）
+"""
+
+import re
+import unicodedata
+from collections import Counter
+from dataclasses import dataclass, field
+from datetime import date, datetime, time
+from typing import Any, Dict, List, Optional, Sequence, Set, Tuple, Union
+
+import numpy as np
+import pandas as pd
+
+from app.db.initial_data import ROLES, STAGES
+
+PROJECT_NAME_LABEL = "邸名"
+
+WORKFLOW_KEYWORDS = ["追客", "契約", "打ち合わせ", "施工", "竣工", "プラン", "設計", "申込", "着工", "上棟", "完成", "引渡"]
+HEADER_KEYWORDS = ["邸名", "フェーズ", "グレード", "営業", "設計", "IC", "工務", "目標", "基礎", "上棟", "項目", "TODO"]
+PROJECT_KEYWORDS = ["プロジェクト", "案件", "PJ", "工事", "現場"]
+ROLE_LABELS = {role["name"] for role in ROLES}
+
+KEYWORD_CATEGORIES: Dict[str, Set[str]] = {}
+for _category, _keywords in (
+    ("workflow", WORKFLOW_KEYWORDS),
+    ("header", HEADER_KEYWORDS),
+    ("project", PROJECT_KEYWORDS),
+):
+    for _keyword in _keywords:
+        KEYWORD_CATEGORIES.setdefault(_keyword.upper(), set()).add(_category)
+
+# 長いキーワードを優先する選択パターン（大文字小文字は区別しない）
+KEYWORD_PATTERN = re.compile(
+    "(" + "|".join(re.escape(k) for k in sorted(KEYWORD_CATEGORIES, key=len, reverse=True)) + ")",
+    re.IGNORECASE
+)
+DATE_LIKE_PATTERN = re.compile(r"\d{1,4}\s*[/\-.年月]\s*\d{1,2}|\d{1,2}\s*日|REF", re.IGNORECASE)
+MAX_DATE_TEXT_LENGTH = 50
+DATE_COLUMN_RATIO = 0.3
+HEADER_MIN_KEYWORDS = 2
+
+# 値ごとの判定結果のビット
+WORKFLOW, HEADER, PROJECT, ROLE, STAGE, NAME_LABEL, DATE, NON_BLANK = (1 << i for i in range(8))
+
+
+def normalize_label(value: Any) -> str:
+    """全角/半角・空白の揺れを吸収したセル文字列"""
+    if value is None:
+        return ""
+    return re.sub(r"\s+", "", unicodedata.normalize("NFKC", str(value)))
+
+
+STAGE_CODES_BY_NAME = {normalize_label(stage["name"]): stage["code"] for stage in STAGES}
+
+
+@dataclass
+class WorkbookStructure:
+    shape: Tuple[int, int]
+    header_rows: List[int] = field(default_factory=list)
+    # 「邸名」ラベルのセル (行, 列)
+    project_name_cells: List[Tuple[int, int]] = field(default_factory=list)
+    # ステージ名が最も多く並ぶヘッダー行の 列 → ステージコード
+    stage_columns: Dict[int, str] = field(default_factory=dict)
+    # ステージ名セル (行, 列, ステージコード)
+    stage_cells: List[Tuple[int, int, str]] = field(default_factory=list)
+    date_columns: List[int] = field(default_factory=list)
+    workflow_items: List[Tuple[int, int, str]] = field(default_factory=list)
+    role_cells: List[Tuple[int, int, str]] = field(default_factory=list)
+    header_cells: List[Tuple[int, int, str]] = field(default_factory=list)
+    project_cells: List[Tuple[int, int, str]] = field(default_factory=list)
+    # シート内に現れたキーワード（大文字に正規化）
+    keywords: Set[str] = field(default_factory=set)
+    date_cell_count: int = 0
+
+
+def _to_frame(sheet: Union[pd.DataFrame, Sequence[Sequence[Any]]]) -> pd.DataFrame:
+    if isinstance(sheet, pd.DataFrame):
+        return sheet
+    return pd.DataFrame.from_records(list(sheet))
+
+
+def detect_structure(
+    sheet: Union[pd.DataFrame, Sequence[Sequence[Any]]],
+    header_scan_rows: int = 30
+) -> WorkbookStructure:
+    """
+    シート（header=None で読んだ DataFrame か行のリスト）の構造を検出
+    header_scan_rows: ヘッダー行・ステージ列を探す先頭行数
+    行・列番号は0始まりの位置
+    """
+    frame = _to_frame(sheet)
+    structure = WorkbookStructure(shape=frame.shape)
+
+    # 同じ値はまとめて1回だけ判定する（判定結果は codes でセルへ展開、空セルは -1）
+    codes, uniques = pd.factorize(frame.to_numpy(dtype=object).ravel())
+    present = np.flatnonzero(codes >= 0)
+    if len(present) == 0:
+        return structure
+    rows, cols = np.divmod(present, frame.shape[1])
+    codes = codes[present]
+    unique_values = pd.Series(uniques, dtype=object)
+    raw_text = unique_values.astype(str).str.strip()
+    text = raw_text.str.normalize("NFKC").str.replace(r"\s+", "", regex=True)
+
+    matches = text.str.findall(KEYWORD_PATTERN).explode().str.upper()
+    structure.keywords = set(matches.dropna())
+
+    def has_category(category: str) -> np.ndarray:
+        keywords = [k for k, c in KEYWORD_CATEGORIES.items() if category in c]
+        return matches.isin(keywords).groupby(level=0).any().reindex(unique_values.index, fill_value=False).to_numpy(bool)
+
+    stage_code = text.map(STAGE_CODES_BY_NAME).to_numpy(object)
+    is_stage = pd.notna(stage_code)
+    non_blank = (text != "").to_numpy(bool)
+    is_date = (
+        unique_values.map(lambda v: isinstance(v, (datetime, date, time))).to_numpy(bool)
+        | (raw_text.str.len().lt(MAX_DATE_TEXT_LENGTH) & raw_text.str.contains(DATE_LIKE_PATTERN)).to_numpy(bool)
+    )
+
+    # 値ごとの判定をビットにまとめ、セルへの展開は1回だけ行う
+    flags = (
+        has_category("workflow") * WORKFLOW
+        | (has_category("header") | is_stage) * HEADER
+        | has_category("project") * PROJECT
+        | text.isin(ROLE_LABELS).to_numpy(bool) * ROLE
+        | is_stage * STAGE
+        | (text == PROJECT_NAME_LABEL).to_numpy(bool) * NAME_LABEL
+        | (is_date & non_blank) * DATE
+        | non_blank * NON_BLANK
+    ).astype(np.uint8)
+    cell_flags = flags[codes]
+    in_head = rows < header_scan_rows
+    texts = raw_text.to_numpy(object)
+
+    def cells(flag: int, mask: Optional[np.ndarray] = None, values: np.ndarray = texts):
+        selected = (cell_flags & flag).astype(bool)
+        if mask is not None:
+            selected &= mask
+        idx = np.flatnonzero(selected)
+        return list(zip(rows[idx].tolist(), cols[idx].tolist(), values[codes[idx]].tolist()))
+
+    structure.workflow_items = cells(WORKFLOW)
+    structure.role_cells = cells(ROLE)
+    structure.header_cells = cells(HEADER, in_head)
+    structure.project_cells = cells(PROJECT)
+    structure.stage_cells = cells(STAGE, values=stage_code)
+    structure.project_name_cells = [(row, col) for row, col, _ in cells(NAME_LABEL)]
+    is_date_cell = (cell_flags & DATE).astype(bool)
+    structure.date_cell_count = int(is_date_cell.sum())
+
+    # ヘッダー行: 先頭行のうち「邸名」を含むか、見出し/ステージ名が複数並ぶ行
+    head_header = (cell_flags & HEADER).astype(bool) & in_head
+    header_counts = np.bincount(rows[head_header], minlength=header_scan_rows)
+    name_rows = {row for row, _ in structure.project_name_cells if row < header_scan_rows}
+    structure.header_rows = sorted(
+        set(np.flatnonzero(header_counts >= HEADER_MIN_KEYWORDS).tolist()) | name_rows
+    )
+
+    # ステージ列: ステージ名が最も多く並ぶヘッダー行
+    head_stages = Counter(row for row, _, _ in structure.stage_cells if row in structure.header_rows)
+    if head_stages:
+        best_row = head_stages.most_common(1)[0][0]
+        structure.stage_columns = {
+            col: code for row, col, code in structure.stage_cells if row == best_row
+        }
+
+    # 日付列: 空でないセルのうち日付らしい値が一定割合を超える列
+    n_cols = frame.shape[1]
+    non_blank_per_col = np.bincount(cols[(cell_flags & NON_BLANK).astype(bool)], minlength=n_cols)
+    date_per_col = np.bincount(cols[is_date_cell], minlength=n_cols)
+    with np.errstate(divide="ignore", invalid="ignore"):
+        ratio = np.where(non_blank_per_col > 0, date_per_col / non_blank_per_col, 0)
+    structure.date_columns = np.flatnonzero(ratio > DATE_COLUMN_RATIO).tolist()
+
+    return structure
+
+
+def first_header_row(structure: WorkbookStructure) -> Optional[int]:
+    """「邸名」ラベルを含む最初のヘッダー行"""
+    rows = [row for row, _ in structure.project_name_cells if row in structure.header_rows]
+    return min(rows) if rows else None
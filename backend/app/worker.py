@@ -0,0 +1,130 @@
+"""
+Celery ワーカー / beat 設定
+
+起動例:
+    celery -A app.worker worker --loglevel=info
+    celery -A app.worker beat --loglevel=info
+"""
+
+import asyncio
+
+from celery import Celery
+from celery.schedules import crontab
+
+from app.core.config import settings
+
+
+def _crontab(expression: str) -> crontab:
+    """'分 時 日 月 曜日' 形式の cron 式を crontab に変換"""
+    minute, hour, day_of_month, month_of_year, day_of_week = expression.split()
+    return crontab(
+        minute=minute,
+        hour=hour,
+        day_of_month=day_of_month,
+        month_of_year=month_of_year,
+        day_of_week=day_of_week
+    )
+
+
+celery_app = Celery(
+    "construction_todo",
+    broker=settings.CELERY_BROKER_URL,
+    backend=settings.CELERY_RESULT_BACKEND
+)
+celery_app.conf.update(
+    task_acks_late=True,
+    worker_prefetch_multiplier=1,
+    beat_schedule={
+        "retrain-delay-model": {
+            "task": "app.worker.retrain_delay_model",
+            "schedule": _crontab(settings.MODEL_RETRAIN_SCHEDULE),
+        },
+        "scan-task-deadlines": {
+            "task": "app.worker.scan_task_deadlines",
+            "schedule": settings.DEADLINE_SCAN_INTERVAL_SECONDS,
+        },
+        "retry-notification-deliveries": {
+            "task": "app.worker.retry_notification_deliveries",
+            "schedule": settings.NOTIFICATION_RETRY_INTERVAL_SECONDS,
+        },
+        "purge-notifications": {
+            "task": "app.worker.purge_notifications",
+            "schedule": _crontab(settings.NOTIFICATION_PURGE_SCHEDULE),
+        },
+    },
+)
+
+
+def run_async(coro):
+    """
+    タスク内でコルーチンを実行
+    タスクごとにイベントループが変わるため、終了時に接続プール（DB・Web Push）を破棄する
+    """
+    from app.db.session import async_engine
+    from app.services.web_push import close_web_push_sender
+
+    async def runner():
+        try:
+            return await coro
+        finally:
+            await close_web_push_sender()
+            await async_engine.dispose()
+
+    return asyncio.run(runner())
+
+
+@celery_app.task
+def retrain_delay_model():
+    """遅延予測モデルを再学習し、新しいモデルで未完了ステージを予測・通知"""
+    from app.ml.trainer import run_training
+    from app.services.delay_prediction_service import run_delay_predictions
+
+    async def retrain():
+        version = await run_training()
+        sent = await run_delay_predictions()
+        return {"model_version": version, "notifications": sent}
+
+    return run_async(retrain())
+
+
+@celery_app.task
+def predict_stage_delays():
+    from app.services.delay_prediction_service import run_delay_predictions
+
+    return run_async(run_delay_predictions())
+
+
+@celery_app.task
+def scan_task_deadlines():
+    """期限まで 72/24/0 時間のしきい値を越えたタスクを通知"""
+    from app.services.deadline_scanner import run_deadline_scan
+
+    result = run_async(run_deadline_scan())
+    return {"scanned": result.scanned, "notified": result.notified}
+
+
+@celery_app.task
+def retry_notification_deliveries():
+    """期限の来たメール・プッシュの再送（上限に達したもの・期限切れの WebSocket 分はデッドレターへ）"""
+    from app.services.delivery_retry import run_delivery_retries
+
+    result = run_async(run_delivery_retries())
+    return {
+        "delivered": result.delivered,
+        "rescheduled": result.rescheduled,
+        "dead_lettered": result.dead_lettered,
+        "dropped": result.dropped,
+    }
+
+
+@celery_app.task
+def purge_notifications():
+    """期限切れ・保持期間切れの通知を削除し、月パーティションを作成・削除"""
+    from app.services.notification_retention import run_notification_purge
+
+    result = run_notification_purge()
+    return {
+        "created_partitions": result.created_partitions,
+        "dropped_partitions": result.dropped_partitions,
+        "deleted": result.deleted,
+    }
@@ -7,6 +7,8 @@ import pandas as pd
 import openpyxl
 from pathlib import Path
 
+from app.services.workbook_structure import detect_structure
+
 def analyze_workflow_structure(file_path, file_description):
     """Extract key workflow structure and data patterns"""
     print(f"\n{'='*60}")
@@ -34,53 +36,25 @@ def analyze_workflow_structure(file_path, file_description):
                 df = pd.read_excel(file_path, sheet_name=sheet_name, header=None)
                 print(f"Size: {df.shape[0]} rows × {df.shape[1]} columns")
                 
-                # Find workflow stages and roles in the data
-                workflow_items = []
-                role_assignments = []
-                date_patterns = []
-                
-                for i in range(min(20, len(df))):
-                    for j in range(min(20, df.shape[1])):
-                        cell_value = df.iloc[i, j]
-                        if pd.notna(cell_value):
-                            cell_str = str(cell_value).strip()
-                            
-                            # Check for workflow stages
-                            workflow_keywords = ['追客', '契約', '打ち合わせ', '施工', '竣工', 'プラン', '設計', '申込', '着工', '上棟', '完成', '引渡']
-                            for keyword in workflow_keywords:
-                                if keyword in cell_str:
-                                    workflow_items.append((i, j, cell_str))
-                                    break
-                            
-                            # Check for roles
-                            if cell_str in ['営業', '設計', 'IC', '工務']:
-                                role_assignments.append((i, j, cell_str))
-                            
-                            # Check for date patterns
-                            if any(char in cell_str for char in ['/', '月', '日']) or 'REF' in cell_str:
-                                if len(cell_str) < 50:  # Skip long text
-                                    date_patterns.append((i, j, cell_str))
-                
-                # Look for key column headers
-                key_columns = []
-                for i in range(min(5, len(df))):
-                    row_data = df.iloc[i].fillna('').astype(str).tolist()
-                    for j, cell in enumerate(row_data):
-                        if any(keyword in cell for keyword in ['邸名', 'フェーズ', 'グレード', '営業', '設計', 'IC', '工務', '目標', '基礎', '上棟']):
-                            key_columns.append((i, j, cell))
+                # Detect workflow stages, roles, date cells and key headers in one vectorized pass
+                structure = detect_structure(df)
+                workflow_items = structure.workflow_items
+                role_assignments = structure.role_cells
+                key_columns = [cell for cell in structure.header_cells if cell[0] < 5]
                 
                 results[sheet_name] = {
                     'dimensions': df.shape,
                     'workflow_items': workflow_items[:10],  # Top 10
                     'role_assignments': role_assignments,
                     'key_columns': key_columns[:15],  # Top 15
-                    'date_patterns_count': len(date_patterns)
+                    'date_patterns_count': structure.date_cell_count,
+                    'stage_columns': structure.stage_columns
                 }
                 
                 print(f"  Workflow items found: {len(workflow_items)}")
                 print(f"  Role assignments: {len(role_assignments)}")
                 print(f"  Key columns: {len(key_columns)}")
-                print(f"  Date patterns: {len(date_patterns)}")
+                print(f"  Date patterns: {structure.date_cell_count}")
                 
                 if workflow_items:
                     print("  Sample workflow items:")
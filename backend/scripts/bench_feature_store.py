@@ -0,0 +1,168 @@
+#!/usr/bin/env python
+"""
+フィーチャーストアのベンチマーク（合成データ、DB不要）
+- 全件集計: 全タスクを (プロジェクト, ステージ) ごとに集計して書き込み
+- 増分更新: FeatureStore.refresh を DataFrame 上のローダーで実行（変更キーのみ。assignee_load は読み込み時に計算）
+- どちらも学習時の読み込み（キーごとの最新行）まで含めて計測
+- 各ラウンドで増分更新の結果が全件集計と一致することを確認する
+  （最後にタスクを削除し、作り直しの時期の refresh で一致に戻ることも確認）
+
+使用例:
+    python scripts/bench_feature_store.py --projects 5000 --tasks-per-stage 3 --changed-ratio 0.01
+"""
+
+import argparse
+import asyncio
+import logging
+import tempfile
+import time
+import uuid
+from datetime import datetime, timedelta
+
+import numpy as np
+import pandas as pd
+
+from app.core.config import settings
+from app.db.initial_data import STAGES
+from app.ml.feature_store import (
+    KEY_COLUMNS,
+    STAGE_FRAME_COLUMNS,
+    TASK_ROW_COLUMNS,
+    FeatureStore,
+    aggregate_stage_tasks,
+)
+
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+
+def synthetic_tasks(projects: int, tasks_per_stage: int, rng: np.random.Generator, now: datetime) -> pd.DataFrame:
+    stage_codes = np.array([stage["code"] for stage in STAGES])
+    project_ids = np.array([str(uuid.uuid4()) for _ in range(projects)])
+    assignees = np.array([str(uuid.uuid4()) for _ in range(max(1, projects // 20))])
+
+    n = projects * len(stage_codes) * tasks_per_stage
+    project_idx = np.repeat(np.arange(projects), len(stage_codes) * tasks_per_stage)
+    stage_idx = np.tile(np.repeat(np.arange(len(stage_codes)), tasks_per_stage), projects)
+    created_at = np.datetime64(now, "ns") - (rng.uniform(0, 400, n) * 86400e9).astype("timedelta64[ns]")
+    done = rng.random(n) < 0.6
+
+    return pd.DataFrame({
+        "tenant_id": "tenant",
+        "project_id": project_ids[project_idx],
+        "project_name": np.char.add("邸", project_idx.astype(str)),
+        "created_by_id": assignees[project_idx % len(assignees)],
+        "project_start_date": np.datetime64(now - timedelta(days=400), "ns"),
+        "stage_code": stage_codes[stage_idx],
+        "assignee_id": assignees[rng.integers(0, len(assignees), n)],
+        "status": np.where(done, "DONE", "PENDING"),
+        "created_at": created_at,
+        "due_date": created_at + (rng.uniform(1, 30, n) * 86400e9).astype("timedelta64[ns]"),
+        "completed_at": np.where(done, created_at + np.timedelta64(10, "D"), np.datetime64("NaT")),
+        "updated_at": created_at,
+    })
+
+
+class FrameTaskLoader:
+    """TaskChangeLoader と同じメソッドで、tasks テーブルの代わりに DataFrame を読む"""
+
+    def __init__(self, tasks: pd.DataFrame):
+        self.tasks = tasks
+
+    async def load_all(self):
+        return self.tasks[TASK_ROW_COLUMNS], self.tasks["updated_at"].max().to_pydatetime()
+
+    async def changed_keys(self, since: datetime):
+        latest = self.tasks[self.tasks["updated_at"] > since].groupby(KEY_COLUMNS, sort=False)["updated_at"].max()
+        watermark = latest.max().to_pydatetime() if len(latest) else None
+        return list(latest.index), watermark
+
+    async def load_keys(self, keys):
+        return self.tasks.merge(pd.DataFrame(keys, columns=KEY_COLUMNS), on=KEY_COLUMNS)[TASK_ROW_COLUMNS]
+
+    async def assignee_open_counts(self):
+        open_tasks = self.tasks[self.tasks["status"] != "DONE"]
+        return open_tasks["assignee_id"].value_counts().astype(float).to_dict()
+
+
+def _sorted(frame: pd.DataFrame) -> pd.DataFrame:
+    return frame[STAGE_FRAME_COLUMNS].sort_values(KEY_COLUMNS, ignore_index=True)
+
+
+def assert_matches_full_build(store: FeatureStore, tasks: pd.DataFrame, root: str):
+    """増分更新したストアの読み込み結果（assignee_load を含む）が、同じタスクを全件集計した結果と一致すること"""
+    expected = FeatureStore(name="expected", root=root)
+    counts = asyncio.run(FrameTaskLoader(tasks).assignee_open_counts())
+    expected.append(aggregate_stage_tasks(tasks[TASK_ROW_COLUMNS]), None, replace=True, assignee_open_counts=counts)
+    pd.testing.assert_frame_equal(_sorted(store.read()), _sorted(expected.read()))
+
+
+def change_tasks(tasks: pd.DataFrame, args, rng: np.random.Generator, round_no: int, now: datetime) -> int:
+    """キーの一部を完了にし、一部のタスクの担当者を付け替える（updated_at を進める）"""
+    keys = tasks[KEY_COLUMNS].drop_duplicates()
+    completed = tasks[KEY_COLUMNS].merge(
+        keys.sample(frac=args.changed_ratio, random_state=round_no), how="left", indicator=True
+    )["_merge"].eq("both").to_numpy()
+    reassigned = rng.random(len(tasks)) < args.reassign_ratio
+
+    tasks.loc[completed, "status"] = "DONE"
+    assignees = tasks["assignee_id"].unique()
+    tasks.loc[reassigned, "assignee_id"] = assignees[rng.integers(0, len(assignees), reassigned.sum())]
+    tasks.loc[completed | reassigned, "updated_at"] = np.datetime64(now, "ns")
+    return int((completed | reassigned).sum())
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--projects", type=int, default=5000)
+    parser.add_argument("--tasks-per-stage", type=int, default=3)
+    parser.add_argument("--changed-ratio", type=float, default=0.01)
+    parser.add_argument("--reassign-ratio", type=float, default=0.0005, help="ラウンドごとに担当者を付け替えるタスクの割合")
+    parser.add_argument("--deleted-ratio", type=float, default=0.001, help="最後に削除するタスクの割合")
+    parser.add_argument("--rounds", type=int, default=5, help="増分更新の回数")
+    args = parser.parse_args()
+
+    rng = np.random.default_rng(0)
+    now = datetime(2026, 10, 19, 9, 0)
+    tasks = synthetic_tasks(args.projects, args.tasks_per_stage, rng, now)
+    logger.info(f"Synthetic tasks: {len(tasks)}")
+
+    with tempfile.TemporaryDirectory() as root:
+        store = FeatureStore(root=root)
+        loader = FrameTaskLoader(tasks)
+
+        start = time.perf_counter()
+        asyncio.run(store.refresh(None, loader=loader, now=now))
+        frame = store.read()
+        full = time.perf_counter() - start
+        logger.info(f"Full build: {full * 1000:.0f} ms ({len(frame)} stage rows)")
+
+        for round_no in range(1, args.rounds + 1):
+            now += timedelta(minutes=30)
+            changed = change_tasks(tasks, args, rng, round_no, now)
+
+            start = time.perf_counter()
+            written = asyncio.run(store.refresh(None, loader=loader, now=now))
+            append_time = time.perf_counter() - start
+            frame = store.read()
+            total = time.perf_counter() - start
+            assert_matches_full_build(store, tasks, root)
+            logger.info(
+                f"Incremental round {round_no}: {changed} changed tasks / {written} stage rows rewritten, "
+                f"refresh {append_time * 1000:.0f} ms, refresh+read {total * 1000:.0f} ms "
+                f"({len(store.partitions)} partitions, {len(frame)} stage rows, matches full build)"
+            )
+
+        logger.info(f"Full build / last incremental (refresh+read): {full / total:.1f}x")
+
+        # 削除は変更として読めないので、作り直しの時期の refresh で反映される
+        tasks.drop(tasks.sample(frac=args.deleted_ratio, random_state=0).index, inplace=True)
+        tasks.reset_index(drop=True, inplace=True)
+        now += timedelta(hours=settings.FEATURE_STORE_REBUILD_HOURS)
+        asyncio.run(store.refresh(None, loader=loader, now=now))
+        assert_matches_full_build(store, tasks, root)
+        logger.info("Periodic rebuild after deletions matches full build")
+
+
+if __name__ == "__main__":
+    main()
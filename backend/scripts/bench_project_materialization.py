@@ -0,0 +1,72 @@
+#!/usr/bin/env python
+"""
+プロジェクト実体化のベンチマーク
+- 指定テナントに N 件のプロジェクトを一括作成（全ステージの標準タスク付き）
+- プロジェクト数/秒・タスク数/秒を計測し、作成したデータは最後に削除
+
+使用例:
+    python scripts/bench_project_materialization.py --tenant-code DEMO001 --projects 500
+"""
+
+import argparse
+import asyncio
+import logging
+import time
+import uuid
+
+from sqlalchemy import delete, select
+
+from app.db.session import AsyncSessionLocal
+from app.models import Task, Tenant, User
+from app.models.project import Project
+from app.schemas.project import ProjectCreate
+from app.services.project_materializer import ProjectMaterializer
+
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+
+async def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--tenant-code", default="DEMO001")
+    parser.add_argument("--projects", type=int, default=500)
+    parser.add_argument("--keep", action="store_true", help="作成したプロジェクトを削除しない")
+    args = parser.parse_args()
+
+    run_id = uuid.uuid4().hex[:8]
+    projects = [
+        ProjectCreate(
+            name=f"一括作成邸 {i}",
+            code=f"BULK-{run_id}-{i:05d}",
+            customer_name=f"顧客 {i}",
+        )
+        for i in range(args.projects)
+    ]
+
+    async with AsyncSessionLocal() as session:
+        tenant = (await session.execute(
+            select(Tenant).where(Tenant.code == args.tenant_code)
+        )).scalar_one()
+        user = (await session.execute(
+            select(User).where(User.tenant_id == tenant.id).limit(1)
+        )).scalar_one()
+
+        start = time.perf_counter()
+        result = await ProjectMaterializer(session).create_projects(tenant.id, user.id, projects)
+        elapsed = time.perf_counter() - start
+
+        logger.info(
+            f"Created {len(result.project_ids)} projects / {result.task_count} tasks "
+            f"in {elapsed:.2f}s ({len(result.project_ids) / elapsed:.0f} projects/s, "
+            f"{result.task_count / elapsed:.0f} tasks/s)"
+        )
+
+        if not args.keep:
+            await session.execute(delete(Task).where(Task.project_id.in_(result.project_ids)))
+            await session.execute(delete(Project).where(Project.id.in_(result.project_ids)))
+            await session.commit()
+            logger.info("Cleaned up benchmark projects")
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,41 @@
+#!/usr/bin/env python
+"""
+ボトルネック検出バッチ
+- 全テナント（または指定テナント）の未完了タスクを集計し、しきい値超過を通知
+
+使用例:
+    python scripts/detect_bottlenecks.py
+    python scripts/detect_bottlenecks.py --tenant-id <UUID> --min-queue-depth 20
+"""
+
+import argparse
+import asyncio
+import logging
+from uuid import UUID
+
+from app.services.bottleneck_detector import BottleneckThresholds, run_bottleneck_detection
+
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+
+async def main():
+    defaults = BottleneckThresholds()
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--tenant-id", type=UUID, action="append", dest="tenant_ids")
+    parser.add_argument("--min-queue-depth", type=int, default=defaults.min_queue_depth)
+    parser.add_argument("--age-p90-days", type=float, default=defaults.age_p90_days)
+    parser.add_argument("--min-blocked-projects", type=int, default=defaults.min_blocked_projects)
+    args = parser.parse_args()
+
+    thresholds = BottleneckThresholds(
+        min_queue_depth=args.min_queue_depth,
+        age_p90_days=args.age_p90_days,
+        min_blocked_projects=args.min_blocked_projects,
+    )
+    sent = await run_bottleneck_detection(args.tenant_ids, thresholds)
+    logger.info(f"Sent {sent} bottleneck notifications")
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,26 @@
+#!/usr/bin/env python
+"""
+Web Push 用の VAPID 鍵ペアを生成
+- 秘密鍵を .env の WEB_PUSH_VAPID_PRIVATE_KEY に設定する
+- 公開鍵は GET /notifications/push/vapid-public-key でも取得できる
+
+使用例:
+    python scripts/generate_vapid_keys.py
+"""
+
+import argparse
+
+from app.services.web_push import generate_vapid_keys
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.parse_args()
+
+    private_key, public_key = generate_vapid_keys()
+    print(f"WEB_PUSH_VAPID_PRIVATE_KEY={private_key}")
+    print(f"# public key: {public_key}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,77 @@
+#!/usr/bin/env python
+"""
+旧Excel TODOワークブックの一括取り込み
+- 指定したファイル/ディレクトリ配下の .xlsx をプロセスプールで並列に取り込む
+- 取り込み済みのプロジェクト（同じファイル・シート・行から生成したコード）はスキップ
+- コードはファイルの --root からの相対パスで生成する（未指定なら絶対パス。ディレクトリを移動しても
+  同じ --root を指定すれば再実行で重複しない）。既存の別プロジェクトとコードが衝突した行は報告する
+
+使用例:
+    python scripts/import_legacy_workbooks.py --tenant-code DEMO001 --user-email admin@demo.com legacy/
+    python scripts/import_legacy_workbooks.py --tenant-code DEMO001 --user-email admin@demo.com --root legacy legacy/
+"""
+
+import argparse
+import logging
+import time
+from pathlib import Path
+
+from sqlalchemy import select
+
+from app.db.session import SessionLocal
+from app.models import Tenant, User
+from app.services.legacy_importer import import_workbooks
+
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+
+def collect_paths(targets):
+    for target in map(Path, targets):
+        if target.is_dir():
+            yield from sorted(p for p in target.rglob("*.xlsx") if not p.name.startswith("~$"))
+        else:
+            yield target
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("paths", nargs="+")
+    parser.add_argument("--tenant-code", required=True)
+    parser.add_argument("--user-email", required=True, help="作成者として記録するユーザー")
+    parser.add_argument("--workers", type=int, default=4)
+    parser.add_argument("--batch-size", type=int, default=500)
+    parser.add_argument("--root", help="プロジェクトコード生成の基準ディレクトリ")
+    args = parser.parse_args()
+
+    with SessionLocal() as session:
+        tenant = session.execute(select(Tenant).where(Tenant.code == args.tenant_code)).scalar_one()
+        user = session.execute(
+            select(User).where(User.tenant_id == tenant.id, User.email == args.user_email)
+        ).scalar_one()
+        tenant_id, user_id = tenant.id, user.id
+
+    paths = [str(p) for p in collect_paths(args.paths)]
+    start = time.perf_counter()
+    results = import_workbooks(paths, tenant_id, user_id, args.workers, args.batch_size, args.root)
+    elapsed = time.perf_counter() - start
+
+    for result in results:
+        status = "ERROR" if result.errors else "COLLISION" if result.collisions else "OK"
+        logger.info(
+            f"[{status}] {result.path}: {result.projects} projects, {result.tasks} tasks, "
+            f"{result.skipped_projects} skipped, {len(result.collisions)} collisions"
+        )
+        for error in result.errors:
+            logger.error(f"  {error}")
+        for collision in result.collisions:
+            logger.warning(f"  code collision {collision}")
+
+    logger.info(
+        f"Imported {sum(r.projects for r in results)} projects / {sum(r.tasks for r in results)} tasks "
+        f"from {len(results)} workbooks in {elapsed:.1f}s"
+    )
+
+
+if __name__ == "__main__":
+    main()
@@ -8,8 +8,11 @@
 
 import asyncio
 import logging
-from sqlalchemy import text
-from sqlalchemy.ext.asyncio import create_async_engine
+import time
+from typing import Any, Dict
+from sqlalchemy import func, text
+from sqlalchemy.dialects.postgresql import insert
+from sqlalchemy.ext.asyncio import AsyncSession, create_async_engine
 from app.core.config import settings
 from app.db.session import AsyncSessionLocal
 from app.db.initial_data import PHASES, STAGES, ROLES, TASK_TEMPLATES
@@ -46,52 +49,85 @@ async def create_database():
     await engine.dispose()
 
 
+# 親から順に投入する（モデル, データ, [(参照コード列, 参照先モデル, 参照先IDの列)]）
+MASTER_TABLES = [
+    (Phase, PHASES, []),
+    (Role, ROLES, []),
+    (Stage, STAGES, [("phase_code", Phase, "phase_id")]),
+    (TaskTemplate, TASK_TEMPLATES, [
+        ("stage_code", Stage, "stage_id"),
+        ("default_assignee_role", Role, "default_assignee_role_id"),
+    ]),
+]
+
+
+def _column_default(column) -> Any:
+    default = column.default
+    return default.arg if default is not None and default.is_scalar else None
+
+
+async def upsert_master_data(session: AsyncSession) -> Dict[str, int]:
+    """
+    マスターデータを INSERT ... ON CONFLICT (code) DO UPDATE で一括投入（再実行しても同じ結果）
+    - テーブルごとに1文。参照先コードは投入済みの code → id のマップで検証し、
+      モデルに参照先IDの列があればマップから埋める
+    - トランザクションの管理は呼び出し側
+    """
+    ids_by_model: Dict[Any, Dict[str, Any]] = {}
+    counts = {}
+    for model, rows, references in MASTER_TABLES:
+        table = model.__table__
+        values = []
+        for data in rows:
+            row = {key: value for key, value in data.items() if key in table.c}
+            for code_column, parent, id_column in references:
+                code = data.get(code_column)
+                if code is None:
+                    continue
+                parent_ids = ids_by_model[parent]
+                if code not in parent_ids:
+                    raise ValueError(f"{table.name}.{data['code']}: unknown {code_column} {code}")
+                if id_column in table.c:
+                    row[id_column] = parent_ids[code]
+            values.append(row)
+
+        # 複数行 VALUES は全行同じ列にそろえる（省略された列はモデルの既定値）
+        columns = list(dict.fromkeys(key for row in values for key in row))
+        values = [
+            {key: row[key] if key in row else _column_default(table.c[key]) for key in columns}
+            for row in values
+        ]
+
+        stmt = insert(table).values(values)
+        update_columns = {
+            name: stmt.excluded[name]
+            for name in columns
+            if name not in ("id", "code", "created_at")
+        }
+        if "updated_at" in table.c:
+            update_columns["updated_at"] = func.now()
+        result = await session.execute(
+            stmt.on_conflict_do_update(index_elements=[table.c.code], set_=update_columns)
+            .returning(table.c.code, table.c.id)
+        )
+        ids_by_model[model] = dict(result.all())
+        counts[table.name] = len(values)
+    return counts
+
+
 async def init_master_data():
-    """マスターデータの初期投入"""
+    """マスターデータの初期投入（冪等・1トランザクション）"""
+    started = time.perf_counter()
     async with AsyncSessionLocal() as session:
         try:
-            # フェーズデータの投入
-            logger.info("Inserting phases...")
-            for phase_data in PHASES:
-                phase = Phase(**phase_data)
-                session.add(phase)
-            
-            await session.commit()
-            logger.info(f"Inserted {len(PHASES)} phases")
-            
-            # ステージデータの投入
-            logger.info("Inserting stages...")
-            for stage_data in STAGES:
-                stage = Stage(**stage_data)
-                session.add(stage)
-            
-            await session.commit()
-            logger.info(f"Inserted {len(STAGES)} stages")
-            
-            # ロールデータの投入
-            logger.info("Inserting roles...")
-            for role_data in ROLES:
-                role = Role(**role_data)
-                session.add(role)
-            
-            await session.commit()
-            logger.info(f"Inserted {len(ROLES)} roles")
-            
-            # タスクテンプレートの投入
-            logger.info("Inserting task templates...")
-            for template_data in TASK_TEMPLATES:
-                checklist_items = template_data.pop('checklist_items', [])
-                template = TaskTemplate(**template_data)
-                template.checklist_items = checklist_items
-                session.add(template)
-            
-            await session.commit()
-            logger.info(f"Inserted {len(TASK_TEMPLATES)} task templates")
-            
+            async with session.begin():
+                counts = await upsert_master_data(session)
         except Exception as e:
             logger.error(f"Error inserting master data: {e}")
-            await session.rollback()
             raise
+    elapsed_ms = (time.perf_counter() - started) * 1000
+    summary = ", ".join(f"{name}={count}" for name, count in counts.items())
+    logger.info(f"Upserted master data ({summary}) in {elapsed_ms:.0f} ms")
 
 
 async def create_demo_tenant():
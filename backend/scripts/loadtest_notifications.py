@@ -0,0 +1,489 @@
+#!/usr/bin/env python
+"""
+通知API・WebSocket配信の負荷試験
+- 指定テナントに N 人のユーザーと M 件の通知を投入（終了時に削除、--keep で残す）
+- APIサーバーを uvicorn で別プロセス起動（--base-url 指定時は起動済みのサーバーを使用。SECRET_KEY を合わせること）
+- シナリオごとに --concurrency 並列で --requests 回実行し、スループットと p50/p95/p99 を計測
+    list               GET  /notifications/
+    stats              GET  /notifications/stats/summary
+    create-bulk        POST /notifications/construction/stage-completed（--bulk-size 人宛て）
+    websocket-connect  WebSocket 接続から ping/pong まで
+    fanout             --fanout-clients 人が WebSocket 接続した状態で一括作成し、全員に届くまで
+                       （WebSocket 接続はプロセスごとに保持されるため、サーバーは1ワーカーで動かすこと）
+- 結果は JSON に書き出す（--baseline で前回の JSON と比較）
+- いずれかのシナリオでエラーが1件でもあれば終了コード 1（エラーのある計測値は比較に使えないため）
+
+使用例:
+    python scripts/loadtest_notifications.py --users 200 --notifications 100000 --output loadtest.json
+    python scripts/loadtest_notifications.py --scenarios list stats --baseline loadtest.json --output after.json
+"""
+
+import argparse
+import asyncio
+import json
+import logging
+import os
+import random
+import socket
+import statistics
+import subprocess
+import sys
+import time
+import uuid
+from dataclasses import dataclass, field
+from datetime import datetime, timedelta, timezone
+from typing import Awaitable, Callable, Dict, List, Optional, Tuple
+
+import httpx
+import websockets
+from sqlalchemy import delete, insert, select
+
+from app.core.config import settings
+from app.core.security import create_access_token, get_password_hash
+from app.db.session import SessionLocal
+from app.models import Tenant, User
+from app.models.notification import (
+    Notification, NotificationDeliveryLog, NotificationPriorityEnum, NotificationTypeEnum
+)
+from app.models.project import Project
+from app.services.delivery_retry import notification_dead_letters, notification_delivery_retries
+from app.services.notification_dedup import notification_dedup_keys
+
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+SCENARIOS = ["list", "stats", "create-bulk", "websocket-connect", "fanout"]
+SEED_BATCH_SIZE = 5000
+
+
+def create_app():
+    """uvicorn --factory 用。app.main に API ルーターを載せる"""
+    from app.api.v1.api import api_router
+    from app.main import app
+
+    app.include_router(api_router, prefix=settings.API_V1_STR)
+    return app
+
+
+# --- 投入・削除 ---
+
+@dataclass
+class Seed:
+    tenant_id: uuid.UUID
+    project_id: Optional[uuid.UUID]
+    user_ids: List[uuid.UUID]
+    tokens: Dict[uuid.UUID, str] = field(default_factory=dict)
+
+
+def seed_data(tenant_code: str, users: int, notifications: int, run_id: str) -> Seed:
+    """ユーザーと通知を一括投入（パスワードハッシュは全員共通）"""
+    with SessionLocal() as session:
+        tenant_id = session.execute(select(Tenant.id).where(Tenant.code == tenant_code)).scalar_one()
+        project_id = session.execute(
+            select(Project.id).where(Project.tenant_id == tenant_id).limit(1)
+        ).scalar_one_or_none()
+
+        start = time.perf_counter()
+        hashed_password = get_password_hash(run_id)
+        user_ids = [uuid.uuid4() for _ in range(users)]
+        session.execute(insert(User), [
+            {
+                "id": user_id,
+                "tenant_id": tenant_id,
+                "email": f"loadtest-{run_id}-{i}@example.com",
+                "full_name": f"負荷試験 {i}",
+                "hashed_password": hashed_password,
+                "is_active": True,
+                "is_superuser": False,
+                "role_code": "SALES",
+            }
+            for i, user_id in enumerate(user_ids)
+        ])
+        session.commit()
+
+        types = list(NotificationTypeEnum)
+        priorities = list(NotificationPriorityEnum)
+        now = datetime.now(timezone.utc)
+        for offset in range(0, notifications, SEED_BATCH_SIZE):
+            session.execute(insert(Notification), [
+                {
+                    "id": uuid.uuid4(),
+                    "tenant_id": tenant_id,
+                    "recipient_id": user_ids[n % users],
+                    "type": types[n % len(types)],
+                    "priority": priorities[n % len(priorities)],
+                    "title": f"負荷試験通知 {n}",
+                    "message": "負荷試験用の通知です",
+                    "is_read": n % 3 == 0,
+                    "created_at": now - timedelta(minutes=n),
+                }
+                for n in range(offset, min(offset + SEED_BATCH_SIZE, notifications))
+            ])
+            session.commit()
+        logger.info(f"Seeded {users} users / {notifications} notifications in {time.perf_counter() - start:.1f}s")
+
+    seed = Seed(tenant_id, project_id, user_ids)
+    seed.tokens = {user_id: create_access_token(user_id) for user_id in user_ids}
+    return seed
+
+
+def cleanup(seed: Seed):
+    """投入したユーザーと、その宛ての通知・配信記録を削除"""
+    notification_ids = select(Notification.id).where(Notification.recipient_id.in_(seed.user_ids))
+    with SessionLocal() as session:
+        session.execute(delete(NotificationDeliveryLog).where(
+            NotificationDeliveryLog.notification_id.in_(notification_ids)
+        ))
+        session.execute(delete(notification_dedup_keys).where(
+            notification_dedup_keys.c.notification_id.in_(notification_ids)
+        ))
+        for table in (notification_delivery_retries, notification_dead_letters):
+            session.execute(delete(table).where(table.c.recipient_id.in_(seed.user_ids)))
+        session.execute(delete(Notification).where(Notification.recipient_id.in_(seed.user_ids)))
+        session.execute(delete(User).where(User.id.in_(seed.user_ids)))
+        session.commit()
+    logger.info("Cleaned up load test data")
+
+
+def clear_pending_retries(seed: Seed):
+    """接続時に再送される未配信分が計測に混ざらないよう、投入ユーザー宛ての再送待ちを消す"""
+    with SessionLocal() as session:
+        session.execute(delete(notification_delivery_retries).where(
+            notification_delivery_retries.c.recipient_id.in_(seed.user_ids)
+        ))
+        session.commit()
+
+
+# --- サーバー ---
+
+def _free_port() -> int:
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+
+async def start_server(workers: int) -> Tuple[subprocess.Popen, str]:
+    """このスクリプトの create_app を uvicorn で起動し、/health が応答するまで待つ"""
+    port = _free_port()
+    backend_dir = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+    process = subprocess.Popen(
+        [
+            sys.executable, "-m", "uvicorn", "loadtest_notifications:create_app", "--factory",
+            "--app-dir", os.path.join(backend_dir, "scripts"),
+            "--host", "127.0.0.1", "--port", str(port),
+            "--workers", str(workers), "--log-level", "warning",
+        ],
+        cwd=backend_dir,
+        env={**os.environ, "PYTHONPATH": backend_dir},
+    )
+    base_url = f"http://127.0.0.1:{port}"
+    async with httpx.AsyncClient(base_url=base_url) as client:
+        for _ in range(100):
+            if process.poll() is not None:
+                raise RuntimeError(f"API server exited with code {process.returncode}")
+            try:
+                if (await client.get("/health")).status_code == 200:
+                    return process, base_url
+            except httpx.TransportError:
+                pass
+            await asyncio.sleep(0.1)
+    process.terminate()
+    raise RuntimeError("API server did not become ready")
+
+
+# --- 計測 ---
+
+@dataclass
+class ScenarioResult:
+    latencies: List[float] = field(default_factory=list)  # ms
+    errors: Dict[str, int] = field(default_factory=dict)
+    elapsed: float = 0.0
+
+    def error(self, kind: str):
+        self.errors[kind] = self.errors.get(kind, 0) + 1
+
+    def summary(self) -> dict:
+        latencies = sorted(self.latencies)
+        summary = {
+            "requests": len(latencies) + sum(self.errors.values()),
+            "ok": len(latencies),
+            "errors": self.errors,
+            "duration_s": round(self.elapsed, 3),
+            "throughput_rps": round(len(latencies) / self.elapsed, 2) if self.elapsed else 0.0,
+            "latency_ms": None,
+        }
+        if len(latencies) >= 2:
+            q = statistics.quantiles(latencies, n=100, method="inclusive")
+            summary["latency_ms"] = {
+                "mean": round(statistics.fmean(latencies), 2),
+                "p50": round(q[49], 2),
+                "p95": round(q[94], 2),
+                "p99": round(q[98], 2),
+                "max": round(latencies[-1], 2),
+            }
+        return summary
+
+
+async def run_concurrently(
+    operation: Callable[[int, ScenarioResult], Awaitable[None]],
+    requests: int,
+    concurrency: int
+) -> ScenarioResult:
+    """requests 回の operation を concurrency 並列で実行"""
+    result = ScenarioResult()
+    counter = iter(range(requests))
+
+    async def worker():
+        for i in counter:
+            await operation(i, result)
+
+    start = time.perf_counter()
+    await asyncio.gather(*[worker() for _ in range(min(concurrency, requests))])
+    result.elapsed = time.perf_counter() - start
+    return result
+
+
+async def timed_request(client: httpx.AsyncClient, result: ScenarioResult, method: str, url: str, **kwargs):
+    start = time.perf_counter()
+    try:
+        response = await client.request(method, url, **kwargs)
+    except httpx.HTTPError as e:
+        result.error(type(e).__name__)
+        return
+    if response.is_success:
+        result.latencies.append((time.perf_counter() - start) * 1000)
+    else:
+        result.error(f"HTTP {response.status_code}")
+
+
+def ws_connect(base_url: str, token: str):
+    url = base_url.replace("http", "ws", 1) + f"{settings.API_V1_STR}/notifications/ws"
+    headers = {"Authorization": f"Bearer {token}"}
+    # websockets 14 以降はヘッダー引数の名前が変わった
+    if int(websockets.__version__.split(".")[0]) >= 14:
+        return websockets.connect(url, additional_headers=headers, open_timeout=10)
+    return websockets.connect(url, extra_headers=headers, open_timeout=10)
+
+
+def _auth(seed: Seed, user_id: uuid.UUID) -> dict:
+    return {"Authorization": f"Bearer {seed.tokens[user_id]}"}
+
+
+def _stage_completed(seed: Seed, recipient_ids: List[uuid.UUID], stage_name: str = "負荷試験") -> dict:
+    return {
+        "stage_name": stage_name,
+        "project_name": "負荷試験邸",
+        "completed_by": "負荷試験",
+        "recipient_ids": [str(recipient_id) for recipient_id in recipient_ids],
+        "project_id": str(seed.project_id),
+    }
+
+
+async def run_scenario(name: str, client: httpx.AsyncClient, base_url: str, seed: Seed, args) -> ScenarioResult:
+    prefix = f"{settings.API_V1_STR}/notifications"
+    users = seed.user_ids
+
+    if name == "list":
+        async def operation(i, result):
+            await timed_request(
+                client, result, "GET", f"{prefix}/",
+                params={"limit": 20, "unread_only": i % 4 == 0}, headers=_auth(seed, users[i % len(users)])
+            )
+        return await run_concurrently(operation, args.requests, args.concurrency)
+
+    if name == "stats":
+        async def operation(i, result):
+            await timed_request(client, result, "GET", f"{prefix}/stats/summary", headers=_auth(seed, users[i % len(users)]))
+        return await run_concurrently(operation, args.requests, args.concurrency)
+
+    if name == "create-bulk":
+        async def operation(i, result):
+            sender = users[i % len(users)]
+            await timed_request(
+                client, result, "POST", f"{prefix}/construction/stage-completed",
+                json=_stage_completed(seed, random.sample(users, min(args.bulk_size, len(users)))),
+                headers=_auth(seed, sender)
+            )
+        return await run_concurrently(operation, args.requests, args.concurrency)
+
+    if name == "websocket-connect":
+        async def operation(i, result):
+            start = time.perf_counter()
+            try:
+                async with ws_connect(base_url, seed.tokens[users[i % len(users)]]) as ws:
+                    await ws.send(json.dumps({"type": "ping"}))
+                    while json.loads(await asyncio.wait_for(ws.recv(), timeout=10)).get("type") != "pong":
+                        pass
+            except (OSError, asyncio.TimeoutError, websockets.exceptions.WebSocketException) as e:
+                result.error(type(e).__name__)
+                return
+            result.latencies.append((time.perf_counter() - start) * 1000)
+        return await run_concurrently(operation, args.requests, args.concurrency)
+
+    if name == "fanout":
+        return await run_fanout(client, base_url, seed, args)
+
+    raise ValueError(f"Unknown scenario: {name}")
+
+
+async def run_fanout(client: httpx.AsyncClient, base_url: str, seed: Seed, args) -> ScenarioResult:
+    """接続中のクライアントへ一括作成し、作成開始から各クライアントに届くまでを計測（1回 = 1クライアント分）"""
+    result = ScenarioResult()
+    recipients = seed.user_ids[:args.fanout_clients]
+    clear_pending_retries(seed)
+    connections = []
+    try:
+        for recipient_id in recipients:
+            connections.append(await ws_connect(base_url, seed.tokens[recipient_id]))
+    except (OSError, asyncio.TimeoutError, websockets.exceptions.WebSocketException) as e:
+        result.error(type(e).__name__)
+        for ws in connections:
+            await ws.close()
+        return result
+
+    def is_current(message: dict, stage_name: str) -> bool:
+        data = message.get("data") or {}
+        return message.get("type") == "notification" and (data.get("metadata") or {}).get("stage_name") == stage_name
+
+    async def receive(ws, sent_at: float, stage_name: str):
+        try:
+            # 前のラウンドの通知や再送分は読み飛ばし、このラウンドで作成した通知だけを待つ
+            while not is_current(json.loads(await asyncio.wait_for(ws.recv(), timeout=30)), stage_name):
+                pass
+        except (asyncio.TimeoutError, websockets.exceptions.WebSocketException) as e:
+            result.error(type(e).__name__)
+            return
+        result.latencies.append((time.perf_counter() - sent_at) * 1000)
+
+    start = time.perf_counter()
+    try:
+        for _ in range(args.fanout_rounds):
+            stage_name = f"負荷試験 {uuid.uuid4().hex[:8]}"
+            sent_at = time.perf_counter()
+            receivers = [asyncio.create_task(receive(ws, sent_at, stage_name)) for ws in connections]
+            response = await client.post(
+                f"{settings.API_V1_STR}/notifications/construction/stage-completed",
+                json=_stage_completed(seed, recipients, stage_name),
+                headers=_auth(seed, seed.user_ids[-1])
+            )
+            if not response.is_success:
+                for task in receivers:
+                    task.cancel()
+                result.error(f"HTTP {response.status_code}")
+                continue
+            await asyncio.gather(*receivers)
+    finally:
+        result.elapsed = time.perf_counter() - start
+        for ws in connections:
+            await ws.close()
+    return result
+
+
+# --- 出力 ---
+
+def _git_revision() -> Optional[str]:
+    try:
+        return subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"], capture_output=True, text=True, check=True
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def compare(report: dict, baseline: dict):
+    """前回の結果との比較をログに出す（p95 とスループットの変化率）"""
+    for name, current in report["scenarios"].items():
+        previous = baseline.get("scenarios", {}).get(name)
+        if not previous or not previous.get("latency_ms") or not current.get("latency_ms"):
+            continue
+        p95 = current["latency_ms"]["p95"] / previous["latency_ms"]["p95"] - 1
+        throughput = (
+            current["throughput_rps"] / previous["throughput_rps"] - 1 if previous["throughput_rps"] else 0.0
+        )
+        logger.info(f"{name:18s} p95 {p95:+7.1%}  throughput {throughput:+7.1%}  (vs {baseline.get('revision')})")
+
+
+def failed_scenarios(report: dict) -> Dict[str, Dict[str, int]]:
+    """エラーのあったシナリオとエラーの内訳"""
+    return {name: summary["errors"] for name, summary in report["scenarios"].items() if summary["errors"]}
+
+
+async def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--tenant-code", default="DEMO001")
+    parser.add_argument("--users", type=int, default=100)
+    parser.add_argument("--notifications", type=int, default=50000)
+    parser.add_argument("--scenarios", nargs="+", choices=SCENARIOS, default=SCENARIOS)
+    parser.add_argument("--requests", type=int, default=1000, help="シナリオごとのリクエスト数")
+    parser.add_argument("--concurrency", type=int, default=20)
+    parser.add_argument("--bulk-size", type=int, default=20, help="create-bulk の宛先人数")
+    parser.add_argument("--fanout-clients", type=int, default=50)
+    parser.add_argument("--fanout-rounds", type=int, default=20)
+    parser.add_argument("--base-url", help="起動済みのサーバー（省略時はこのスクリプトで起動）")
+    parser.add_argument("--server-workers", type=int, default=1)
+    parser.add_argument("--output", default="loadtest_notifications.json")
+    parser.add_argument("--baseline", help="比較する前回の結果 JSON")
+    parser.add_argument("--keep", action="store_true", help="投入したデータを削除しない")
+    args = parser.parse_args()
+    if "fanout" in args.scenarios and args.server_workers > 1 and not args.base_url:
+        parser.error("fanout needs --server-workers 1 (WebSocket connections are held per worker process)")
+
+    run_id = uuid.uuid4().hex[:8]
+    seed = seed_data(args.tenant_code, args.users, args.notifications, run_id)
+    if seed.project_id is None and {"create-bulk", "fanout"} & set(args.scenarios):
+        logger.warning("No project in tenant; skipping create-bulk / fanout")
+        args.scenarios = [name for name in args.scenarios if name not in ("create-bulk", "fanout")]
+
+    process = None
+    report = {
+        "revision": _git_revision(),
+        "started_at": datetime.now(timezone.utc).isoformat(),
+        "parameters": {
+            key: getattr(args, key) for key in (
+                "users", "notifications", "requests", "concurrency", "bulk_size",
+                "fanout_clients", "fanout_rounds", "server_workers"
+            )
+        },
+        "scenarios": {},
+    }
+    try:
+        if args.base_url:
+            base_url = args.base_url.rstrip("/")
+        else:
+            process, base_url = await start_server(args.server_workers)
+        limits = httpx.Limits(max_connections=args.concurrency, max_keepalive_connections=args.concurrency)
+        async with httpx.AsyncClient(base_url=base_url, limits=limits, timeout=30) as client:
+            for name in args.scenarios:
+                summary = (await run_scenario(name, client, base_url, seed, args)).summary()
+                report["scenarios"][name] = summary
+                latency = summary["latency_ms"] or {}
+                logger.info(
+                    f"{name:18s} ok={summary['ok']:6d} errors={sum(summary['errors'].values()):5d} "
+                    f"{summary['throughput_rps']:8.1f} req/s p50={latency.get('p50', 0):7.2f}ms "
+                    f"p95={latency.get('p95', 0):7.2f}ms p99={latency.get('p99', 0):7.2f}ms"
+                )
+    finally:
+        if process is not None:
+            process.terminate()
+            process.wait(timeout=10)
+        if not args.keep:
+            cleanup(seed)
+
+    with open(args.output, "w") as f:
+        json.dump(report, f, ensure_ascii=False, indent=2)
+    logger.info(f"Wrote {args.output}")
+
+    if args.baseline:
+        with open(args.baseline) as f:
+            compare(report, json.load(f))
+
+    failed = failed_scenarios(report)
+    if failed:
+        for name, errors in failed.items():
+            logger.error(f"{name}: errors {errors}")
+        return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(asyncio.run(main()))
@@ -0,0 +1,36 @@
+#!/usr/bin/env python
+"""
+通知のパージ
+- 今月から数か月先までの月パーティションを作成
+- 保持期間を過ぎた月のパーティションを削除し、残りの期限切れ行はチャンクごとに削除
+
+使用例:
+    python scripts/purge_notifications.py
+    python scripts/purge_notifications.py --chunk-size 1000
+"""
+
+import argparse
+import logging
+
+from app.db.session import SessionLocal
+from app.services.notification_retention import NotificationRetentionManager
+
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--chunk-size", type=int, default=None, help="1回の DELETE で削除する行数")
+    args = parser.parse_args()
+
+    with SessionLocal() as db:
+        result = NotificationRetentionManager(db, chunk_size=args.chunk_size).run()
+
+    logger.info(f"Created partitions: {result.created_partitions}")
+    logger.info(f"Dropped partitions: {result.dropped_partitions}")
+    logger.info(f"Deleted rows: {result.deleted}")
+
+
+if __name__ == "__main__":
+    main()
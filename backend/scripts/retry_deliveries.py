@@ -0,0 +1,39 @@
+#!/usr/bin/env python
+"""
+通知配信の再送
+- 配信に失敗して期限の来たメール・プッシュを再送し、上限回数に達したものはデッドレターへ移す
+- WebSocket 分は再接続時に API プロセスが再送する。ここでは期限切れの行をデッドレターへ移すだけ
+- 複数並べて動かしても同じ行は取り合わない（FOR UPDATE SKIP LOCKED）
+- Celery beat を使わない環境では --loop で常駐させる
+
+使用例:
+    python scripts/retry_deliveries.py
+    python scripts/retry_deliveries.py --loop --interval 30
+"""
+
+import argparse
+import asyncio
+import logging
+
+from app.core.config import settings
+from app.services.delivery_retry import run_delivery_retries, run_delivery_retry_loop
+
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+
+async def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--loop", action="store_true", help="interval 秒ごとに繰り返し実行")
+    parser.add_argument("--interval", type=float, default=settings.NOTIFICATION_RETRY_INTERVAL_SECONDS)
+    args = parser.parse_args()
+
+    if args.loop:
+        await run_delivery_retry_loop(args.interval)
+    else:
+        result = await run_delivery_retries()
+        logger.info(f"Retried deliveries: {result.by_channel or 'none delivered'}")
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,37 @@
+#!/usr/bin/env python
+"""
+タスク期限スキャン
+- 期限まで 72/24/0 時間のしきい値を越えた未完了タスクを担当者に通知
+- Celery beat を使わない環境では --loop で常駐させる
+
+使用例:
+    python scripts/scan_deadlines.py
+    python scripts/scan_deadlines.py --loop --interval 300
+"""
+
+import argparse
+import asyncio
+import logging
+
+from app.core.config import settings
+from app.services.deadline_scanner import run_deadline_scan, run_deadline_scanner_loop
+
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+
+async def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--loop", action="store_true", help="interval 秒ごとに繰り返し実行")
+    parser.add_argument("--interval", type=float, default=settings.DEADLINE_SCAN_INTERVAL_SECONDS)
+    args = parser.parse_args()
+
+    if args.loop:
+        await run_deadline_scanner_loop(args.interval)
+    else:
+        result = await run_deadline_scan()
+        logger.info(f"Scanned {result.scanned} tasks, sent {result.notified} deadline notifications")
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
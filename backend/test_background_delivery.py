@@ -0,0 +1,88 @@
+#!/usr/bin/env python3
+"""
+Test script for request-side notification delivery
+Checks that a service created with wait_for_delivery=False returns before
+rate-limited deliveries finish, while batch callers still wait for them
+"""
+
+import asyncio
+import os
+import uuid
+from types import SimpleNamespace
+
+os.environ.setdefault("DATABASE_URL", "sqlite+aiosqlite:///:memory:")
+os.environ.setdefault("DATABASE_SYNC_URL", "sqlite:///:memory:")
+os.environ.setdefault("SECRET_KEY", "test-secret-key")
+
+from app.services import notification_service
+from app.services.notification_service import NotificationService
+
+
+class SlowChannelService(NotificationService):
+    """レート制限で待たされる配信の代わりに、release まで終わらない送信"""
+
+    def __init__(self, wait_for_delivery):
+        super().__init__(db=None, wait_for_delivery=wait_for_delivery)
+        self.release = asyncio.Event()
+        self.delivered = []
+
+    def _get_preferences_for(self, notifications):
+        return {}
+
+    async def deliver_channel(self, notification, channel):
+        await self.release.wait()
+        self.delivered.append((notification.id, channel))
+
+
+def _notification():
+    return SimpleNamespace(id=uuid.uuid4(), recipient_id=uuid.uuid4(), tenant_id=uuid.uuid4())
+
+
+async def _batch_caller_waits():
+    service = SlowChannelService(wait_for_delivery=True)
+    notification = _notification()
+    delivery = asyncio.create_task(service._deliver([notification]))
+    await asyncio.sleep(0.01)
+    assert not delivery.done()
+    service.release.set()
+    await delivery
+    assert service.delivered == [(notification.id, "websocket")]
+
+
+async def _request_returns_before_delivery():
+    started, release = [], asyncio.Event()
+
+    async def deliver_in_background(notification_ids):
+        started.append(notification_ids)
+        await release.wait()
+
+    original = notification_service._deliver_in_background
+    notification_service._deliver_in_background = deliver_in_background
+    try:
+        service = SlowChannelService(wait_for_delivery=False)
+        notifications = [_notification(), _notification()]
+        await asyncio.wait_for(service._deliver(notifications), timeout=1)
+        # 配信は別タスクで続き、参照が保持されている
+        await asyncio.sleep(0)
+        assert started == [[n.id for n in notifications]]
+        pending = set(notification_service._background_deliveries)
+        assert len(pending) == 1
+        release.set()
+        await asyncio.gather(*pending)
+        assert not notification_service._background_deliveries
+    finally:
+        notification_service._deliver_in_background = original
+
+
+def test_batch_caller_waits():
+    asyncio.run(_batch_caller_waits())
+
+
+def test_request_returns_before_delivery():
+    asyncio.run(_request_returns_before_delivery())
+
+
+if __name__ == "__main__":
+    test_batch_caller_waits()
+    test_request_returns_before_delivery()
+    print("✅ Background delivery tests passed")
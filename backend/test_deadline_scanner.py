@@ -0,0 +1,70 @@
+#!/usr/bin/env python3
+"""
+Test script for the deadline scanner
+Checks the 72h/24h/0h threshold arithmetic (due date ends at local midnight
+in APP_TIMEZONE) and that each task is reported only at the most urgent crossed threshold
+"""
+
+import os
+from datetime import date, datetime, timezone
+
+os.environ.setdefault("DATABASE_URL", "sqlite+aiosqlite:///:memory:")
+os.environ.setdefault("DATABASE_SYNC_URL", "sqlite:///:memory:")
+os.environ.setdefault("SECRET_KEY", "test-secret-key")
+os.environ.setdefault("APP_TIMEZONE", "Asia/Tokyo")
+
+from app.services.deadline_scanner import (
+    DEADLINE_THRESHOLDS_HOURS,
+    hours_remaining,
+    threshold_cutoff,
+)
+
+# 2026-10-19 10:00 JST
+NOW = datetime(2026, 10, 19, 1, 0, tzinfo=timezone.utc)
+
+
+def crossed_threshold(due_date: date, now: datetime = NOW):
+    """スキャナーと同じ順序（小さいしきい値から）で最初に該当するしきい値"""
+    for threshold in DEADLINE_THRESHOLDS_HOURS:
+        if due_date <= threshold_cutoff(now, threshold):
+            return threshold
+    return None
+
+
+def test_hours_remaining():
+    # 期限日の終わり（現地の翌日 0:00）までの時間
+    assert hours_remaining(date(2026, 10, 19), NOW) == 14
+    assert hours_remaining(date(2026, 10, 20), NOW) == 38
+    assert hours_remaining(date(2026, 10, 18), NOW) < 0
+
+
+def test_thresholds():
+    assert crossed_threshold(date(2026, 10, 1)) == 0
+    assert crossed_threshold(date(2026, 10, 18)) == 0
+    assert crossed_threshold(date(2026, 10, 19)) == 24
+    assert crossed_threshold(date(2026, 10, 20)) == 72
+    assert crossed_threshold(date(2026, 10, 21)) == 72
+    assert crossed_threshold(date(2026, 10, 22)) is None
+
+    # しきい値との整合: 該当したしきい値以内に期限が来る
+    for day in range(10, 25):
+        due = date(2026, 10, day)
+        threshold = crossed_threshold(due)
+        if threshold is not None:
+            assert hours_remaining(due, NOW) <= threshold
+
+
+def test_due_date_is_a_local_day():
+    # 2026-10-19 16:30 UTC は JST では 10/20 の 1:30。10/19 期限のタスクはもう期限切れ
+    late_evening_utc = datetime(2026, 10, 19, 16, 30, tzinfo=timezone.utc)
+    assert hours_remaining(date(2026, 10, 19), late_evening_utc) < 0
+    assert hours_remaining(date(2026, 10, 20), late_evening_utc) == 22
+    assert crossed_threshold(date(2026, 10, 19), late_evening_utc) == 0
+    assert crossed_threshold(date(2026, 10, 20), late_evening_utc) == 24
+
+
+if __name__ == "__main__":
+    test_hours_remaining()
+    test_thresholds()
+    test_due_date_is_a_local_day()
+    print("✅ Deadline scanner tests passed")
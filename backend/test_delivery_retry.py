@@ -0,0 +1,161 @@
+#!/usr/bin/env python3
+"""
+Test script for notification delivery retries
+Checks the jittered exponential backoff, per-channel limits, which
+failures are retried, and how the retry worker applies delivery outcomes
+"""
+
+import asyncio
+import os
+import uuid
+from datetime import datetime, timedelta, timezone
+from types import SimpleNamespace
+
+os.environ.setdefault("DATABASE_URL", "sqlite+aiosqlite:///:memory:")
+os.environ.setdefault("DATABASE_SYNC_URL", "sqlite:///:memory:")
+os.environ.setdefault("SECRET_KEY", "test-secret-key")
+
+from app.services.delivery_retry import (
+    DEFAULT_RETRY_POLICY, RECONNECT_CHANNELS, DeliveryFailed, DeliveryRetryWorker, RetryPolicy, RetryResult,
+    retry_policy
+)
+
+NOW = datetime(2026, 10, 19, 12, 0, tzinfo=timezone.utc)
+
+
+class RecordingWorker(DeliveryRetryWorker):
+    """DB の代わりに送信結果と書き込み内容を記録する"""
+
+    def __init__(self, outcomes, missing=()):
+        super().__init__(db=None, service_db=None, batch_size=100)
+        self.outcomes = outcomes  # notification_id -> None（成功）か例外
+        self.missing = set(missing)
+        self.sent = []
+        self.finished, self.rescheduled, self.dead = [], [], []
+
+    def _load_notifications(self, notification_ids):
+        return {i: SimpleNamespace(id=i) for i in notification_ids if i not in self.missing}
+
+    async def _deliver(self, notification, channel):
+        self.sent.append((notification.id, channel))
+        outcome = self.outcomes.get(notification.id)
+        if outcome is not None:
+            raise outcome
+
+    def _apply(self, finished, rescheduled, dead):
+        self.finished += finished
+        self.rescheduled += rescheduled
+        self.dead += dead
+
+
+def _row(channel, attempts=1, next_attempt_at=NOW):
+    return SimpleNamespace(
+        id=uuid.uuid4(), notification_id=uuid.uuid4(), tenant_id=uuid.uuid4(), recipient_id=uuid.uuid4(),
+        channel=channel, attempts=attempts, next_attempt_at=next_attempt_at, last_error="Recipient offline"
+    )
+
+
+def _process(worker, rows, expire_reconnect=False):
+    result = RetryResult()
+    asyncio.run(worker._process(rows, result, NOW, expire_reconnect=expire_reconnect))
+    return result
+
+
+def test_backoff_doubles_within_jitter():
+    policy = RetryPolicy(base_delay=10, max_delay=1000, max_attempts=5)
+    for attempt, ceiling in [(1, 10), (2, 20), (3, 40), (4, 80)]:
+        for _ in range(200):
+            delay = policy.delay(attempt)
+            assert ceiling / 2 <= delay <= ceiling, (attempt, delay)
+
+
+def test_backoff_is_capped():
+    policy = RetryPolicy(base_delay=10, max_delay=60, max_attempts=20)
+    for _ in range(200):
+        assert 30 <= policy.delay(15) <= 60
+
+
+def test_backoff_is_jittered():
+    policy = RetryPolicy(base_delay=60, max_delay=3600, max_attempts=5)
+    assert len({round(policy.delay(3), 6) for _ in range(50)}) > 1
+
+
+def test_channel_policies():
+    assert retry_policy("email").max_attempts > 1
+    assert retry_policy("push").max_attempts > 1
+    assert retry_policy("sms") is DEFAULT_RETRY_POLICY
+    assert "websocket" in RECONNECT_CHANNELS
+
+
+def test_delivery_failed_retryable_flag():
+    assert DeliveryFailed("timeout").retryable
+    error = DeliveryFailed("Recipient email not found", retryable=False)
+    assert not error.retryable
+    assert str(error) == "Recipient email not found"
+
+
+def test_process_outcomes():
+    delivered = _row("email")
+    failing = _row("email", attempts=2)
+    exhausted = _row("push", attempts=retry_policy("push").max_attempts - 1)
+    permanent = _row("push")
+    unexpected = _row("email")
+    deleted = _row("email")
+    worker = RecordingWorker({
+        failing.notification_id: DeliveryFailed("SMTP timeout"),
+        exhausted.notification_id: DeliveryFailed("503"),
+        permanent.notification_id: DeliveryFailed("No push subscriptions", retryable=False),
+        unexpected.notification_id: RuntimeError("boom"),
+    }, missing=[deleted.notification_id])
+
+    result = _process(worker, [delivered, failing, exhausted, permanent, unexpected, deleted])
+    assert (result.delivered, result.rescheduled, result.dead_lettered, result.dropped) == (1, 2, 2, 1)
+    assert result.by_channel == {"email": 1}
+    assert deleted.notification_id not in {n for n, _ in worker.sent}
+    assert set(worker.finished) == {delivered.id, exhausted.id, permanent.id, deleted.id}
+
+    rescheduled = {row_id: (attempts, at, error) for row_id, attempts, at, error in worker.rescheduled}
+    attempts, next_attempt_at, error = rescheduled[failing.id]
+    assert attempts == 3 and error == "SMTP timeout"
+    ceiling = min(retry_policy("email").max_delay, retry_policy("email").base_delay * 4)
+    assert NOW + timedelta(seconds=ceiling / 2) <= next_attempt_at <= NOW + timedelta(seconds=ceiling)
+    assert rescheduled[unexpected.id][2] == "boom"
+
+    dead = {row["notification_id"]: row for row in worker.dead}
+    assert dead[exhausted.notification_id]["attempts"] == retry_policy("push").max_attempts
+    assert dead[permanent.notification_id]["last_error"] == "No push subscriptions"
+
+
+def test_periodic_run_expires_websocket_rows_without_sending():
+    expired = _row("websocket", attempts=3)
+    email = _row("email")
+    worker = RecordingWorker({})
+
+    result = _process(worker, [expired, email], expire_reconnect=True)
+    assert worker.sent == [(email.notification_id, "email")]
+    assert result.dead_lettered == 1 and result.delivered == 1
+    assert worker.dead[0]["notification_id"] == expired.notification_id
+    assert set(worker.finished) == {expired.id, email.id}
+
+
+def test_reconnect_failure_keeps_expiry():
+    expires_at = NOW + timedelta(hours=5)
+    row = _row("websocket", attempts=20, next_attempt_at=expires_at)
+    worker = RecordingWorker({row.notification_id: DeliveryFailed("Recipient offline")})
+
+    result = _process(worker, [row])
+    # 回数の上限はなく、期限まで次の再接続を待つ
+    assert result.rescheduled == 1 and not worker.dead
+    assert worker.rescheduled == [(row.id, 21, expires_at, "Recipient offline")]
+
+
+if __name__ == "__main__":
+    test_backoff_doubles_within_jitter()
+    test_backoff_is_capped()
+    test_backoff_is_jittered()
+    test_channel_policies()
+    test_delivery_failed_retryable_flag()
+    test_process_outcomes()
+    test_periodic_run_expires_websocket_rows_without_sending()
+    test_reconnect_failure_keeps_expiry()
+    print("✅ Delivery retry tests passed")
@@ -0,0 +1,109 @@
+#!/usr/bin/env python3
+"""
+Test script for the notification delivery scheduler
+Checks weighted priority ordering, round-robin between tenants and
+per-tenant / per-channel token-bucket limits
+"""
+
+import asyncio
+import os
+import time
+
+os.environ.setdefault("DATABASE_URL", "sqlite+aiosqlite:///:memory:")
+os.environ.setdefault("DATABASE_SYNC_URL", "sqlite:///:memory:")
+os.environ.setdefault("SECRET_KEY", "test-secret-key")
+
+from app.services.delivery_scheduler import DeliveryScheduler, TokenBucket
+
+UNLIMITED = {"websocket": 0, "email": 0, "push": 0}
+
+
+async def _deliver_all(scheduler, jobs):
+    """jobs: (名前, 優先度, テナント, チャネル) の列。配信された順の名前を返す"""
+    order = []
+
+    def sender(name):
+        async def send():
+            order.append(name)
+            return name
+        return send
+
+    futures = [scheduler.submit(sender(name), priority, tenant, channel) for name, priority, tenant, channel in jobs]
+    results = await asyncio.gather(*futures)
+    assert results == [name for name, _, _, _ in jobs]
+    return order
+
+
+def test_token_bucket():
+    bucket = TokenBucket(rate=2, capacity=2, now=0)
+    assert bucket.wait_time(0) == 0
+    bucket.take()
+    bucket.take()
+    assert bucket.wait_time(0) == 0.5
+    assert bucket.wait_time(0.5) == 0
+
+
+def test_priority_weights():
+    scheduler = DeliveryScheduler(channel_rates=UNLIMITED, tenant_rate=0, max_concurrency=1)
+    jobs = [(f"low{i}", "low", "t", "websocket") for i in range(10)]
+    jobs += [(f"urgent{i}", "urgent", "t", "websocket") for i in range(10)]
+    order = asyncio.run(_deliver_all(scheduler, jobs))
+
+    # urgent が先に出るが、low も止まらない（8:1）
+    first_nine = order[:9]
+    assert sum(name.startswith("urgent") for name in first_nine) == 8
+    assert any(name.startswith("low") for name in first_nine)
+    assert [name for name in order if name.startswith("low")] == [f"low{i}" for i in range(10)]
+
+
+def test_tenant_round_robin():
+    scheduler = DeliveryScheduler(channel_rates=UNLIMITED, tenant_rate=0, max_concurrency=1)
+    jobs = [(f"noisy{i}", "medium", "noisy", "websocket") for i in range(20)]
+    jobs += [("quiet", "medium", "quiet", "websocket")]
+    order = asyncio.run(_deliver_all(scheduler, jobs))
+    assert order.index("quiet") <= 1
+
+
+def test_rate_limits():
+    # テナントは毎秒 20 件・バースト 2 件。上限に達したテナントを飛ばして他のテナントを先に配信する
+    scheduler = DeliveryScheduler(channel_rates=UNLIMITED, tenant_rate=20, burst_seconds=0.1)
+    jobs = [(f"noisy{i}", "urgent", "noisy", "email") for i in range(6)]
+    jobs += [(f"other{i}", "low", "other", "email") for i in range(2)]
+    started = time.monotonic()
+    order = asyncio.run(_deliver_all(scheduler, jobs))
+    elapsed = time.monotonic() - started
+    assert order.index("other1") < order.index("noisy2")
+    # noisy の残り 4 件は 20 件/秒で補充を待つ
+    assert elapsed >= 0.15
+
+    # チャネルの上限は全テナント共通
+    scheduler = DeliveryScheduler(channel_rates={"email": 20}, tenant_rate=0, burst_seconds=0.1)
+    jobs = [(f"mail{i}", "high", f"t{i}", "email") for i in range(4)]
+    jobs += [("ws", "low", "t0", "websocket")]
+    order = asyncio.run(_deliver_all(scheduler, jobs))
+    assert order.index("ws") < order.index("mail2")
+
+
+def test_failure_propagates():
+    scheduler = DeliveryScheduler(channel_rates=UNLIMITED, tenant_rate=0)
+
+    async def run():
+        async def fail():
+            raise RuntimeError("smtp down")
+
+        future = scheduler.submit(fail, "urgent", "t", "email")
+        try:
+            await future
+        except RuntimeError as e:
+            return str(e)
+
+    assert asyncio.run(run()) == "smtp down"
+
+
+if __name__ == "__main__":
+    test_token_bucket()
+    test_priority_weights()
+    test_tenant_round_robin()
+    test_rate_limits()
+    test_failure_propagates()
+    print("✅ Delivery scheduler tests passed")
@@ -0,0 +1,68 @@
+#!/usr/bin/env python3
+"""
+Test script for WebSocket mark_read coalescing
+Checks that mark_read messages within the window are written in one flush
+per user, with ids merged and the latest up_to watermark kept
+"""
+
+import asyncio
+import os
+from datetime import datetime
+from uuid import uuid4
+
+os.environ.setdefault("DATABASE_URL", "sqlite+aiosqlite:///:memory:")
+os.environ.setdefault("DATABASE_SYNC_URL", "sqlite:///:memory:")
+os.environ.setdefault("SECRET_KEY", "test-secret-key")
+
+from app.services.websocket_manager import MarkReadCoalescer
+
+
+async def _run_coalescing():
+    flushed = []
+
+    async def flush(user_id, tenant_id, notification_ids, up_to):
+        flushed.append((user_id, tenant_id, set(notification_ids), up_to))
+
+    coalescer = MarkReadCoalescer(flush, window_seconds=0.05)
+    a, b, c = uuid4(), uuid4(), uuid4()
+    coalescer.submit("user-1", "tenant", [a])
+    coalescer.submit("user-1", "tenant", [b, a], datetime(2026, 10, 1))
+    coalescer.submit("user-1", "tenant", [], datetime(2026, 10, 2))
+    coalescer.submit("user-2", "tenant", [c])
+    await coalescer.drain()
+
+    assert len(flushed) == 2
+    by_user = {user_id: (ids, up_to) for user_id, _, ids, up_to in flushed}
+    assert by_user["user-1"] == ({a, b}, datetime(2026, 10, 2))
+    assert by_user["user-2"] == ({c}, None)
+
+    # ウィンドウ後の要求は次の書き込みになる
+    coalescer.submit("user-1", "tenant", [c])
+    await coalescer.drain()
+    assert len(flushed) == 3 and flushed[-1][2] == {c}
+
+
+async def _run_flush_error():
+    async def flush(user_id, tenant_id, notification_ids, up_to):
+        raise RuntimeError("db down")
+
+    coalescer = MarkReadCoalescer(flush, window_seconds=0)
+    coalescer.submit("user-1", "tenant", [uuid4()])
+    # 失敗してもタスクは終わり、次の要求を受け付ける
+    await coalescer.drain()
+    coalescer.submit("user-1", "tenant", [uuid4()])
+    await coalescer.drain()
+
+
+def test_coalescing():
+    asyncio.run(_run_coalescing())
+
+
+def test_flush_error():
+    asyncio.run(_run_flush_error())
+
+
+if __name__ == "__main__":
+    test_coalescing()
+    test_flush_error()
+    print("✅ Mark-read coalescer tests passed")
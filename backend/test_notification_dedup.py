@@ -0,0 +1,153 @@
+#!/usr/bin/env python3
+"""
+Test script for notification dedup keys and the in-process key cache
+Checks which notifications share a key, and the cache's TTL, remaining
+window on put and eviction when full
+"""
+
+import os
+import uuid
+
+os.environ.setdefault("DATABASE_URL", "sqlite+aiosqlite:///:memory:")
+os.environ.setdefault("DATABASE_SYNC_URL", "sqlite:///:memory:")
+os.environ.setdefault("SECRET_KEY", "test-secret-key")
+
+from app.models.notification import NotificationTypeEnum
+from app.schemas.notification import NotificationCreate
+from app.services import notification_dedup
+from app.services.notification_dedup import DedupCache, dedup_key
+
+TENANT = uuid.uuid4()
+RECIPIENT = uuid.uuid4()
+PROJECT = uuid.uuid4()
+
+
+def _notification(type_, **fields):
+    data = {"type": type_, "title": "t", "message": "m", "recipient_id": RECIPIENT, **fields}
+    return NotificationCreate(**data)
+
+
+def _bottleneck(role="設計", task_name="基礎工事", **metadata):
+    return _notification(
+        NotificationTypeEnum.BOTTLENECK_ALERT,
+        related_project_id=PROJECT,
+        metadata={"role": role, "task_name": task_name, **metadata}
+    )
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 1000.0
+
+    def monotonic(self):
+        return self.now
+
+
+def _with_clock(test):
+    clock = FakeClock()
+    original = notification_dedup.time
+    notification_dedup.time = clock
+    try:
+        test(clock)
+    finally:
+        notification_dedup.time = original
+
+
+def test_dedup_key_types():
+    assert dedup_key(_notification(NotificationTypeEnum.TASK_ASSIGNED, related_task_id=uuid.uuid4()), TENANT) is None
+    task_id = uuid.uuid4()
+    key = dedup_key(_notification(NotificationTypeEnum.TASK_DEADLINE, related_task_id=task_id), TENANT)
+    assert len(key) == 40
+    # 同じ宛先・種別・対象なら同じキー。タイトルや本文は関係しない
+    assert key == dedup_key(
+        _notification(NotificationTypeEnum.TASK_DEADLINE, related_task_id=task_id, title="別の文面"), TENANT
+    )
+    assert key != dedup_key(_notification(NotificationTypeEnum.TASK_DEADLINE, related_task_id=uuid.uuid4()), TENANT)
+    assert key != dedup_key(_notification(NotificationTypeEnum.TASK_DEADLINE, related_task_id=task_id), uuid.uuid4())
+    assert key != dedup_key(
+        _notification(NotificationTypeEnum.TASK_DEADLINE, related_task_id=task_id, recipient_id=uuid.uuid4()), TENANT
+    )
+    assert key != dedup_key(_notification(NotificationTypeEnum.STAGE_DELAYED, related_task_id=task_id), TENANT)
+
+
+def test_dedup_key_subject():
+    stage_id = uuid.uuid4()
+    by_stage = dedup_key(_notification(NotificationTypeEnum.STAGE_DELAYED, related_stage_id=stage_id), TENANT)
+    # タスクIDがあればステージIDより優先する
+    assert by_stage != dedup_key(
+        _notification(NotificationTypeEnum.STAGE_DELAYED, related_stage_id=stage_id, related_task_id=uuid.uuid4()),
+        TENANT
+    )
+    # 関連IDがなければ プロジェクト + metadata の項目（ボトルネックは role と task_name）
+    key = dedup_key(_bottleneck(), TENANT)
+    assert key == dedup_key(_bottleneck(impact_count=5, severity="high"), TENANT)
+    assert key != dedup_key(_bottleneck(role="営業"), TENANT)
+    assert key != dedup_key(_bottleneck(task_name="上棟"), TENANT)
+    other_project = _bottleneck()
+    other_project.related_project_id = uuid.uuid4()
+    assert key != dedup_key(other_project, TENANT)
+
+
+def test_cache_ttl():
+    def run(clock):
+        cache = DedupCache(ttl_seconds=60)
+        cache.put("a", 1)
+        clock.now += 59
+        assert cache.get("a") == 1
+        clock.now += 1
+        assert cache.get("a") is None
+        assert "a" not in cache._entries
+        assert cache.get("missing") is None
+    _with_clock(run)
+
+
+def test_cache_put_keeps_remaining_window():
+    def run(clock):
+        cache = DedupCache(ttl_seconds=60)
+        # 45秒前に作成された通知はウィンドウの残り15秒だけ保持する
+        cache.put("a", 1, created_at_age=45)
+        clock.now += 14
+        assert cache.get("a") == 1
+        clock.now += 1
+        assert cache.get("a") is None
+        # ウィンドウを過ぎた通知は入れない
+        cache.put("b", 2, created_at_age=60)
+        assert cache.get("b") is None and not cache._entries
+    _with_clock(run)
+
+
+def test_cache_eviction():
+    def run(clock):
+        cache = DedupCache(ttl_seconds=60, max_entries=10)
+        for i in range(5):
+            cache.put(f"old{i}", i)
+        clock.now += 30
+        for i in range(5):
+            cache.put(f"new{i}", i)
+        clock.now += 31
+        # 満杯なら期限切れを先に捨てる
+        cache.put("x", "x")
+        assert sorted(cache._entries) == sorted([f"new{i}" for i in range(5)] + ["x"])
+
+        for i in range(4):
+            cache.put(f"more{i}", i)
+        assert len(cache._entries) == 10
+        # 期限切れがなければ挿入順で古いもの（1割）から捨てる
+        cache.put("y", "y")
+        assert len(cache._entries) == 10
+        assert "new0" not in cache._entries and cache.get("y") == "y"
+
+        cache.discard("y")
+        assert cache.get("y") is None
+        cache.clear()
+        assert not cache._entries
+    _with_clock(run)
+
+
+if __name__ == "__main__":
+    test_dedup_key_types()
+    test_dedup_key_subject()
+    test_cache_ttl()
+    test_cache_put_keeps_remaining_window()
+    test_cache_eviction()
+    print("✅ Notification dedup tests passed")
@@ -0,0 +1,180 @@
+#!/usr/bin/env python3
+"""
+Test script for notification retention
+Checks the month arithmetic, which partitions a cutoff drops, and the
+per-tenant delete conditions, with the SQL captured instead of executed
+"""
+
+import os
+import uuid
+from datetime import date, datetime, timedelta, timezone
+
+os.environ.setdefault("DATABASE_URL", "sqlite+aiosqlite:///:memory:")
+os.environ.setdefault("DATABASE_SYNC_URL", "sqlite:///:memory:")
+os.environ.setdefault("SECRET_KEY", "test-secret-key")
+
+from sqlalchemy.dialects import postgresql
+
+from app.core.config import settings
+from app.services.notification_retention import (
+    NotificationRetentionManager,
+    PurgeResult,
+    RetentionPolicy,
+    add_months,
+    month_start,
+    partition_name,
+)
+
+NOW = datetime(2026, 10, 19, 3, 30, tzinfo=timezone.utc)
+
+
+class RecordingSession:
+    def __init__(self):
+        self.statements = []
+
+    def execute(self, statement, params=None):
+        self.statements.append(str(statement))
+
+    def commit(self):
+        pass
+
+    def rollback(self):
+        pass
+
+
+class RecordingManager(NotificationRetentionManager):
+    """パーティション一覧・保持期間設定を固定し、削除条件を記録する"""
+
+    def __init__(self, partitions=(), policies=None, default_months=()):
+        super().__init__(RecordingSession(), chunk_size=100)
+        self.partitions = list(partitions)
+        self.policies = policies or {}
+        self.default_months = set(default_months)
+        self.deletes = []
+
+    def list_partitions(self, table_name):
+        return [(partition_name(table_name, month), month) for month in self.partitions]
+
+    def default_partition_has_rows(self, table_name, start, end):
+        return start in self.default_months
+
+    def _policies(self):
+        return dict(self.policies)
+
+    def _delete_in_chunks(self, table, condition, key_columns):
+        compiled = condition.compile(dialect=postgresql.dialect())
+        self.deletes.append((table.name, str(compiled), compiled.params))
+        return 0
+
+
+def test_add_months():
+    assert add_months(date(2026, 10, 19), 0) == date(2026, 10, 1)
+    assert add_months(date(2026, 11, 30), 1) == date(2026, 12, 1)
+    assert add_months(date(2026, 12, 1), 1) == date(2027, 1, 1)
+    assert add_months(date(2026, 10, 1), 15) == date(2028, 1, 1)
+    assert add_months(date(2026, 1, 31), -1) == date(2025, 12, 1)
+    assert add_months(date(2026, 3, 1), -15) == date(2024, 12, 1)
+    assert month_start(date(2026, 2, 28)) == date(2026, 2, 1)
+    assert partition_name("notifications", date(2026, 3, 1)) == "notifications_p2026_03"
+
+
+def test_drop_partitions_before_cutoff_boundaries():
+    months = [date(2026, 3, 1), date(2026, 4, 1), date(2026, 5, 1)]
+
+    # 月末（翌月初 0:00 UTC）がちょうど cutoff の月は削除する
+    manager = RecordingManager(months)
+    dropped = manager.drop_partitions_before("notifications", datetime(2026, 5, 1, tzinfo=timezone.utc))
+    assert dropped == ["notifications_p2026_03", "notifications_p2026_04"]
+    assert manager.db.statements == [
+        'ALTER TABLE "notifications" DETACH PARTITION "notifications_p2026_03"',
+        'DROP TABLE "notifications_p2026_03"',
+        'ALTER TABLE "notifications" DETACH PARTITION "notifications_p2026_04"',
+        'DROP TABLE "notifications_p2026_04"',
+    ]
+
+    # 1秒でも足りなければその月は残す
+    manager = RecordingManager(months)
+    dropped = manager.drop_partitions_before("notifications", datetime(2026, 4, 30, 23, 59, 59, tzinfo=timezone.utc))
+    assert dropped == ["notifications_p2026_03"]
+
+    # タイムゾーン付きの cutoff も UTC で比較する（JST 5/1 8:59 = UTC 4/30 23:59）
+    jst = timezone(timedelta(hours=9))
+    manager = RecordingManager(months)
+    assert manager.drop_partitions_before("notifications", datetime(2026, 5, 1, 8, 59, tzinfo=jst)) == [
+        "notifications_p2026_03"
+    ]
+
+    assert RecordingManager(months).drop_partitions_before("notifications", datetime(2026, 3, 31, tzinfo=timezone.utc)) == []
+
+
+def test_ensure_partitions_moves_rows_out_of_default():
+    # 11月の行が default に入っている。10月は既存、12月は default に行がない
+    manager = RecordingManager([date(2026, 10, 1)], default_months=[date(2026, 11, 1)])
+    created = manager.ensure_partitions("notifications", date(2026, 10, 19), 2)
+    assert created == ["notifications_p2026_11", "notifications_p2026_12"]
+    assert manager.db.statements == [
+        'ALTER TABLE "notifications" DETACH PARTITION "notifications_default"',
+        'CREATE TABLE "notifications_p2026_11" PARTITION OF "notifications" '
+        "FOR VALUES FROM ('2026-11-01') TO ('2026-12-01')",
+        'INSERT INTO "notifications_p2026_11" SELECT * FROM "notifications_default" '
+        "WHERE created_at >= :start AND created_at < :end",
+        'DELETE FROM "notifications_default" WHERE created_at >= :start AND created_at < :end',
+        'ALTER TABLE "notifications" ATTACH PARTITION "notifications_default" DEFAULT',
+        'CREATE TABLE IF NOT EXISTS "notifications_p2026_12" PARTITION OF "notifications" '
+        "FOR VALUES FROM ('2026-12-01') TO ('2027-01-01')",
+    ]
+
+
+def test_per_tenant_conditions():
+    long_tenant, read_tenant = uuid.uuid4(), uuid.uuid4()
+    manager = RecordingManager(policies={
+        long_tenant: RetentionPolicy(retention_days=365),
+        read_tenant: RetentionPolicy(retention_days=90, read_retention_days=30),
+    })
+    manager.purge_notifications(NOW, PurgeResult())
+    expired, long_retention, read_retention, default = manager.deletes
+
+    assert "notifications.expires_at IS NOT NULL AND notifications.expires_at <" in expired[1]
+    assert expired[2]["expires_at_1"] == NOW
+
+    # 保持期間を設定したテナントはそのテナントの行だけを、その期間で削除
+    assert "notifications.tenant_id =" in long_retention[1]
+    assert long_tenant in long_retention[2].values()
+    assert NOW - timedelta(days=365) in long_retention[2].values()
+    assert "is_read" not in long_retention[1]
+
+    # 既読だけ短い期間
+    assert "notifications.is_read = true AND notifications.created_at <" in read_retention[1]
+    assert {NOW - timedelta(days=90), NOW - timedelta(days=30)} <= set(read_retention[2].values())
+
+    # 未設定のテナントは既定値。設定済みテナントは除外する
+    assert "notifications.tenant_id NOT IN" in default[1]
+    assert NOW - timedelta(days=settings.NOTIFICATION_RETENTION_DAYS) in default[2].values()
+    assert {long_tenant, read_tenant} <= {
+        value for values in default[2].values() if isinstance(values, list) for value in values
+    }
+
+
+def test_partition_cutoff_uses_longest_retention():
+    manager = RecordingManager(policies={uuid.uuid4(): RetentionPolicy(retention_days=400)})
+    cutoffs = {}
+
+    def drop_partitions_before(table_name, cutoff):
+        cutoffs[table_name] = cutoff
+        return []
+
+    manager.ensure_partitions = lambda table_name, today, months_ahead: []
+    manager.drop_partitions_before = drop_partitions_before
+    manager.run(NOW)
+    # どのテナントの保持期間より古い月だけを丸ごと削除する
+    assert cutoffs["notifications"] == NOW - timedelta(days=max(400, settings.NOTIFICATION_RETENTION_DAYS))
+    assert cutoffs["notification_delivery_logs"] == NOW - timedelta(days=settings.NOTIFICATION_DELIVERY_LOG_RETENTION_DAYS)
+
+
+if __name__ == "__main__":
+    test_add_months()
+    test_drop_partitions_before_cutoff_boundaries()
+    test_ensure_partitions_moves_rows_out_of_default()
+    test_per_tenant_conditions()
+    test_partition_cutoff_uses_longest_retention()
+    print("✅ Notification retention tests passed")
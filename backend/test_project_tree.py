@@ -0,0 +1,105 @@
+#!/usr/bin/env python3
+"""
+Test script for the project tree query
+Checks that loading a project tree issues a constant number of queries
+regardless of how many tasks the project has (no per-stage lazy loading)
+"""
+
+import asyncio
+import json
+import os
+import uuid
+
+os.environ.setdefault("DATABASE_URL", "sqlite+aiosqlite:///:memory:")
+os.environ.setdefault("DATABASE_SYNC_URL", "sqlite:///:memory:")
+os.environ.setdefault("SECRET_KEY", "test-secret-key")
+
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker, create_async_engine
+
+from app.db.base import Base
+from app.db.initial_data import PHASES, STAGES
+from app.db.instrumentation import install_query_instrumentation, start_query_stats
+from app.models import Phase, Stage, Task, Tenant, User
+from app.models.project import Project
+from app.services.project_service import ProjectService
+
+
+async def build_database(task_count: int):
+    """SQLite上にマスターデータと task_count 件のタスクを持つプロジェクトを作成"""
+    engine = create_async_engine("sqlite+aiosqlite:///:memory:")
+    install_query_instrumentation(engine.sync_engine)
+    async with engine.begin() as conn:
+        # サービスが Base.metadata に登録する PostgreSQL 専用の表は作らない
+        tables = [model.__table__ for model in (Phase, Stage, Tenant, User, Project, Task)]
+        await conn.run_sync(Base.metadata.create_all, tables=tables)
+
+    session_factory = async_sessionmaker(engine, class_=AsyncSession, expire_on_commit=False)
+    async with session_factory() as session:
+        session.add_all(Phase(**phase) for phase in PHASES)
+        session.add_all(Stage(**stage) for stage in STAGES)
+
+        tenant = Tenant(name="テスト建設", code="TEST001", contact_email="test@example.com")
+        session.add(tenant)
+        await session.flush()
+
+        user = User(
+            tenant_id=tenant.id,
+            email="tester@example.com",
+            full_name="テスト太郎",
+            hashed_password="x",
+            role_code="SALES"
+        )
+        session.add(user)
+        await session.flush()
+
+        project = Project(
+            tenant_id=tenant.id,
+            created_by_id=user.id,
+            name="テスト邸",
+            code=f"TEST-{uuid.uuid4().hex[:6]}",
+            customer_name="山田"
+        )
+        session.add(project)
+        await session.flush()
+
+        for i in range(task_count):
+            session.add(Task(
+                tenant_id=tenant.id,
+                project_id=project.id,
+                created_by_id=user.id,
+                stage_code=STAGES[i % len(STAGES)]["code"],
+                title=f"タスク{i}"
+            ))
+        await session.commit()
+
+    return session_factory, tenant.id, project.id
+
+
+async def count_tree_queries(task_count: int):
+    session_factory, tenant_id, project_id = await build_database(task_count)
+
+    async with session_factory() as session:
+        stats = start_query_stats()
+        tree = await ProjectService(session).get_project_tree(tenant_id, project_id)
+        body = b"".join(tree.iter_json())
+
+    data = json.loads(body)
+    loaded_tasks = sum(len(stage["tasks"]) for phase in data["phases"] for stage in phase["stages"])
+    assert loaded_tasks == task_count
+    assert sum(len(phase["stages"]) for phase in data["phases"]) == len(STAGES)
+
+    return stats.query_count
+
+
+def test_project_tree_query_count_is_constant():
+    small = asyncio.run(count_tree_queries(5))
+    large = asyncio.run(count_tree_queries(400))
+
+    print(f"Queries for 5 tasks: {small}, for 400 tasks: {large}")
+    assert small == large
+    assert large <= 3
+
+
+if __name__ == "__main__":
+    test_project_tree_query_count_is_constant()
+    print("✅ Project tree query count is constant")
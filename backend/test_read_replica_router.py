@@ -0,0 +1,76 @@
+#!/usr/bin/env python3
+"""
+Test script for the read replica router's sync sessions
+Checks that sync read sessions follow the same rules as async ones:
+replica when healthy, primary after the user's own write, and primary
+when the replica's health check fails
+"""
+
+import os
+import tempfile
+
+os.environ.setdefault("DATABASE_URL", "sqlite+aiosqlite:///:memory:")
+os.environ.setdefault("DATABASE_SYNC_URL", "sqlite:///:memory:")
+os.environ.setdefault("SECRET_KEY", "test-secret-key")
+
+from sqlalchemy import create_engine
+from sqlalchemy.ext.asyncio import async_sessionmaker, create_async_engine
+from sqlalchemy.orm import sessionmaker
+
+from app.db.session import ReadReplicaRouter, sync_url
+
+TMP = tempfile.mkdtemp()
+PRIMARY_URL = f"sqlite:///{TMP}/primary.db"
+REPLICA_URL = f"sqlite+aiosqlite:///{TMP}/replica.db"
+BROKEN_REPLICA_URL = f"sqlite+aiosqlite:///{TMP}/missing/replica.db"
+
+
+def make_router(*replica_urls):
+    return ReadReplicaRouter(
+        async_sessionmaker(create_async_engine("sqlite+aiosqlite:///:memory:")),
+        list(replica_urls),
+        health_check_interval=30,
+        read_your_writes_window=5,
+        primary_sync_sessionmaker=sessionmaker(bind=create_engine(PRIMARY_URL)),
+    )
+
+
+def bound_url(router, key=None):
+    with router.sync_session(key) as session:
+        return str(session.get_bind().url)
+
+
+def test_sync_url():
+    assert sync_url("postgresql+asyncpg://u:p@replica/db") == "postgresql://u:p@replica/db"
+    assert sync_url(REPLICA_URL) == f"sqlite:///{TMP}/replica.db"
+
+
+def test_without_replicas_uses_primary():
+    assert bound_url(make_router()) == PRIMARY_URL
+
+
+def test_healthy_replica_is_used():
+    router = make_router(REPLICA_URL)
+    assert bound_url(router, "user-1") == sync_url(REPLICA_URL)
+
+
+def test_recent_write_reads_from_primary():
+    router = make_router(REPLICA_URL)
+    router.record_write("user-1")
+    assert bound_url(router, "user-1") == PRIMARY_URL
+    assert bound_url(router, "user-2") == sync_url(REPLICA_URL)
+
+
+def test_unhealthy_replica_falls_back_to_primary():
+    router = make_router(BROKEN_REPLICA_URL)
+    assert bound_url(router) == PRIMARY_URL
+    assert router.replicas[0].healthy is False
+
+
+if __name__ == "__main__":
+    test_sync_url()
+    test_without_replicas_uses_primary()
+    test_healthy_replica_is_used()
+    test_recent_write_reads_from_primary()
+    test_unhealthy_replica_falls_back_to_primary()
+    print("✅ Read replica router tests passed")
@@ -0,0 +1,189 @@
+#!/usr/bin/env python3
+"""
+Test script for the Web Push sender
+Sends through a local ASGI stand-in push service that checks the VAPID
+JWT and decrypts the aes128gcm payload with the browser-side keys
+"""
+
+import asyncio
+import json
+import os
+import struct
+from uuid import uuid4
+
+os.environ.setdefault("DATABASE_URL", "sqlite+aiosqlite:///:memory:")
+os.environ.setdefault("DATABASE_SYNC_URL", "sqlite:///:memory:")
+os.environ.setdefault("SECRET_KEY", "test-secret-key")
+
+import httpx
+from cryptography.hazmat.primitives import hashes, serialization
+from cryptography.hazmat.primitives.asymmetric import ec
+from cryptography.hazmat.primitives.asymmetric.utils import encode_dss_signature
+from cryptography.hazmat.primitives.ciphers.aead import AESGCM
+from cryptography.hazmat.primitives.kdf.hkdf import HKDF
+from fastapi import FastAPI, Request, Response
+
+from app.services.web_push import (
+    PushSubscriptionInfo,
+    VapidSigner,
+    WebPushSender,
+    b64url_decode,
+    b64url_encode,
+    encrypt_payload,
+    generate_vapid_keys,
+    load_vapid_private_key,
+    push_endpoint_error,
+)
+
+PUSH_ORIGIN = "https://push.example.test"
+
+
+class Browser:
+    """購読側（ブラウザ）の鍵"""
+
+    def __init__(self):
+        self.key = ec.generate_private_key(ec.SECP256R1())
+        self.auth = os.urandom(16)
+        self.public_bytes = self.key.public_key().public_bytes(
+            serialization.Encoding.X962, serialization.PublicFormat.UncompressedPoint
+        )
+
+    def subscription(self, path: str) -> PushSubscriptionInfo:
+        return PushSubscriptionInfo(
+            uuid4(), f"{PUSH_ORIGIN}{path}", b64url_encode(self.public_bytes), b64url_encode(self.auth)
+        )
+
+    def decrypt(self, body: bytes) -> bytes:
+        salt = body[:16]
+        record_size, key_length = struct.unpack("!IB", body[16:21])
+        server_public_bytes = body[21:21 + key_length]
+        ciphertext = body[21 + key_length:]
+        assert record_size == 4096
+
+        server_public = ec.EllipticCurvePublicKey.from_encoded_point(ec.SECP256R1(), server_public_bytes)
+        shared_secret = self.key.exchange(ec.ECDH(), server_public)
+        ikm = HKDF(
+            hashes.SHA256(), 32, salt=self.auth,
+            info=b"WebPush: info\x00" + self.public_bytes + server_public_bytes
+        ).derive(shared_secret)
+        cek = HKDF(hashes.SHA256(), 16, salt=salt, info=b"Content-Encoding: aes128gcm\x00").derive(ikm)
+        nonce = HKDF(hashes.SHA256(), 12, salt=salt, info=b"Content-Encoding: nonce\x00").derive(ikm)
+        plaintext = AESGCM(cek).decrypt(nonce, ciphertext, None)
+        assert plaintext.endswith(b"\x02")
+        return plaintext[:-1]
+
+
+def verify_vapid(authorization: str) -> dict:
+    fields = dict(part.strip().split("=", 1) for part in authorization[len("vapid "):].split(","))
+    header, claims, signature = fields["t"].split(".")
+    public_key = ec.EllipticCurvePublicKey.from_encoded_point(ec.SECP256R1(), b64url_decode(fields["k"]))
+    raw = b64url_decode(signature)
+    public_key.verify(
+        encode_dss_signature(int.from_bytes(raw[:32], "big"), int.from_bytes(raw[32:], "big")),
+        f"{header}.{claims}".encode(),
+        ec.ECDSA(hashes.SHA256())
+    )
+    return json.loads(b64url_decode(claims))
+
+
+def push_service(browser: Browser, received: list) -> FastAPI:
+    """ローカルの代替プッシュサービス（/gone は失効、/error はサーバーエラー）"""
+    app = FastAPI()
+
+    @app.post("/push/{name}")
+    async def push(name: str, request: Request):
+        claims = verify_vapid(request.headers["authorization"])
+        assert claims["aud"] == PUSH_ORIGIN
+        assert request.headers["content-encoding"] == "aes128gcm"
+        assert request.headers["ttl"] == "60"
+        if name == "gone":
+            return Response(status_code=410)
+        if name == "error":
+            return Response(status_code=500)
+        received.append((name, request.headers["urgency"], json.loads(browser.decrypt(await request.body()))))
+        return Response(status_code=201)
+
+    return app
+
+
+def test_rfc8291_vector():
+    """RFC 8291 Appendix A の例と同じ暗号文になる"""
+    body = encrypt_payload(
+        b"When I grow up, I want to be a watermelon",
+        "BCVxsr7N_eNgVRqvHtD0zTZsEc6-VV-JvLexhqUzORcxaOzi6-AYWXvTBHm4bjyPjs7Vd8pZGH6SRpkNtoIAiw4",
+        "BTBZMqHH6r4Tts7J_aSIgg",
+        salt=b64url_decode("DGv6ra1nlYgDCS1FRnbzlw"),
+        server_key=load_vapid_private_key("yfWPiYE-n46HLnH0KqZOF1fJJU3MYrct3AELtAQ-oRw"),
+    )
+    assert b64url_encode(body) == (
+        "DGv6ra1nlYgDCS1FRnbzlwAAEABBBP4z9KsN6nGRTbVYI_c7VJSPQTBtkgcy27mlmlMoZIIgDll6e3vCYLocInmYWAmS6TlzAC8w"
+        "EqKK6PBru3jl7A_yl95bQpu6cVPTpK4Mqgkf1CXztLVBSt2Ks3oZwbuwXPXLWyouBWLVWGNWQexSgSxsj_Qulcy4a-fN"
+    )
+
+
+def test_vapid_keys():
+    private_key, public_key = generate_vapid_keys()
+    signer = VapidSigner(load_vapid_private_key(private_key), "mailto:ops@example.com")
+    assert signer.public_key == public_key
+    claims = verify_vapid(signer.authorization(f"{PUSH_ORIGIN}/push/a"))
+    assert claims["sub"] == "mailto:ops@example.com"
+    # 同じオリジンへのトークンは使い回す
+    assert signer.authorization(f"{PUSH_ORIGIN}/push/b") == signer.authorization(f"{PUSH_ORIGIN}/push/c")
+
+
+async def _send_batch():
+    browser = Browser()
+    received = []
+    client = httpx.AsyncClient(transport=httpx.ASGITransport(app=push_service(browser, received)))
+    signer = VapidSigner(load_vapid_private_key(generate_vapid_keys()[0]), "mailto:ops@example.com")
+    sender = WebPushSender(signer, client=client, concurrency=4, ttl_seconds=60, allowed_hosts=["push.example.test"])
+
+    devices = [browser.subscription(f"/push/device{i}") for i in range(10)]
+    gone = browser.subscription("/push/gone")
+    error = browser.subscription("/push/error")
+    internal = browser.subscription("/push/internal")
+    internal.endpoint = "https://169.254.169.254/latest/meta-data"
+    payload = {"title": "期限が近づいています", "message": "「基礎工事」の期限まで24時間"}
+    try:
+        result = await sender.send(devices + [gone, error, internal], payload, urgency="high")
+    finally:
+        await sender.aclose()
+
+    assert sorted(result.sent) == sorted(d.id for d in devices)
+    assert result.expired == [gone.id]
+    assert result.failed == {error.id: "HTTP 500", internal.id: "endpoint host is not public"}
+    assert len(received) == 10
+    assert all(urgency == "high" and body == payload for _, urgency, body in received)
+
+
+def test_send_batch():
+    asyncio.run(_send_batch())
+
+
+def test_push_endpoint_error():
+    allowed = ["fcm.googleapis.com", "push.apple.com"]
+    assert push_endpoint_error("https://fcm.googleapis.com/fcm/send/abc", allowed) is None
+    assert push_endpoint_error("https://web.push.apple.com/QO2", allowed) is None
+    assert push_endpoint_error("http://fcm.googleapis.com/fcm/send/abc", allowed) == "endpoint must be an https URL"
+    assert push_endpoint_error("https://evilfcm.googleapis.com.attacker.test/x", allowed) is not None
+    assert push_endpoint_error("https://attacker.test/x", allowed) == "endpoint host is not an allowed push service"
+    # 許可リストが空でも内部アドレスは拒否する
+    for endpoint in (
+        "https://localhost/x",
+        "https://api.localhost/x",
+        "https://127.0.0.1/x",
+        "https://10.0.0.5/x",
+        "https://169.254.169.254/latest/meta-data",
+        "https://[::1]/x",
+        "https://[fd00::1]/x",
+    ):
+        assert push_endpoint_error(endpoint, []) == "endpoint host is not public", endpoint
+    assert push_endpoint_error("https://push.example.net/x", []) is None
+
+
+if __name__ == "__main__":
+    test_rfc8291_vector()
+    test_vapid_keys()
+    test_push_endpoint_error()
+    test_send_batch()
+    print("✅ Web Push tests passed")
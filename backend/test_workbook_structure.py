@@ -0,0 +1,75 @@
+#!/usr/bin/env python3
+"""
+Test script for the workbook structure detector
+Checks header/stage/date column detection on a board-style sheet and
+that a 5k x 200 sheet is analysed without per-cell Python loops
+"""
+
+import time
+from datetime import datetime
+
+import numpy as np
+import pandas as pd
+
+from app.db.initial_data import STAGES
+from app.services.workbook_structure import detect_structure, first_header_row
+
+
+def build_board_sheet(rows: int, cols: int) -> pd.DataFrame:
+    rng = np.random.default_rng(0)
+    vocab = np.array(
+        ["済", "○", "営業", "設計", "IC", "工務", "追客・設計", "備考あり", "5/12", "現場確認"]
+        + [f"メモ{i}" for i in range(300)],
+        dtype=object
+    )
+    data = vocab[rng.integers(0, len(vocab), (rows, cols))]
+    data[rng.random((rows, cols)) < 0.4] = None
+    data[:, 5] = pd.date_range("2026-01-01", periods=rows).to_pydatetime()
+
+    header = ["No", "邸名", "営業"] + [stage["name"] for stage in STAGES]
+    data[:3, :] = None
+    data[2, :len(header)] = header
+    return pd.DataFrame(data)
+
+
+def test_board_sheet_structure():
+    structure = detect_structure(build_board_sheet(200, 60))
+
+    assert first_header_row(structure) == 2
+    assert structure.project_name_cells[0] == (2, 1)
+    assert structure.stage_columns[3] == STAGES[0]["code"]
+    assert len(structure.stage_columns) == len(STAGES)
+    assert 5 in structure.date_columns
+    assert {"追客", "設計", "営業", "IC"} <= structure.keywords
+
+
+def test_detail_sheet_structure():
+    structure = detect_structure([
+        [None, "邸名", None, "佐藤様邸"],
+        [],
+        [None, "上 棟", "7/3"],
+        [None, "１ｓｔプラン提案", datetime(2026, 4, 1)],
+    ])
+    assert first_header_row(structure) == 0
+    assert structure.stage_columns == {}
+    assert [code for _, _, code in structure.stage_cells] == ["ROOFING", "1ST_PLAN"]
+
+
+def test_large_sheet_is_fast():
+    sheet = build_board_sheet(5000, 200)
+    detect_structure(sheet)
+
+    start = time.perf_counter()
+    structure = detect_structure(sheet)
+    elapsed = time.perf_counter() - start
+
+    print(f"Detected structure of a 5000x200 sheet in {elapsed * 1000:.0f} ms")
+    assert len(structure.stage_columns) == len(STAGES)
+    assert elapsed < 0.5
+
+
+if __name__ == "__main__":
+    test_board_sheet_structure()
+    test_detail_sheet_structure()
+    test_large_sheet_is_fast()
+    print("✅ Workbook structure detector tests passed")